@@ -1,13 +1,90 @@
 import heapq
-from typing import Tuple, List, Set, Dict
+import itertools
+import math
+from collections import OrderedDict
+from time import perf_counter
+from typing import Tuple, List, Set, Dict, Iterable, Optional
+import numpy as np
 from models.drone import Drone
 from models.graph import DeliveryGraph
-from utils.helpers import calculate_distance, calculate_energy_consumption, point_in_polygon, line_intersects_polygon
+from algorithms.held_karp import HeldKarpSequencer
+from utils.helpers import calculate_distance, calculate_energy_consumption
+
+class HeuristicCache:
+    """Aynı simülasyondaki tüm pathfinder'lar arasında paylaşılan LRU NFZ ceza önbelleği
+
+    Anahtar: (başlangıç, hedef teslimat, varış zamanı dilimi). Başlangıç bir teslimat
+    id'si ya da drone başlangıç konumudur; ceza drone'dan bağımsız olduğu için paylaşılabilir.
+    """
+
+    def __init__(self, max_size: int = 100000, time_bucket: float = 1.0):
+        self.max_size = max_size
+        self.time_bucket = time_bucket  # Dakika cinsinden dilim genişliği
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, origin, target_id: int, arrival_time: float):
+        if self.time_bucket:
+            return origin, target_id, math.floor(arrival_time / self.time_bucket)
+        return origin, target_id, arrival_time
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value: float):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0,
+            'size': len(self._entries),
+            'max_size': self.max_size
+        }
 
 class AStarPathfinder:
-    def __init__(self, graph: DeliveryGraph, drone: Drone):
+    def __init__(self, graph: DeliveryGraph, drone: Drone, max_nodes: int = 100,
+                 heuristic_cache: Optional[HeuristicCache] = None,
+                 time_bucket: Optional[float] = None, battery_bucket: Optional[float] = None,
+                 anytime: bool = False, time_budget: Optional[float] = None,
+                 weights: Tuple[float, ...] = (3.0, 2.0, 1.5, 1.25, 1.0), exact_threshold: int = 12,
+                 neighbour_candidates: bool = False):
         self.graph = graph
         self.drone = drone
+        self.max_nodes = max_nodes  # Genişletilecek maksimum düğüm sayısı
+        self.heuristic_cache = heuristic_cache
+        # Baskınlık karşılaştırması için isteğe bağlı nicemleme (dakika, mAh)
+        self.time_bucket = time_bucket
+        self.battery_bucket = battery_bucket
+        # Anytime arama: saniye cinsinden süre bütçesi ve azalan heuristic ağırlıkları
+        self.anytime = anytime
+        self.time_budget = time_budget
+        self.weights = weights
+        # Bu sayıda ya da daha az hedef için Held–Karp DP ile sıralama (kısıtlar bağlayıcı değilken
+        # kesin, bkz. HeldKarpSequencer); DP maliyeti 2^k ile büyüdüğünden (12 hedefte ~0.04 s,
+        # 15 hedefte ~0.5 s) varsayılan 12, 0 ile kapatılır
+        self.exact_threshold = exact_threshold
+        self._sequencer = None
+        # Ardıl adayları graf komşu listesiyle (başlangıçta en yakın hedeflerle) sınırlama
+        self.neighbour_candidates = neighbour_candidates
+        self.search_stats = {}
 
     def calculate_nfz_penalty(self, current_pos: Tuple[float, float], target_delivery_id: int,
                               current_time: float) -> float:
@@ -15,27 +92,15 @@ class AStarPathfinder:
         delivery = self.graph.deliveries[target_delivery_id]
         target_pos = delivery.pos
 
-        penalty = 0
-
         # Tahmini varış zamanı
         distance = calculate_distance(current_pos, target_pos)
         travel_time = distance / self.drone.speed
         estimated_arrival = current_time + travel_time
 
-        for nfz in self.graph.no_fly_zones:
-            # NFZ aktifliği kontrolü
-            if nfz.active_time[0] <= estimated_arrival <= nfz.active_time[1]:
-                # Rota NFZ ile kesişiyor mu kontrolü
-                if line_intersects_polygon(current_pos, target_pos, nfz.coordinates):
-                    penalty += 50  # Kesişiyorsa ceza
-
-                # Hedef nokta NFZ içinde mi kontrolü
-                if point_in_polygon(target_pos, nfz.coordinates):
-                    penalty += 100  # Ceza
-
-        return penalty
+        # Rota kesişimi ve hedef nokta cezaları önceden hesaplanmış tablodan
+        return self.graph.nfz_table.penalty(current_pos, target_delivery_id, estimated_arrival)
 
-    def heuristic(self, current_id: int, remaining_deliveries: Set[int], current_time: float) -> float:
+    def heuristic(self, current_id: int, remaining_deliveries: Iterable[int], current_time: float) -> float:
         """
         heuristic = distance + nofly_zone_penalty
         """
@@ -44,15 +109,25 @@ class AStarPathfinder:
 
         if current_id == -1:  # Başlangıç konumu
             current_pos = self.drone.start_pos
+            origin = tuple(current_pos)
         else:
             current_pos = self.graph.deliveries[current_id].pos
+            origin = current_id
 
         min_cost = float('inf')
         for delivery_id in remaining_deliveries:
             delivery_pos = self.graph.deliveries[delivery_id].pos
             distance = calculate_distance(current_pos, delivery_pos)
 
-            nfz_penalty = self.calculate_nfz_penalty(current_pos, delivery_id, current_time)
+            if self.heuristic_cache is None:
+                nfz_penalty = self.calculate_nfz_penalty(current_pos, delivery_id, current_time)
+            else:
+                estimated_arrival = current_time + distance / self.drone.speed
+                key = self.heuristic_cache.key(origin, delivery_id, estimated_arrival)
+                nfz_penalty = self.heuristic_cache.get(key)
+                if nfz_penalty is None:
+                    nfz_penalty = self.graph.nfz_table.penalty(current_pos, delivery_id, estimated_arrival)
+                    self.heuristic_cache.put(key, nfz_penalty)
 
             # heuristic = distance + no-fly zone penalty
             total_cost = distance + nfz_penalty
@@ -94,11 +169,8 @@ class AStarPathfinder:
 
         # No-fly zone
         final_arrival = max(effective_arrival, delivery.time_window[0])
-        for nfz in self.graph.no_fly_zones:
-            if nfz.active_time[0] <= final_arrival <= nfz.active_time[1]:
-                if (line_intersects_polygon(current_pos, delivery.pos, nfz.coordinates) or
-                        point_in_polygon(delivery.pos, nfz.coordinates)):
-                    return False
+        if self.graph.nfz_table.is_blocked(current_pos, delivery_id, final_arrival):
+            return False
 
         return True
 
@@ -133,56 +205,216 @@ class AStarPathfinder:
 
     def find_path(self, start_pos: Tuple[float, float],
                   target_deliveries: Set[int],
-                  current_time: float) -> List[int]:
+                  current_time: float,
+                  time_budget: Optional[float] = None,
+                  node_budget: Optional[int] = None) -> List[int]:
         """
-        State: (current_delivery_id, visited_deliveries_frozenset, time, battery)
-        Hedef: Tüm teslimatlara gitmek
+        State: (current_delivery_id, visited_bitmask, time, battery)
+        Hedef: Tüm teslimatlara gitmek (goal_mask)
+
+        Anytime modunda (anytime=True ya da bütçe verildiğinde) azalan ağırlıklarla
+        weighted A* çalıştırılır ve bütçe bitince bulunan en iyi tam ya da kısmi rota döner.
+        Açık listede kalan düğümlerin en küçük g + h değeri search_stats['lower_bound'], bulunan
+        rotanın buna oranı search_stats['bound'] olarak raporlanır (alt sınır pozitif değilse None).
+        Sınır h'ye göredir: h (öncelik bonusu ve NFZ cezası nedeniyle) kabul edilebilir
+        olmadığından gerçek optimuma göre bir garanti değildir.
+        exact_threshold veya daha az hedef için önce Held–Karp DP denenir; tam rota bulursa sınır,
+        kısıtsız DP optimumuna göredir ve gerçek optimuma göre bir garantidir.
         """
+        self.search_stats = {'expanded': 0, 'generated': 0, 'pruned': 0, 'iterations': 0,
+                             'lower_bound': None, 'bound': None, 'complete': False}
+
         if not target_deliveries:
+            self.search_stats.update({'complete': True})
             return []
 
+        exact_partial = []
+        if len(target_deliveries) <= self.exact_threshold:
+            if self._sequencer is None:
+                self._sequencer = HeldKarpSequencer(self.graph, self.drone, self.exact_threshold)
+            result = self._sequencer.solve(start_pos, target_deliveries, current_time,
+                                           self.drone.current_battery)
+            if result['complete']:
+                self._report_bound(result['g'], result['lower_bound'])
+                self.search_stats.update({'complete': True})
+                return result['path']
+            exact_partial = result['path']
+
+        if not self.anytime and time_budget is None and node_budget is None:
+            result = self._weighted_search(start_pos, target_deliveries, current_time, 1.0,
+                                           self.max_nodes, None, float('inf'))
+            if result['complete']:
+                self._report_bound(result['g'], result['lower_bound'])
+                self.search_stats.update({'complete': True})
+                return result['path']
+            path = self._greedy_fallback(start_pos, target_deliveries, current_time)
+        else:
+            if time_budget is None:
+                time_budget = self.time_budget
+            # Süre bütçesi varsa düğüm sınırı yalnızca açıkça verildiğinde uygulanır
+            if node_budget is None and time_budget is None:
+                node_budget = self.max_nodes
+            path = self._anytime_search(start_pos, target_deliveries, current_time,
+                                        time_budget, node_budget)
+            if self.search_stats['complete']:
+                return path
+
+        # Tam rota bulunamadı: en çok teslimatlı kısmi rota
+        return exact_partial if len(exact_partial) > len(path) else path
+
+    def _anytime_search(self, start_pos: Tuple[float, float], target_deliveries: Set[int],
+                        current_time: float, time_budget: Optional[float],
+                        node_budget: Optional[int]) -> List[int]:
+        """ARA* tarzı: ağırlık azaldıkça çözüm iyileşir, bütçe bitince en iyisi döner"""
+        deadline = perf_counter() + time_budget if time_budget is not None else None
+        nodes_left = node_budget if node_budget is not None else float('inf')
+
+        # Başlangıç çözümü: greedy rota hem ilk sonuç hem de budama için üst sınır olur
+        best_path, best_g = None, float('inf')
+        best_partial = self._greedy_fallback(start_pos, target_deliveries, current_time)
+        if len(best_partial) == len(target_deliveries):
+            best_path, best_g = best_partial, self._path_cost(start_pos, best_partial, current_time)
+        lower_bound = None  # İterasyonların verdiği en büyük alt sınır
+
+        for weight in self.weights:
+            if nodes_left <= 0 or (deadline is not None and perf_counter() >= deadline):
+                break
+
+            expanded_before = self.search_stats['expanded']
+            result = self._weighted_search(start_pos, target_deliveries, current_time, weight,
+                                           nodes_left, deadline, best_g)
+            nodes_left -= self.search_stats['expanded'] - expanded_before
+            self.search_stats['iterations'] += 1
+
+            # Üst sınırla budanan düğümlerin g + h değeri zaten best_g'den küçük değildir
+            bound = min(result['lower_bound'], best_g)
+            if result['complete']:
+                bound = min(bound, result['g'])
+            if lower_bound is None or bound > lower_bound:
+                lower_bound = bound
+
+            if result['complete'] and result['g'] < best_g:
+                best_path, best_g = result['path'], result['g']
+            if len(result['path']) > len(best_partial):
+                best_partial = result['path']
+
+            if result['finished'] and weight <= 1.0:
+                break
+
+        if best_path is not None:
+            self._report_bound(best_g, lower_bound)
+            self.search_stats['complete'] = True
+            return best_path
+        return best_partial
+
+    def _report_bound(self, g: float, lower_bound: Optional[float]):
+        """Bulunan rotanın g değerinin h'ye göre alt sınıra oranı"""
+        if lower_bound is None or lower_bound == float('inf'):
+            return
+        self.search_stats['lower_bound'] = float(lower_bound)
+        if lower_bound > 0:
+            self.search_stats['bound'] = max(float(g / lower_bound), 1.0)
+
+    def _path_cost(self, start_pos: Tuple[float, float], path: List[int], current_time: float) -> float:
+        """Rotanın A* g-score değeri"""
+        total_cost = 0
+        current_pos = start_pos
+        battery = self.drone.current_battery
+        for delivery_id in path:
+            edge_cost, time_cost, energy_cost = self.calculate_actual_cost(
+                current_pos, delivery_id, current_time, battery
+            )
+            total_cost += edge_cost
+            current_time += time_cost
+            battery = (self.drone.battery if energy_cost > battery else battery) - energy_cost
+            current_pos = self.graph.deliveries[delivery_id].pos
+        return total_cost
+
+    def _weighted_search(self, start_pos: Tuple[float, float], target_deliveries: Set[int],
+                         current_time: float, weight: float, node_limit: float,
+                         deadline: Optional[float], upper_bound: float) -> Dict:
+        """f = g + weight * h ile tek bir A* araması
+
+        g + h >= upper_bound olan düğümler atılır. h kabul edilebilir olmadığından bu budama
+        sezgiseldir; üst sınırdan daha iyi bir rota da elenebilir.
+        Dönüşteki 'lower_bound', açık listede kalan canlı düğümlerin en küçük g + h değeridir.
+        """
+        # Teslimat -> bit eşlemesi
+        target_list = list(target_deliveries)
+        bit_of = {delivery_id: 1 << i for i, delivery_id in enumerate(target_list)}
+        goal_mask = (1 << len(target_list)) - 1
+        if self.neighbour_candidates:
+            start_candidates = self._nearest_targets(start_pos, target_list)
+
+        # Ebeveyn işaretçileri: rota kopyalamak yerine düğüm dizisi
+        parents = [-1]
+        node_deliveries = [-1]
+        node_lower = []  # Düğüm indeksi -> g + h
+
         # A* Veri Yapıları
-        open_set = []  # Öncelik kuyruğu: (f_score, g_score, state, path)
-        closed_set = set()
-        g_score = {}  # Maliyet
+        open_set = []  # Öncelik kuyruğu: (f_score, g_score, counter, node_index, state)
+        labels = {}  # (current_id, visited_mask) -> [(g, time, battery, node_index), ...]
+        pruned = set()  # Sonradan baskın çıkılan düğümler
+        counter = itertools.count()  # Eşitlikte FIFO sırası
 
-        initial_state = (-1, frozenset(), current_time, self.drone.current_battery)
-        g_score[initial_state] = 0
+        initial_state = (-1, 0, current_time, self.drone.current_battery)
+        self._add_label(labels, pruned, (-1, 0), 0, current_time, self.drone.current_battery, 0)
 
         h_initial = self.heuristic(-1, target_deliveries, current_time)
-        f_initial = 0 + h_initial
+        f_initial = 0 + weight * h_initial
+        node_lower.append(h_initial)
 
-        heapq.heappush(open_set, (f_initial, 0, initial_state, []))
+        heapq.heappush(open_set, (f_initial, 0, next(counter), 0, initial_state))
 
         nodes_expanded = 0
-        max_nodes = 100
+        best_partial, best_partial_key = 0, (0, 0)  # En çok teslimat, en düşük g
 
         # A* Main Loop
-        while open_set and nodes_expanded < max_nodes:
+        while open_set and nodes_expanded < node_limit:
+            if deadline is not None and perf_counter() >= deadline:
+                break
+
             # En düşük f-scorelu state'i al
-            f_score, g_current, current_state, current_path = heapq.heappop(open_set)
+            f_score, g_current, _, node_index, current_state = heapq.heappop(open_set)
 
-            current_id, visited_set, time, battery = current_state
+            current_id, visited_mask, time, battery = current_state
 
-            # Closed set mi kontrolü
-            if current_state in closed_set:
+            # Başka bir etiket tarafından baskın çıkıldıysa atla
+            if node_index in pruned:
                 continue
 
-            # Closed set'e ekle
-            closed_set.add(current_state)
             nodes_expanded += 1
+            self.search_stats['expanded'] += 1
 
-            if visited_set == frozenset(target_deliveries):
-                return current_path
+            if visited_mask == goal_mask:
+                return {'path': self._reconstruct_path(node_index, parents, node_deliveries),
+                        'g': g_current, 'complete': True, 'finished': True,
+                        'lower_bound': min(g_current, self._open_lower_bound(open_set, pruned, node_lower))}
+
+            partial_key = (bin(visited_mask).count('1'), -g_current)
+            if partial_key > best_partial_key:
+                best_partial, best_partial_key = node_index, partial_key
 
             if current_id == -1:
                 current_pos = start_pos
             else:
                 current_pos = self.graph.deliveries[current_id].pos
 
-            unvisited = target_deliveries - visited_set
+            candidates = target_list
+            if self.neighbour_candidates:
+                if current_id == -1:
+                    candidates = start_candidates
+                else:
+                    # Ziyaret edilmiş komşular elenir; hiçbiri kalmazsa tüm hedeflere dönülür
+                    near = [d for d in self.graph.neighbours(current_id)
+                            if d in bit_of and not visited_mask & bit_of[d]]
+                    candidates = near if near else target_list
+
+            for next_delivery_id in candidates:
+                next_bit = bit_of[next_delivery_id]
+                if visited_mask & next_bit:
+                    continue
 
-            for next_delivery_id in unvisited:
                 if not self.is_feasible_delivery(next_delivery_id, current_pos, time, battery):
                     continue
 
@@ -190,7 +422,7 @@ class AStarPathfinder:
                     current_pos, next_delivery_id, time, battery
                 )
 
-                new_visited = visited_set | frozenset([next_delivery_id])
+                new_visited = visited_mask | next_bit
                 new_time = time + time_cost
 
                 if energy_cost > battery:
@@ -202,20 +434,87 @@ class AStarPathfinder:
 
                 tentative_g = g_current + edge_cost
 
-                if new_state in g_score and tentative_g >= g_score[new_state]:
-                    continue
+                remaining_deliveries = [d for d in target_list if not new_visited & bit_of[d]]
+                h_score = self.heuristic(next_delivery_id, remaining_deliveries, new_time)
 
-                g_score[new_state] = tentative_g
+                # Önceki iterasyonun çözümünden iyi olamayacağı tahmin edilen düğümleri ele
+                # (h kabul edilebilir olmadığından sezgisel bir budama)
+                if tentative_g + h_score >= upper_bound:
+                    continue
 
-                remaining_deliveries = target_deliveries - new_visited
-                h_score = self.heuristic(next_delivery_id, remaining_deliveries, new_time)
+                # Etiket baskınlığı: aynı (düğüm, ziyaret) için g, zaman ve bataryada daha iyi değilse at.
+                # Etiket yalnızca kuyruğa girecek düğüm için kaydedilir; indeks bu düğüme aittir.
+                child_index = len(parents)
+                if not self._add_label(labels, pruned, (next_delivery_id, new_visited),
+                                       tentative_g, new_time, new_battery, child_index):
+                    continue
 
-                f_score = tentative_g + h_score
+                f_score = tentative_g + weight * h_score
+
+                parents.append(node_index)
+                node_deliveries.append(next_delivery_id)
+                node_lower.append(tentative_g + h_score)
+                heapq.heappush(open_set, (f_score, tentative_g, next(counter), child_index, new_state))
+                self.search_stats['generated'] += 1
+
+        return {'path': self._reconstruct_path(best_partial, parents, node_deliveries),
+                'g': -best_partial_key[1], 'complete': False, 'finished': not open_set,
+                'lower_bound': self._open_lower_bound(open_set, pruned, node_lower)}
+
+    @staticmethod
+    def _open_lower_bound(open_set: List, pruned: Set[int], node_lower: List[float]) -> float:
+        """Açık listedeki budanmamış düğümlerin en küçük g + h değeri (liste boşsa sonsuz)"""
+        return min((node_lower[entry[3]] for entry in open_set if entry[3] not in pruned),
+                   default=float('inf'))
+
+    def _nearest_targets(self, pos: Tuple[float, float], target_list: List[int]) -> List[int]:
+        """Konuma en yakın graph.neighbour_count hedef"""
+        k = self.graph.neighbour_count
+        if len(target_list) <= k:
+            return target_list
+        positions = np.array([self.graph.deliveries[d].pos for d in target_list], dtype=np.float64)
+        distance = np.hypot(positions[:, 0] - pos[0], positions[:, 1] - pos[1])
+        nearest = np.argpartition(distance, k - 1)[:k]
+        return [target_list[i] for i in nearest[np.argsort(distance[nearest])]]
+
+    def _add_label(self, labels: Dict, pruned: Set[int], key: Tuple[int, int],
+                   g: float, time: float, battery: float, node_index: int) -> bool:
+        """Baskın değilse etiketi ekler, baskın çıktığı etiketleri budar"""
+        if self.time_bucket:
+            time = math.ceil(time / self.time_bucket)
+        if self.battery_bucket:
+            battery = math.floor(battery / self.battery_bucket)
+
+        existing = labels.get(key)
+        if existing is None:
+            labels[key] = [(g, time, battery, node_index)]
+            return True
+
+        for label_g, label_time, label_battery, _ in existing:
+            if label_g <= g and label_time <= time and label_battery >= battery:
+                self.search_stats['pruned'] += 1
+                return False
 
-                new_path = current_path + [next_delivery_id]
-                heapq.heappush(open_set, (f_score, tentative_g, new_state, new_path))
+        kept = []
+        for label in existing:
+            if g <= label[0] and time <= label[1] and battery >= label[2]:
+                pruned.add(label[3])
+                self.search_stats['pruned'] += 1
+            else:
+                kept.append(label)
+        kept.append((g, time, battery, node_index))
+        labels[key] = kept
+        return True
 
-        return self._greedy_fallback(start_pos, target_deliveries, current_time)
+    @staticmethod
+    def _reconstruct_path(node_index: int, parents: List[int], node_deliveries: List[int]) -> List[int]:
+        """Ebeveyn işaretçilerinden rotayı geri oluşturma"""
+        path = []
+        while node_index > 0:
+            path.append(node_deliveries[node_index])
+            node_index = parents[node_index]
+        path.reverse()
+        return path
 
     def _greedy_fallback(self, start_pos: Tuple[float, float],
                          target_deliveries: Set[int], current_time: float) -> List[int]:
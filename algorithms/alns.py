@@ -0,0 +1,325 @@
+import math
+import random
+from time import perf_counter
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from models.drone import Drone
+from models.delivery import Delivery
+from models.graph import DeliveryGraph
+from models.problem_context import ProblemContext
+from algorithms.route_evaluator import RouteEvaluator
+from algorithms.seeding import nearest_feasible_routes
+from utils.helpers import calculate_energy_factor
+
+class ALNS:
+    """Adaptive Large Neighborhood Search (Ropke & Pisinger)
+
+    Her iterasyonda ağırlıklı rulet ile bir yıkım (destroy) ve bir onarım (repair) operatörü
+    seçilir; yeni çözüm simulated annealing ile kabul edilir. Operatör ağırlıkları her segment
+    sonunda başarı puanlarına göre güncellenir. Amaç fonksiyonu GA fitness'ıdır. context verilirse
+    (aynı drone ve teslimat listeleri üzerinde) mesafe/enerji matrisleri ve graf bağlamdan alınır.
+    """
+
+    DESTROY_OPERATORS = ('random', 'worst', 'related', 'time_window')
+    REPAIR_OPERATORS = ('greedy', 'regret')
+
+    # Operatör puanları: yeni en iyi, mevcuttan iyi, kabul edilen kötü çözüm
+    SCORES = (33, 9, 13)
+
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                 start_time: float = 0, seed: Optional[int] = None, time_budget: float = 5.0,
+                 max_iterations: Optional[int] = None, removal_fraction: Tuple[float, float] = (0.05, 0.25),
+                 regret_k: int = 3, segment_length: int = 50, reaction_factor: float = 0.1,
+                 start_temperature: float = 0.05, final_temperature: float = 0.001,
+                 context: Optional[ProblemContext] = None):
+        self.drones = drones
+        self.deliveries = deliveries
+        self.graph = graph
+        self.start_time = start_time
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.removal_fraction = removal_fraction
+        self.regret_k = regret_k
+        self.segment_length = segment_length
+        self.reaction_factor = reaction_factor
+
+        # Başlangıç sıcaklığı: amaç değerinin bu oranı kadar kötüleşme %50 olasılıkla kabul edilir
+        self.start_temperature = start_temperature
+        self.final_temperature = final_temperature
+
+        self.random = random.Random(seed) if seed is not None else random
+        self.evaluator = RouteEvaluator(drones, graph, start_time=start_time, context=context)
+
+        n = len(deliveries)
+        self.n = n
+        self.ids = [d.id for d in deliveries]
+        self.index = {d_id: i for i, d_id in enumerate(self.ids)}
+        self.weights = np.array([d.weight for d in deliveries], dtype=np.float64)
+        self.window_start = np.array([d.time_window[0] for d in deliveries], dtype=np.float64)
+        self.max_weights = np.array([d.max_weight for d in drones], dtype=np.float64)
+
+        # Kaynaklar: teslimatlar (0..n-1), drone başlangıçları (n..n+m-1); son sütun "rota sonu" (0)
+        if context is not None:
+            self.distance, energy = context.origin_distance, context.origin_energy
+        else:
+            positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+            starts = np.array([d.start_pos for d in drones], dtype=np.float64).reshape(-1, 2)
+            origins = np.vstack([positions, starts])
+            diff = origins[:, None, :] - positions[None, :, :]
+            self.distance = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+            energy = self.distance * calculate_energy_factor(self.weights)[None, :]
+        self.energy = np.hstack([energy, np.zeros((len(energy), 1))])
+
+        self.destroy_weights = {name: 1.0 for name in self.DESTROY_OPERATORS}
+        self.repair_weights = {name: 1.0 for name in self.REPAIR_OPERATORS}
+        self.stats = {}
+
+    def run(self, initial_solution: Optional[Dict[int, List[int]]] = None) -> Dict[int, List[int]]:
+        """Süre bütçesi (ya da iterasyon sınırı) dolana kadar arama; en iyi çözümü döndürür"""
+        print(f"ALNS başlatılıyor: {len(self.deliveries)} teslimat, {len(self.drones)} drone, "
+              f"{self.time_budget} saniye")
+        start = perf_counter()
+
+        if initial_solution is None:
+            initial_solution = nearest_feasible_routes(self.drones, self.deliveries, self.graph,
+                                                       self.start_time, self.random)
+        current = self._from_solution(initial_solution)
+        current_scores = [self._route_score(k, route) for k, route in enumerate(current)]
+        current_value = sum(current_scores)
+        best, best_value = [list(route) for route in current], current_value
+
+        temperature = self.start_temperature * max(abs(current_value), 1.0) / math.log(2)
+        final_temperature = self.final_temperature * max(abs(current_value), 1.0) / math.log(2)
+
+        segment_scores = {name: [0.0, 0] for name in self.DESTROY_OPERATORS + self.REPAIR_OPERATORS}
+        usage = {name: 0 for name in self.DESTROY_OPERATORS + self.REPAIR_OPERATORS}
+        history = []
+        iteration = 0
+
+        while True:
+            elapsed = perf_counter() - start
+            if elapsed >= self.time_budget:
+                break
+            if self.max_iterations is not None and iteration >= self.max_iterations:
+                break
+
+            destroy = self._roulette(self.destroy_weights)
+            repair = self._roulette(self.repair_weights)
+            usage[destroy] += 1
+            usage[repair] += 1
+
+            candidate = [list(route) for route in current]
+            count = self._removal_count(candidate)
+            removed = getattr(self, f'_destroy_{destroy}')(candidate, count) if count else []
+
+            # Atanmamış teslimatlardan bir kısmı da yeniden eklenmeye çalışılır
+            unassigned = self._unassigned(current)
+            if unassigned:
+                removed += self.random.sample(unassigned, min(len(unassigned), max(count, 1)))
+            getattr(self, f'_repair_{repair}')(candidate, removed)
+
+            candidate_scores = [
+                current_scores[k] if candidate[k] == current[k] else self._route_score(k, candidate[k])
+                for k in range(len(candidate))
+            ]
+            candidate_value = sum(candidate_scores)
+
+            # Simulated annealing: sıcaklık kalan süreye göre üstel olarak düşer
+            progress = elapsed / self.time_budget if self.time_budget else 1.0
+            if self.max_iterations:
+                progress = max(progress, iteration / self.max_iterations)
+            t = temperature * (final_temperature / temperature) ** progress
+
+            outcome = None
+            if candidate_value > best_value + 1e-9:
+                outcome = 0
+            elif candidate_value > current_value + 1e-9:
+                outcome = 1
+            elif self.random.random() < math.exp((candidate_value - current_value) / t):
+                outcome = 2
+
+            if outcome is not None:
+                current, current_scores, current_value = candidate, candidate_scores, candidate_value
+                if outcome == 0:
+                    best, best_value = [list(route) for route in current], current_value
+                    history.append((iteration, best_value))
+                for name in (destroy, repair):
+                    segment_scores[name][0] += self.SCORES[outcome]
+            for name in (destroy, repair):
+                segment_scores[name][1] += 1
+
+            iteration += 1
+            if iteration % self.segment_length == 0:
+                self._update_weights(segment_scores)
+
+        self.stats = {
+            'iterations': iteration,
+            'best_score': best_value,
+            'elapsed_time': perf_counter() - start,
+            'destroy_weights': dict(self.destroy_weights),
+            'repair_weights': dict(self.repair_weights),
+            'operator_usage': usage,
+            'best_history': history
+        }
+
+        return {drone.id: [self.ids[i] for i in best[k]] for k, drone in enumerate(self.drones)}
+
+    # Yardımcılar
+
+    def _from_solution(self, solution: Dict[int, List[int]]) -> List[List[int]]:
+        """Sözlük çözümü indeks rotalarına çevirme; tekrar eden ve taşınamayan teslimatlar çıkarılır"""
+        routes = []
+        seen = set()
+        for k, drone in enumerate(self.drones):
+            route = []
+            for d_id in solution.get(drone.id, []):
+                i = self.index.get(d_id)
+                if i is not None and i not in seen and self.weights[i] <= drone.max_weight:
+                    route.append(i)
+                    seen.add(i)
+            routes.append(route)
+        return routes
+
+    def _route_score(self, k: int, route: List[int]) -> float:
+        """Rotanın GA fitness katkısı (değerlendiricinin rota önbelleği kullanılır)"""
+        return self.evaluator.route_score(self.drones[k].id, [self.ids[i] for i in route])
+
+    def _roulette(self, weights: Dict[str, float]) -> str:
+        names = list(weights)
+        return self.random.choices(names, weights=[weights[name] for name in names])[0]
+
+    def _update_weights(self, segment_scores: Dict[str, List[float]]):
+        """Segment puanlarıyla operatör ağırlıklarını güncelleme"""
+        r = self.reaction_factor
+        for weights in (self.destroy_weights, self.repair_weights):
+            for name in weights:
+                score, uses = segment_scores[name]
+                if uses:
+                    weights[name] = max(0.05, weights[name] * (1 - r) + r * score / uses)
+                segment_scores[name] = [0.0, 0]
+
+    def _removal_count(self, routes: List[List[int]]) -> int:
+        assigned = sum(len(route) for route in routes)
+        low, high = self.removal_fraction
+        return min(assigned, max(1, self.random.randint(int(low * assigned), max(1, int(high * assigned)))))
+
+    def _unassigned(self, routes: List[List[int]]) -> List[int]:
+        assigned = np.zeros(self.n, dtype=bool)
+        for route in routes:
+            assigned[route] = True
+        return np.flatnonzero(~assigned).tolist()
+
+    @staticmethod
+    def _remove(routes: List[List[int]], removed: List[int]):
+        removed_set = set(removed)
+        for k, route in enumerate(routes):
+            if any(i in removed_set for i in route):
+                routes[k] = [i for i in route if i not in removed_set]
+
+    def _origin(self, k: int, route: List[int], p: int) -> int:
+        return route[p - 1] if p > 0 else self.n + k
+
+    # Yıkım operatörleri
+
+    def _destroy_random(self, routes: List[List[int]], count: int) -> List[int]:
+        """Rastgele teslimatları çıkarma"""
+        assigned = [i for route in routes for i in route]
+        removed = self.random.sample(assigned, count)
+        self._remove(routes, removed)
+        return removed
+
+    def _destroy_worst(self, routes: List[List[int]], count: int) -> List[int]:
+        """Enerji katkısı en yüksek teslimatları (rastgelelikle) çıkarma"""
+        costs = []
+        for k, route in enumerate(routes):
+            for p, i in enumerate(route):
+                before = self._origin(k, route, p)
+                after = route[p + 1] if p + 1 < len(route) else self.n
+                costs.append((self.energy[before, i] + self.energy[i, after] - self.energy[before, after], i))
+        costs.sort(reverse=True)
+
+        removed = []
+        while len(removed) < count and costs:
+            p = int(len(costs) * self.random.random() ** 3)
+            removed.append(costs.pop(p)[1])
+        self._remove(routes, removed)
+        return removed
+
+    def _destroy_related(self, routes: List[List[int]], count: int) -> List[int]:
+        """Rastgele bir teslimat ve ona mekânsal olarak en yakın teslimatları çıkarma"""
+        assigned = np.array([i for route in routes for i in route], dtype=np.int64)
+        seed = assigned[self.random.randrange(len(assigned))]
+        order = np.argsort(self.distance[seed, assigned], kind='stable')
+        removed = assigned[order[:count]].tolist()
+        self._remove(routes, removed)
+        return removed
+
+    def _destroy_time_window(self, routes: List[List[int]], count: int) -> List[int]:
+        """Rastgele bir teslimat ve zaman penceresi başlangıcı ona en yakın teslimatları çıkarma"""
+        assigned = np.array([i for route in routes for i in route], dtype=np.int64)
+        seed = assigned[self.random.randrange(len(assigned))]
+        order = np.argsort(np.abs(self.window_start[assigned] - self.window_start[seed]), kind='stable')
+        removed = assigned[order[:count]].tolist()
+        self._remove(routes, removed)
+        return removed
+
+    # Onarım operatörleri
+
+    def _insertion_costs(self, routes: List[List[int]], pending: List[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Bekleyen her teslimat için tüm ekleme noktalarının enerji maliyeti (kapasite dışı: inf)
+
+        Dönüş: maliyet matrisi (teslimat x nokta), noktanın rotası ve rotadaki pozisyonu.
+        Noktalar rota sırasıyla ardışıktır; her rotada len(rota) + 1 nokta vardır.
+        """
+        before = np.concatenate([np.concatenate(([self.n + k], route)) for k, route in enumerate(routes)])
+        after = np.concatenate([np.concatenate((route, [self.n])) for route in routes])
+        before, after = before.astype(np.int64), after.astype(np.int64)
+        lengths = np.array([len(route) + 1 for route in routes], dtype=np.int64)
+        slot_route = np.repeat(np.arange(len(routes)), lengths)
+        slot_pos = np.arange(len(before)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        pending = np.array(pending, dtype=np.int64)
+        costs = (self.energy[before[None, :], pending[:, None]] + self.energy[pending[:, None], after[None, :]]
+                 - self.energy[before, after][None, :])
+        costs[self.weights[pending][:, None] > self.max_weights[slot_route][None, :]] = np.inf
+        return costs, slot_route, slot_pos
+
+    def _try_insert(self, routes: List[List[int]], i: int, costs: np.ndarray,
+                    slot_route: np.ndarray, slot_pos: np.ndarray, attempts: int = 3) -> bool:
+        """En ucuz noktalardan başlayarak rota skorunu artıran ilk eklemeyi uygulama"""
+        for slot in np.argsort(costs, kind='stable')[:attempts]:
+            if not np.isfinite(costs[slot]):
+                break
+            k, p = int(slot_route[slot]), int(slot_pos[slot])
+            route = routes[k][:p] + [i] + routes[k][p:]
+            if self._route_score(k, route) > self._route_score(k, routes[k]):
+                routes[k] = route
+                return True
+        return False
+
+    def _repair_greedy(self, routes: List[List[int]], removed: List[int]):
+        """Teslimatları rastgele sırayla en ucuz uygun noktaya ekleme"""
+        pending = list(removed)
+        self.random.shuffle(pending)
+        for i in pending:
+            costs, slot_route, slot_pos = self._insertion_costs(routes, [i])
+            self._try_insert(routes, i, costs[0], slot_route, slot_pos)
+
+    def _repair_regret(self, routes: List[List[int]], removed: List[int]):
+        """Regret-k: en iyi k rota arasındaki maliyet farkı en büyük teslimat önce eklenir"""
+        pending = list(removed)
+        while pending:
+            costs, slot_route, slot_pos = self._insertion_costs(routes, pending)
+
+            # Teslimat başına her rotanın en ucuz noktası
+            route_starts = np.flatnonzero(np.r_[True, slot_route[1:] != slot_route[:-1]])
+            route_best = np.sort(np.minimum.reduceat(costs, route_starts, axis=1), axis=1)
+            k = min(self.regret_k, len(routes))
+            best = route_best[:, :k]
+            first = np.where(np.isfinite(best[:, :1]), best[:, :1], 0)
+            regret = (np.where(np.isfinite(best), best, first + 1e6) - first).sum(axis=1)
+            regret[~np.isfinite(best[:, 0])] = -np.inf
+
+            choice = int(np.argmax(regret))
+            i = pending.pop(choice)
+            self._try_insert(routes, i, costs[choice], slot_route, slot_pos)
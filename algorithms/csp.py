@@ -1,21 +1,30 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 from models.drone import Drone
 from models.no_fly_zone import NoFlyZone
 from models.delivery import Delivery
-from algorithms.a_star import AStarPathfinder
 from models.graph import DeliveryGraph
+from algorithms.a_star import AStarPathfinder, HeuristicCache
+from models.problem_context import ProblemContext
 from utils.helpers import calculate_distance, calculate_energy_consumption
 
 class CSPSolverWithAStar:
 
-    def __init__(self, drones: List[Drone], deliveries: List[Delivery], no_fly_zones: List[NoFlyZone]):
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], no_fly_zones: List[NoFlyZone],
+                 heuristic_cache: Optional[HeuristicCache] = None, context: Optional[ProblemContext] = None):
         self.drones = drones
         self.deliveries = deliveries
         self.no_fly_zones = no_fly_zones
         self.assignments = {}
         self.routes = {}
         self.violation_logs = []
-        self.graph = DeliveryGraph(deliveries, no_fly_zones)
+        self.heuristic_cache = heuristic_cache
+        # Bağlam verilirse simülasyonun grafı yeniden oluşturulmadan kullanılır
+        self.context = context if context is not None else ProblemContext(drones, deliveries, no_fly_zones)
+
+    @property
+    def graph(self) -> DeliveryGraph:
+        """Bağlamın güncel grafı; ilk erişimde oluşturulur"""
+        return self.context.graph
 
     def solve(self) -> Dict[int, List[int]]:
         unvisited = set(d.id for d in self.deliveries)
@@ -28,7 +37,7 @@ class CSPSolverWithAStar:
             route = []
 
             while unvisited:
-                pathfinder = AStarPathfinder(self.graph, drone)
+                pathfinder = AStarPathfinder(self.graph, drone, heuristic_cache=self.heuristic_cache)
                 best_path = pathfinder.find_path(drone.current_pos, unvisited, current_time)
 
                 if not best_path:
@@ -36,7 +45,7 @@ class CSPSolverWithAStar:
                     break
 
                 delivery_id = best_path[0]
-                delivery = next(d for d in self.deliveries if d.id == delivery_id)
+                delivery = self.graph.deliveries[delivery_id]
 
                 if delivery.weight > drone.max_weight:
                     self.violation_logs.append(f"Drone {drone.id} ağırlık sınırı aşıldı (teslimat {delivery.id}).")
@@ -1,69 +1,191 @@
 import random
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from dataclasses import dataclass
+from time import perf_counter
+from typing import List, Dict, Optional, Tuple
 from models.drone import Drone
 from models.delivery import Delivery
 from models.graph import DeliveryGraph
-from utils.helpers import calculate_distance, calculate_energy_consumption, line_intersects_polygon, point_in_polygon
+from models.problem_context import ProblemContext
+from algorithms.ga_batch import BatchFitnessEvaluator
+from algorithms.route_evaluator import RouteEvaluator
+from algorithms.seeding import nearest_feasible_routes, savings_routes
+from utils.helpers import calculate_distance, calculate_energy_consumption
+
+@dataclass
+class RouteTail:
+    """Oluşturulan rotanın son durumu: konum, zaman ve batarya"""
+    pos: Tuple[float, float]
+    time: float
+    battery: float
+
+class Chromosome(dict):
+    """Drone id -> rota sözlüğü; değişen rotalar için kirli (dirty) işaretleri taşır"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty = set(self.keys())
+        self.route_scores = {}  # drone_id -> (teslimat, enerji, ihlal)
+
+    def copy(self) -> 'Chromosome':
+        clone = Chromosome((drone_id, list(route)) for drone_id, route in self.items())
+        clone.dirty = set(self.dirty)
+        clone.route_scores = dict(self.route_scores)
+        return clone
 
 class GeneticAlgorithm:
-    def __init__(self, drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
-                 population_size: int = 30, generations: int = 75, start_time: float = 0):
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], graph: Optional[DeliveryGraph],
+                 population_size: int = 30, generations: int = 75, start_time: float = 0,
+                 fitness_cache_size: int = 50000, batch_fitness: bool = False,
+                 workers: int = 0, seed: Optional[int] = None,
+                 mutation_weights: Optional[Dict[str, float]] = None, crossover_method: str = 'cut',
+                 time_budget: Optional[float] = None, stagnation_generations: Optional[int] = None,
+                 min_diversity: Optional[float] = None, target_fitness: Optional[float] = None,
+                 seed_fraction: float = 0.0, seed_solutions: Optional[List[Dict[int, List[int]]]] = None,
+                 context: Optional[ProblemContext] = None, neighbour_repair: bool = False):
         self.drones = drones
         self.deliveries = deliveries
-        self.graph = graph
+        # context verilirse graf ve uyumluluk her kullanımda bağlamdan okunur (graph None olabilir)
+        self.context = context
+        self._graph = graph
         self.population_size = population_size
         self.generations = generations
         self.start_time = start_time  # Simülasyon başlangıç zamanı
 
+        self._drone_map = {d.id: d for d in drones}
+
+        # seed verilirse algoritmaya ait üreteç, yoksa global random modülü
+        self.random = random.Random(seed) if seed is not None else random
+
+        # İlk popülasyonun bu oranı sezgisel çözümlerden (dış çözümler, savings, greedy) oluşturulur
+        self.seed_fraction = seed_fraction
+        self.seed_solutions = list(seed_solutions) if seed_solutions else []
+
+        # Durdurma kriterleri (birleştirilebilir): süre (saniye), en iyi skorun iyileşmediği
+        # jenerasyon sayısı, farklı birey oranı alt sınırı ve hedef fitness
+        self.time_budget = time_budget
+        self.stagnation_generations = stagnation_generations
+        self.min_diversity = min_diversity
+        self.target_fitness = target_fitness
+        self.generation_scores = []
+        self.stop_reason = None
+        self.elapsed_time = 0
+
+        # Crossover operatörü: 'cut' (rota bazlı kesme), 'ox' (order) veya 'pmx' (partially mapped)
+        if crossover_method not in ('cut', 'ox', 'pmx'):
+            raise ValueError(f"Bilinmeyen crossover yöntemi: {crossover_method}")
+        self.crossover_method = crossover_method
+
+        # Operatörler için önceden ayrılmış tamponlar; üyelik testi damga (stamp) dizisiyle O(1)
+        n = len(deliveries)
+        self._delivery_index = {d.id: i for i, d in enumerate(deliveries)}
+        self._tour_buffer = [0] * n
+        self._position = [0] * n
+        self._seen = [0] * n
+        self._stamp = 0
+
+        # Mutasyon türü -> seçilme ağırlığı, None ise hepsi eşit olasılıklı
+        self.mutation_weights = mutation_weights
+
+        # workers > 0 ise fitness hesapları süreç havuzunda yapılır
+        self.workers = workers
+        self._executor = None
+
+        # Popülasyon fitness değerlerini dizi kodlamasıyla toplu hesaplama
+        self.batch_fitness = batch_fitness
+        self._batch_evaluator = None
+
+        # Rota puanlama; (drone_id, rota) -> rota skoru sınırlı LRU önbellekte tutulur
+        self.fitness_cache_size = fitness_cache_size
+        self.route_evaluator = RouteEvaluator(drones, graph, start_time, fitness_cache_size, context)
+        self.cache_history = []  # Jenerasyon başına önbellek isabet oranı
+
+        # Onarımda önce rotası teslimatın graf komşularından biriyle biten dronelar denenir
+        self.neighbour_repair = neighbour_repair
+
+        # Her teslimat için ağırlık kapasitesi yeten dronelar (bağlam yoksa)
+        if context is None:
+            self._own_capable_drones = {
+                d.id: [drone for drone in drones if d.weight <= drone.max_weight] for d in deliveries
+            }
+
+    @property
+    def graph(self) -> DeliveryGraph:
+        return self.context.graph if self.context is not None else self._graph
+
+    @property
+    def cache_hits(self) -> int:
+        return self.route_evaluator.hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self.route_evaluator.misses
+
+    @property
+    def _capable_drones(self) -> Dict[int, List[Drone]]:
+        return self.context.capable_drones if self.context is not None else self._own_capable_drones
+
     def create_individual(self) -> Dict[int, List[int]]:
         """Rastgele bir birey (çözüm) oluşturma"""
-        individual = {d.id: [] for d in self.drones}
+        individual = Chromosome((d.id, []) for d in self.drones)
+        tails = {d.id: self._new_tail(d) for d in self.drones}
         delivery_ids = [d.id for d in self.deliveries]
-        random.shuffle(delivery_ids)
+        self.random.shuffle(delivery_ids)
+        deliveries, capable_drones = self.graph.deliveries, self._capable_drones
 
         for delivery_id in delivery_ids:
-            delivery = self.graph.deliveries[delivery_id]
+            delivery = deliveries[delivery_id]
 
             # Ağırlık kapasitesi uygun olan dronelar
-            candidates = [d for d in self.drones if delivery.weight <= d.max_weight]
+            candidates = capable_drones[delivery_id]
 
             if candidates:
                 # Zaman kontrolü
                 valid_candidates = []
                 for drone in candidates:
-                    if self._can_deliver_in_time(drone, delivery, individual[drone.id]):
+                    if self._can_append(drone, delivery, tails[drone.id]):
                         valid_candidates.append(drone)
 
                 chosen_candidates = valid_candidates if valid_candidates else candidates
-                chosen = random.choice(chosen_candidates)
+                chosen = self.random.choice(chosen_candidates)
                 individual[chosen.id].append(delivery_id)
+                self._advance_tail(chosen, delivery, tails[chosen.id])
 
         return individual
 
-    def _can_deliver_in_time(self, drone: Drone, delivery: Delivery, current_route: List[int]) -> bool:
-        """Drone'un bu teslimatı zamanında yapıp yapamayacağını kontrol etme"""
-        current_pos = drone.start_pos
-        current_time = self.start_time
-        current_battery = drone.battery
+    def _new_tail(self, drone: Drone) -> RouteTail:
+        return RouteTail(drone.start_pos, self.start_time, drone.battery)
 
-        for delivery_id in current_route:
-            route_delivery = self.graph.deliveries[delivery_id]
-            distance = calculate_distance(current_pos, route_delivery.pos)
-            energy = calculate_energy_consumption(distance, route_delivery.weight)
+    def _route_tail(self, drone: Drone, route: List[int]) -> RouteTail:
+        """Rotanın sonundaki konum, zaman ve batarya durumu"""
+        tail = self._new_tail(drone)
+        deliveries = self.graph.deliveries
+        for delivery_id in route:
+            self._advance_tail(drone, deliveries[delivery_id], tail)
+        return tail
 
-            if energy > current_battery:
-                # Şarj
-                current_battery = drone.battery
-                current_time += 5  # 5 dakika
+    def _advance_tail(self, drone: Drone, delivery: Delivery, tail: RouteTail):
+        """Rotaya teslimat eklendiğinde kuyruk durumunu O(1) güncelleme"""
+        distance = calculate_distance(tail.pos, delivery.pos)
+        energy = calculate_energy_consumption(distance, delivery.weight)
 
-            current_time += distance / drone.speed
-            current_battery -= energy
-            current_pos = route_delivery.pos
+        if energy > tail.battery:
+            # Şarj
+            tail.battery = drone.battery
+            tail.time += 5  # 5 dakika
 
-        distance = calculate_distance(current_pos, delivery.pos)
+        tail.time += distance / drone.speed
+        tail.battery -= energy
+        tail.pos = delivery.pos
+
+    def _can_append(self, drone: Drone, delivery: Delivery, tail: RouteTail) -> bool:
+        """Teslimat rotanın sonuna eklenirse zamanında yapılabilir mi (O(1))"""
+        distance = calculate_distance(tail.pos, delivery.pos)
         energy = calculate_energy_consumption(distance, delivery.weight)
 
-        if energy > current_battery:
+        current_time = tail.time
+        if energy > tail.battery:
             current_time += 5
 
         arrival_time = current_time + (distance / drone.speed)
@@ -71,101 +193,69 @@ class GeneticAlgorithm:
         # Zaman kontrolü
         return delivery.time_window[0] <= arrival_time <= delivery.time_window[1]
 
+    def _can_deliver_in_time(self, drone: Drone, delivery: Delivery, current_route: List[int]) -> bool:
+        """Drone'un bu teslimatı zamanında yapıp yapamayacağını kontrol etme"""
+        return self._can_append(drone, delivery, self._route_tail(drone, current_route))
+
     def fitness(self, individual: Dict[int, List[int]]) -> float:
         """fitness = (teslimat sayisi x 50) - (toplam enerji x 0.1) - (ihlal edilen kısıt x 100)"""
         delivery_count = 0
         total_energy = 0
         total_violations = 0
-        delivery_map = {d.id: d for d in self.deliveries}
 
         for drone_id, route in individual.items():
-            drone = next(d for d in self.drones if d.id == drone_id)
-            current_pos = drone.start_pos
-            current_battery = drone.battery
-            current_time = self.start_time
-
-            for delivery_id in route:
-                delivery = delivery_map[delivery_id]
-                distance = calculate_distance(current_pos, delivery.pos)
-                energy_needed = calculate_energy_consumption(distance, delivery.weight)
-
-                # Ağırlık kontrolü
-                if delivery.weight > drone.max_weight:
-                    total_violations += 1
-                    continue
+            count, energy, violations = self._cached_route_fitness(individual, drone_id, route)
+            delivery_count += count
+            total_energy += energy
+            total_violations += violations
 
-                # Enerji kontrolü
-                if energy_needed > current_battery:
-                    # Şarj
-                    current_battery = drone.battery
-                    current_time += 5  # 5 dakika
+        final_score = RouteEvaluator.score(delivery_count, total_energy, total_violations)
 
-                    if energy_needed > current_battery:
-                        total_violations += 1
-                        continue
+        return final_score
 
-                # Seyahat ve varış zamanı hesaplama
-                travel_time = distance / drone.speed
-                arrival_time = current_time + travel_time
+    def _cached_route_fitness(self, individual: Dict[int, List[int]], drone_id: int,
+                              route: List[int]) -> Tuple[int, float, int]:
+        """Değişmeyen rotalar için bireydeki skor, değilse değerlendiricinin LRU önbelleği kullanılır"""
+        if isinstance(individual, Chromosome):
+            if drone_id not in individual.dirty and drone_id in individual.route_scores:
+                self.route_evaluator.hits += 1
+                return individual.route_scores[drone_id]
 
-                # Zaman kontrolü
-                if arrival_time < delivery.time_window[0]:
-                    # Çok erken varış - bekleme süresi
-                    current_time = delivery.time_window[0]
-                elif arrival_time > delivery.time_window[1]:
-                    # Geç varış - ihlal
-                    total_violations += 1
-                    current_time = arrival_time
-                else:
-                    # Zamanında varış
-                    current_time = arrival_time
-
-                # No-fly zone kontrolü
-                nfz_violation = False
-
-                # Rota no-fly zone kontrolü
-                for nfz in self.graph.no_fly_zones:
-                    if nfz.active_time[0] <= current_time <= nfz.active_time[1]:
-                        if line_intersects_polygon(current_pos, delivery.pos, nfz.coordinates):
-                            total_violations += 1
-                            nfz_violation = True
-                            break
-
-                # Varış noktası no-fly zone kontrolü
-                if not nfz_violation:
-                    for nfz in self.graph.no_fly_zones:
-                        if nfz.active_time[0] <= current_time <= nfz.active_time[1]:
-                            if point_in_polygon(delivery.pos, nfz.coordinates):
-                                total_violations += 1
-                                nfz_violation = True
-                                break
-
-                if not nfz_violation and arrival_time <= delivery.time_window[1]:
-                    delivery_count += 1
-
-                current_battery -= energy_needed
-                total_energy += energy_needed
-                current_pos = delivery.pos
-
-        final_score = (delivery_count * 50) - (total_energy * 0.1) - (total_violations * 100)
+        score = self.route_evaluator.cached_route_fitness(drone_id, route)
 
-        return final_score
+        if isinstance(individual, Chromosome):
+            individual.route_scores[drone_id] = score
+            individual.dirty.discard(drone_id)
+
+        return score
 
     def crossover(self, parent1: Dict[int, List[int]], parent2: Dict[int, List[int]]) -> Dict[int, List[int]]:
-        child = {drone_id: [] for drone_id in parent1.keys()}
+        if self.crossover_method == 'ox':
+            return self._order_crossover(parent1, parent2)
+        if self.crossover_method == 'pmx':
+            return self._pmx_crossover(parent1, parent2)
+
+        child = Chromosome((drone_id, []) for drone_id in parent1.keys())
         all_deliveries = set(d.id for d in self.deliveries)
         assigned_deliveries = set()
+        seen, index = self._seen, self._delivery_index
 
         for drone_id in parent1.keys():
             route1 = parent1[drone_id]
             route2 = parent2[drone_id]
 
             if route1 and route2:
-                cross_point1 = random.randint(0, len(route1))
-                cross_point2 = random.randint(0, len(route2))
+                cross_point1 = self.random.randint(0, len(route1))
+                cross_point2 = self.random.randint(0, len(route2))
 
                 child_route = route1[:cross_point1]
-                child_route.extend([d for d in route2[cross_point2:] if d not in child_route])
+                stamp = self._next_stamp()
+                for d in child_route:
+                    seen[index[d]] = stamp
+                for d in route2[cross_point2:]:
+                    if seen[index[d]] != stamp:
+                        seen[index[d]] = stamp
+                        child_route.append(d)
 
             elif route1:
                 child_route = route1[:len(route1) // 2]
@@ -177,28 +267,138 @@ class GeneticAlgorithm:
             child[drone_id] = child_route
             assigned_deliveries.update(child_route)
 
-        missing_deliveries = all_deliveries - assigned_deliveries
+        return self._repair(child, all_deliveries - assigned_deliveries)
+
+    def _order_crossover(self, parent1: Dict[int, List[int]], parent2: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        """Dev tur üzerinde doğrusal zamanlı order crossover (OX)"""
+        tour1, lengths = self._giant_tour(parent1)
+        tour2, _ = self._giant_tour(parent2)
+        size = len(tour1)
+        a = self.random.randint(0, size)
+        b = self.random.randint(a, size)
+
+        child, seen, index = self._tour_buffer, self._seen, self._delivery_index
+        stamp = self._next_stamp()
+        for i in range(a, b):
+            child[i] = tour1[i]
+            seen[index[tour1[i]]] = stamp
+
+        # Kalan pozisyonlar b'den itibaren döngüsel olarak ikinci ebeveynin sırasıyla doldurulur,
+        # ebeveynlerin teslimat kümeleri farklıysa birinci ebeveynin artanları kullanılır
+        positions = chain(range(b, size), range(a))
+        pivot = min(b, len(tour2))
+        position = next(positions, None)
+        for d in chain(tour2[pivot:], tour2[:pivot], tour1):
+            if position is None:
+                break
+            if seen[index[d]] != stamp:
+                seen[index[d]] = stamp
+                child[position] = d
+                position = next(positions, None)
+
+        return self._split_tour(parent1, size, lengths)
+
+    def _pmx_crossover(self, parent1: Dict[int, List[int]], parent2: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        """Dev tur üzerinde doğrusal zamanlı partially mapped crossover (PMX)"""
+        tour1, lengths = self._giant_tour(parent1)
+        tour2, _ = self._giant_tour(parent2)
+        size = len(tour1)
+
+        # PMX aynı teslimat kümesini gerektirir, değilse OX kullanılır
+        seen, index = self._seen, self._delivery_index
+        stamp = self._next_stamp()
+        for d in tour1:
+            seen[index[d]] = stamp
+        if len(tour2) != size or any(seen[index[d]] != stamp for d in tour2):
+            return self._order_crossover(parent1, parent2)
+
+        a = self.random.randint(0, size)
+        b = self.random.randint(a, size)
+
+        # Çocuk ikinci ebeveynden başlar; segmentteki her eleman yer değiştirmeyle yerine taşınır
+        child, position = self._tour_buffer, self._position
+        for i, d in enumerate(tour2):
+            child[i] = d
+            position[index[d]] = i
+        for i in range(a, b):
+            d = tour1[i]
+            j = position[index[d]]
+            if j != i:
+                other = child[i]
+                child[i], child[j] = d, other
+                position[index[d]], position[index[other]] = i, j
+
+        return self._split_tour(parent1, size, lengths)
+
+    def _next_stamp(self) -> int:
+        self._stamp += 1
+        return self._stamp
+
+    def _giant_tour(self, individual: Dict[int, List[int]]) -> Tuple[List[int], List[int]]:
+        """Drone sırasıyla birleştirilmiş rota ve rota uzunlukları"""
+        tour = []
+        lengths = []
+        for drone in self.drones:
+            route = individual.get(drone.id, [])
+            tour.extend(route)
+            lengths.append(len(route))
+        return tour, lengths
+
+    def _split_tour(self, parent: Dict[int, List[int]], size: int, lengths: List[int]) -> Dict[int, List[int]]:
+        """Tampondaki dev turu ebeveynin rota uzunluklarıyla bölme; kapasite aşımı ve eksikler onarılır"""
+        child = Chromosome((drone_id, []) for drone_id in parent.keys())
+        child_tour, seen, index = self._tour_buffer, self._seen, self._delivery_index
+        stamp = self._next_stamp()
+
+        start = 0
+        deliveries = self.graph.deliveries
+        for drone, length in zip(self.drones, lengths):
+            route = child[drone.id]
+            for d in child_tour[start:start + length]:
+                if deliveries[d].weight <= drone.max_weight:
+                    route.append(d)
+                    seen[index[d]] = stamp
+            start += length
+
+        missing = [d.id for d in self.deliveries if seen[index[d.id]] != stamp]
+        return self._repair(child, missing)
+
+    def _repair(self, child: Dict[int, List[int]], missing_deliveries) -> Dict[int, List[int]]:
+        """Eksik teslimatları zamanında yapabilecek (yoksa kapasitesi yeten) drone'a ekleme"""
+        tails = {drone.id: self._route_tail(drone, child[drone.id]) for drone in self.drones}
         for delivery_id in missing_deliveries:
             delivery = self.graph.deliveries[delivery_id]
 
             suitable_drones = []
-            for drone in self.drones:
-                if (delivery.weight <= drone.max_weight and
-                        self._can_deliver_in_time(drone, delivery, child[drone.id])):
-                    suitable_drones.append(drone)
+            if self.neighbour_repair:
+                near = set(self.graph.neighbours(delivery_id))
+                for drone in self._capable_drones[delivery_id]:
+                    route = child[drone.id]
+                    if route and route[-1] in near and self._can_append(drone, delivery, tails[drone.id]):
+                        suitable_drones.append(drone)
+
+            if not suitable_drones:
+                for drone in self._capable_drones[delivery_id]:
+                    if self._can_append(drone, delivery, tails[drone.id]):
+                        suitable_drones.append(drone)
 
             if not suitable_drones:
-                suitable_drones = [d for d in self.drones if delivery.weight <= d.max_weight]
+                suitable_drones = self._capable_drones[delivery_id]
 
             if suitable_drones:
-                chosen_drone = random.choice(suitable_drones)
+                chosen_drone = self.random.choice(suitable_drones)
                 child[chosen_drone.id].append(delivery_id)
+                self._advance_tail(chosen_drone, delivery, tails[chosen_drone.id])
 
         return child
 
     def mutate(self, individual: Dict[int, List[int]]) -> Dict[int, List[int]]:
         """Çoklu mutasyon türleri"""
-        mutation_type = random.choice(['swap', 'move', 'reverse', 'shuffle'])
+        if self.mutation_weights:
+            types = list(self.mutation_weights)
+            mutation_type = self.random.choices(types, weights=[self.mutation_weights[t] for t in types])[0]
+        else:
+            mutation_type = self.random.choice(['swap', 'move', 'reverse', 'shuffle'])
 
         if mutation_type == 'swap':
             # İki farklı drone arasında teslimat değiş tokuşu
@@ -222,37 +422,37 @@ class GeneticAlgorithm:
         """İki drone arasında teslimat değiş tokuşu"""
         drone_ids = [did for did, route in individual.items() if route]
         if len(drone_ids) >= 2:
-            d1, d2 = random.sample(drone_ids, 2)
+            d1, d2 = self.random.sample(drone_ids, 2)
             if individual[d1] and individual[d2]:
-                i1 = random.randint(0, len(individual[d1]) - 1)
-                i2 = random.randint(0, len(individual[d2]) - 1)
+                i1 = self.random.randint(0, len(individual[d1]) - 1)
+                i2 = self.random.randint(0, len(individual[d2]) - 1)
 
                 # Kapasite kontrolü
                 delivery1 = self.graph.deliveries[individual[d1][i1]]
                 delivery2 = self.graph.deliveries[individual[d2][i2]]
-                drone1 = next(d for d in self.drones if d.id == d1)
-                drone2 = next(d for d in self.drones if d.id == d2)
+                drone1 = self._drone_map[d1]
+                drone2 = self._drone_map[d2]
 
                 if (delivery1.weight <= drone2.max_weight and
                         delivery2.weight <= drone1.max_weight):
                     individual[d1][i1], individual[d2][i2] = individual[d2][i2], individual[d1][i1]
+                    self._mark_dirty(individual, d1, d2)
 
     def _move_delivery(self, individual: Dict[int, List[int]]):
         """Teslimatı bir drone'dan diğerine taşıma"""
         source_drones = [did for did, route in individual.items() if route]
         if source_drones:
-            source_drone = random.choice(source_drones)
-            delivery_idx = random.randint(0, len(individual[source_drone]) - 1)
+            source_drone = self.random.choice(source_drones)
+            delivery_idx = self.random.randint(0, len(individual[source_drone]) - 1)
             delivery_id = individual[source_drone].pop(delivery_idx)
 
             # Hedef drone
-            delivery = self.graph.deliveries[delivery_id]
-            target_candidates = [d for d in self.drones
-                                 if d.id != source_drone and delivery.weight <= d.max_weight]
+            target_candidates = [d for d in self._capable_drones[delivery_id] if d.id != source_drone]
 
             if target_candidates:
-                target_drone = random.choice(target_candidates)
+                target_drone = self.random.choice(target_candidates)
                 individual[target_drone.id].append(delivery_id)
+                self._mark_dirty(individual, source_drone, target_drone.id)
             else:
                 # Geri koy
                 individual[source_drone].insert(delivery_idx, delivery_id)
@@ -261,77 +461,240 @@ class GeneticAlgorithm:
         """Rota segmentini ters çevirme"""
         drone_ids = [did for did, route in individual.items() if len(route) > 1]
         if drone_ids:
-            drone_id = random.choice(drone_ids)
+            drone_id = self.random.choice(drone_ids)
             route = individual[drone_id]
-            start = random.randint(0, len(route) - 2)
-            end = random.randint(start + 1, len(route))
+            start = self.random.randint(0, len(route) - 2)
+            end = self.random.randint(start + 1, len(route))
             individual[drone_id][start:end] = reversed(individual[drone_id][start:end])
+            self._mark_dirty(individual, drone_id)
 
     def _shuffle_route_segment(self, individual: Dict[int, List[int]]):
         """Rota segmentini karıştırma"""
         drone_ids = [did for did, route in individual.items() if len(route) > 2]
         if drone_ids:
-            drone_id = random.choice(drone_ids)
+            drone_id = self.random.choice(drone_ids)
             route = individual[drone_id]
-            start = random.randint(0, len(route) - 3)
-            end = random.randint(start + 2, len(route))
+            start = self.random.randint(0, len(route) - 3)
+            end = self.random.randint(start + 2, len(route))
             segment = individual[drone_id][start:end]
-            random.shuffle(segment)
+            self.random.shuffle(segment)
             individual[drone_id][start:end] = segment
+            self._mark_dirty(individual, drone_id)
+
+    @staticmethod
+    def _mark_dirty(individual: Dict[int, List[int]], *drone_ids: int):
+        """Değişen rotaların skorunun yeniden hesaplanması için işaretleme"""
+        if isinstance(individual, Chromosome):
+            individual.dirty.update(drone_ids)
 
     def run(self) -> Dict[int, List[int]]:
         """Ana genetik algoritma döngüsü"""
+        return self.run_detailed()['best_individual']
+
+    def run_detailed(self) -> Dict:
+        """En iyi birey, jenerasyon skorları ve durma nedeni ile genetik algoritma"""
         print(f"Genetik Algoritma başlatılıyor: {self.population_size} birey, {self.generations} jenerasyon")
 
+        self.cache_history = []
+
+        try:
+            best_individual, best_score = self._run()
+        finally:
+            self._shutdown_executor()
+
+        return {
+            'best_individual': best_individual,
+            'best_score': best_score,
+            'generation_scores': self.generation_scores,
+            'generations_run': len(self.generation_scores),
+            'stop_reason': self.stop_reason,
+            'elapsed_time': self.elapsed_time
+        }
+
+    def _run(self) -> Tuple[Dict[int, List[int]], float]:
+        start = perf_counter()
+        self.generation_scores = []
+        self.stop_reason = 'generations'
+
         # İlk popülasyon
-        population = [self.create_individual() for _ in range(self.population_size)]
+        population = self.initial_population()
         best_individual = None
         best_score = float('-inf')
-        generation_scores = []
+        best_generation = 0
 
         for generation in range(self.generations):
             # Fitness
-            evaluated_population = [(individual, self.fitness(individual)) for individual in population]
-            evaluated_population.sort(key=lambda x: x[1], reverse=True)
+            evaluated_population = self.evaluate_generation(population, generation)
 
             # En iyi bireyi güncelle
             current_best_score = evaluated_population[0][1]
             if current_best_score > best_score:
                 best_score = current_best_score
                 best_individual = evaluated_population[0][0].copy()
-
-            generation_scores.append(current_best_score)
-
-            # Seçilim
-            elite_size = max(2, self.population_size // 10)
-            survivors = [ind for ind, _ in evaluated_population[:elite_size]]
-
-            # Yeni popülasyon
-            new_population = survivors.copy()
-
-            # Turnuva seçimi ile ebeveyn seçimi
-            tournament_size = 3
-            while len(new_population) < self.population_size:
-                # Ebeveyn seçimi
-                parent1 = self._tournament_selection(evaluated_population, tournament_size)
-                parent2 = self._tournament_selection(evaluated_population, tournament_size)
-
-                # Crossover
-                child = self.crossover(parent1, parent2)
-
-                # Mutasyon
-                if random.random() < 0.15:
-                    child = self.mutate(child)
-
-                new_population.append(child)
-
-            population = new_population
-
-        return best_individual
+                best_generation = generation
+
+            self.generation_scores.append(current_best_score)
+
+            self.stop_reason = self._stop_reason(evaluated_population, generation, best_score,
+                                                 best_generation, perf_counter() - start)
+            if self.stop_reason:
+                break
+            self.stop_reason = 'generations'
+
+            population = self.next_generation(evaluated_population)
+
+        self.elapsed_time = perf_counter() - start
+        return best_individual, best_score
+
+    def _stop_reason(self, evaluated_population: List[Tuple[Dict[int, List[int]], float]], generation: int,
+                     best_score: float, best_generation: int, elapsed: float) -> Optional[str]:
+        """Sağlanan ilk durdurma kriterinin adı, yoksa None"""
+        if self.target_fitness is not None and best_score >= self.target_fitness:
+            return 'target_fitness'
+        if self.stagnation_generations is not None and generation - best_generation >= self.stagnation_generations:
+            return 'stagnation'
+        if self.min_diversity is not None and self.diversity(evaluated_population) < self.min_diversity:
+            return 'diversity'
+        if self.time_budget is not None and elapsed >= self.time_budget:
+            return 'time_budget'
+        return None
+
+    @staticmethod
+    def diversity(evaluated_population: List[Tuple[Dict[int, List[int]], float]]) -> float:
+        """Popülasyondaki birbirinden farklı bireylerin oranı"""
+        if not evaluated_population:
+            return 0
+        unique = {tuple(tuple(route) for route in individual.values()) for individual, _ in evaluated_population}
+        return len(unique) / len(evaluated_population)
+
+    def initial_population(self) -> List[Dict[int, List[int]]]:
+        """Sezgisel tohum bireyler ve kalan kısmı çeşitlilik için rastgele bireyler"""
+        seed_count = min(self.population_size, int(round(self.seed_fraction * self.population_size)))
+        population = self.seeded_individuals(seed_count)
+        while len(population) < self.population_size:
+            population.append(self.create_individual())
+        return population
+
+    def seeded_individuals(self, count: int) -> List[Dict[int, List[int]]]:
+        """Dış çözümler (ör. A* rotaları), savings ve rastgeleleştirilmiş greedy ile bireyler"""
+        individuals = []
+        for routes in self.seed_solutions[:count]:
+            individuals.append(self._as_individual(routes))
+        if len(individuals) < count:
+            individuals.append(self._as_individual(savings_routes(self.drones, self.deliveries, self.graph)))
+        while len(individuals) < count:
+            individuals.append(self._as_individual(nearest_feasible_routes(
+                self.drones, self.deliveries, self.graph, self.start_time, self.random)))
+        return individuals
+
+    def _as_individual(self, routes: Dict[int, List[int]]) -> Dict[int, List[int]]:
+        """Rota sözlüğünü geçerli bir bireye çevirme: bilinmeyen, tekrar eden ve taşınamayan
+        teslimatlar çıkarılır, eksikler onarım ile eklenir"""
+        individual = Chromosome((drone.id, []) for drone in self.drones)
+        seen, index = self._seen, self._delivery_index
+        stamp = self._next_stamp()
+
+        for drone in self.drones:
+            for delivery_id in routes.get(drone.id, []):
+                i = index.get(delivery_id)
+                if i is None or seen[i] == stamp:
+                    continue
+                if self.graph.deliveries[delivery_id].weight <= drone.max_weight:
+                    individual[drone.id].append(delivery_id)
+                    seen[i] = stamp
+
+        missing = [d.id for d in self.deliveries if seen[index[d.id]] != stamp]
+        return self._repair(individual, missing)
+
+    def evaluate_generation(self, population: List[Dict[int, List[int]]],
+                            generation: int) -> List[Tuple[Dict[int, List[int]], float]]:
+        """Popülasyonu değerlendirip fitness'a göre azalan sırada döndürme"""
+        hits_before, misses_before = self.cache_hits, self.cache_misses
+        evaluated_population = list(zip(population, self.evaluate_population(population)))
+        evaluated_population.sort(key=lambda x: x[1], reverse=True)
+        self._record_cache_stats(generation, hits_before, misses_before)
+        return evaluated_population
+
+    def next_generation(self, evaluated_population: List[Tuple[Dict[int, List[int]], float]]
+                        ) -> List[Dict[int, List[int]]]:
+        """Elitizm, turnuva seçimi, crossover ve mutasyon ile yeni popülasyon"""
+        # Seçilim
+        elite_size = max(2, self.population_size // 10)
+        survivors = [ind for ind, _ in evaluated_population[:elite_size]]
+
+        # Yeni popülasyon
+        new_population = survivors.copy()
+
+        # Turnuva seçimi ile ebeveyn seçimi
+        tournament_size = 3
+        while len(new_population) < self.population_size:
+            # Ebeveyn seçimi
+            parent1 = self._tournament_selection(evaluated_population, tournament_size)
+            parent2 = self._tournament_selection(evaluated_population, tournament_size)
+
+            # Crossover
+            child = self.crossover(parent1, parent2)
+
+            # Mutasyon
+            if self.random.random() < 0.15:
+                child = self.mutate(child)
+
+            new_population.append(child)
+
+        return new_population
+
+    def evaluate_population(self, population: List[Dict[int, List[int]]]) -> List[float]:
+        """Popülasyondaki tüm bireylerin fitness değerleri"""
+        if self.batch_fitness:
+            # Bağlamın grafı yenilendiyse değerlendirici de yeniden kurulur
+            if self._batch_evaluator is None or self._batch_evaluator.graph is not self.graph:
+                self._batch_evaluator = BatchFitnessEvaluator(self.drones, self.deliveries, self.graph,
+                                                              self.start_time, context=self.context)
+            return self._batch_evaluator.evaluate(population)
+        if self.workers > 0:
+            return self._evaluate_parallel(population)
+        return [self.fitness(individual) for individual in population]
+
+    def _evaluate_parallel(self, population: List[Dict[int, List[int]]]) -> List[float]:
+        """Popülasyonu sıralı parçalar halinde süreç havuzunda değerlendirme"""
+        if self._executor is None:
+            # Problem verisi her sürece yalnızca bir kez gönderilir
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.drones, self.deliveries, self.graph.no_fly_zones, self.graph.worker_args(),
+                          self.start_time, self.fitness_cache_size))
+
+        chunk_size = -(-len(population) // self.workers)
+        chunks = [[dict(individual) for individual in population[i:i + chunk_size]]
+                  for i in range(0, len(population), chunk_size)]
+
+        # map sırayı korur; fitness rastgelelik içermediğinden sonuç süreç sayısından bağımsızdır
+        scores = []
+        for chunk_scores, hits, misses in self._executor.map(_evaluate_chunk, chunks):
+            scores.extend(chunk_scores)
+            self.route_evaluator.hits += hits
+            self.route_evaluator.misses += misses
+        return scores
+
+    def _shutdown_executor(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _record_cache_stats(self, generation: int, hits_before: int, misses_before: int):
+        """Jenerasyondaki rota skoru önbellek isabet oranını kaydetme"""
+        hits = self.cache_hits - hits_before
+        misses = self.cache_misses - misses_before
+        self.cache_history.append({
+            'generation': generation,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0
+        })
 
     def _tournament_selection(self, evaluated_population: List, tournament_size: int):
         """Turnuva seçimi"""
-        tournament = random.sample(evaluated_population, min(tournament_size, len(evaluated_population)))
+        tournament = self.random.sample(evaluated_population, min(tournament_size, len(evaluated_population)))
         return max(tournament, key=lambda x: x[1])[0]
 
     def get_algorithm_statistics(self, solution: Dict[int, List[int]]) -> Dict:
@@ -345,4 +708,21 @@ class GeneticAlgorithm:
             'drone_utilization': active_drones / len(self.drones) * 100,
             'deliveries_per_drone': total_deliveries / active_drones if active_drones > 0 else 0,
             'final_fitness': self.fitness(solution)
-        }
\ No newline at end of file
+        }
+
+# Süreç havuzundaki her işçinin kendi GA kopyası ve rota önbelleği
+_worker_ga: Optional[GeneticAlgorithm] = None
+
+def _init_worker(drones: List[Drone], deliveries: List[Delivery], no_fly_zones: List, graph_args: Dict,
+                 start_time: float, fitness_cache_size: int):
+    """İşçi süreç başlatıcısı: grafı ana süreçteki ayarlarla (DeliveryGraph.worker_args()) bir kez kurar"""
+    global _worker_ga
+    graph = DeliveryGraph(deliveries, no_fly_zones, **graph_args)
+    _worker_ga = GeneticAlgorithm(drones, deliveries, graph, start_time=start_time,
+                                  fitness_cache_size=fitness_cache_size)
+
+def _evaluate_chunk(chunk: List[Dict[int, List[int]]]) -> Tuple[List[float], int, int]:
+    """Bir popülasyon parçasının fitness değerleri ve önbellek sayaçları"""
+    hits_before, misses_before = _worker_ga.cache_hits, _worker_ga.cache_misses
+    scores = [_worker_ga.fitness(individual) for individual in chunk]
+    return scores, _worker_ga.cache_hits - hits_before, _worker_ga.cache_misses - misses_before
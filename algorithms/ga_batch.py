@@ -0,0 +1,202 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from models.drone import Drone
+from models.delivery import Delivery
+from models.graph import DeliveryGraph
+from models.problem_context import ProblemContext
+from utils.helpers import calculate_energy_factor, points_in_polygon, segments_intersect_polygon
+
+class BatchFitnessEvaluator:
+    """Dizi kodlu kromozomlar için tüm popülasyonun fitness değerini NumPy ile hesaplama
+
+    Kromozom: drone sırasına göre birleştirilmiş dev tur (giant tour) permütasyonu ve
+    her drone rotasının başladığı bölme noktaları (splits). Mesafe ve enerji matris
+    toplamalarıyla, şarj/zaman penceresi mantığı ise tur pozisyonu boyunca tüm
+    popülasyon üzerinde vektörel bir döngüyle hesaplanır. context verilirse kaynak konumları ve
+    mesafe matrisi bağlamdan alınır.
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                 start_time: float = 0, context: Optional[ProblemContext] = None):
+        self.drones = drones
+        self.graph = graph
+        self.start_time = start_time
+
+        self.delivery_ids = [d.id for d in deliveries]
+        self.index = {d_id: i for i, d_id in enumerate(self.delivery_ids)}
+        self.drone_index = {d.id: i for i, d in enumerate(drones)}
+        n = len(deliveries)
+        self.n = n
+
+        # Teslimat özellikleri
+        positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+        self.weights = np.array([d.weight for d in deliveries], dtype=np.float64)
+        self.window_start = np.array([d.time_window[0] for d in deliveries], dtype=np.float64)
+        self.window_end = np.array([d.time_window[1] for d in deliveries], dtype=np.float64)
+        self.energy_factors = calculate_energy_factor(self.weights)
+
+        # Drone özellikleri
+        self.max_weights = np.array([d.max_weight for d in drones], dtype=np.float64)
+        self.batteries = np.array([d.battery for d in drones], dtype=np.float64)
+        self.speeds = np.array([d.speed for d in drones], dtype=np.float64)
+
+        # Kaynak düğümler: önce teslimatlar (0..n-1), sonra drone başlangıçları (n..n+m-1)
+        self.positions = positions
+        if context is not None:
+            self.origin_positions = context.origin_positions
+        else:
+            starts = np.array([d.start_pos for d in drones], dtype=np.float64).reshape(-1, 2)
+            self.origin_positions = np.vstack([positions, starts])
+
+        if graph.sparse:
+            # Seyrek grafta O(n²) dizi tutulmaz: mesafe ve NFZ kesişimi her adımda yalnızca
+            # popülasyonun o adımda kullandığı kenarlar için hesaplanır
+            self.distance_matrix = None
+            self.edge_slot = None
+            self.no_fly_zones = graph.no_fly_zones
+            self.target_inside = [points_in_polygon(positions, nfz.coordinates) for nfz in self.no_fly_zones]
+            return
+
+        if context is not None:
+            self.distance_matrix = context.origin_distance
+        else:
+            diff = self.origin_positions[:, None, :] - positions[None, :, :]
+            self.distance_matrix = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+
+        # NFZ'ye değen kenarların kapalı zaman aralıkları: kenar -> satır, (E, K) dizileri
+        self.origin_keys = [tuple(p) for p in self.origin_positions.tolist()]
+        table = graph.nfz_table
+        table.add_origins(self.origin_keys)
+        self.edge_slot = np.full(self.distance_matrix.shape, -1, dtype=np.int64)
+        intervals = []
+        for o, key in enumerate(self.origin_keys):
+            for d_id in table.row(key):
+                if d_id in self.index:
+                    self.edge_slot[o, self.index[d_id]] = len(intervals)
+                    intervals.append(table.blocked_intervals(key, d_id))
+
+        width = max((len(edge) for edge in intervals), default=0)
+        self.slot_starts = np.full((max(len(intervals), 1), max(width, 1)), np.inf)
+        self.slot_ends = np.full((max(len(intervals), 1), max(width, 1)), -np.inf)
+        for slot, edge in enumerate(intervals):
+            for k, (start, end) in enumerate(edge):
+                self.slot_starts[slot, k] = start
+                self.slot_ends[slot, k] = end
+
+    def _blocked_on_the_fly(self, origins: np.ndarray, targets: np.ndarray, t: np.ndarray) -> np.ndarray:
+        """Seyrek mod: t anında aktif bir NFZ'yi kesen ya da hedefi NFZ içinde kalan kenarlar"""
+        blocked = np.zeros(len(targets), dtype=bool)
+        starts, ends = self.origin_positions[origins], self.positions[targets]
+        for nfz, target_inside in zip(self.no_fly_zones, self.target_inside):
+            active_start, active_end = nfz.active_time
+            active = (active_start <= t) & (t <= active_end)
+            if not active.any():
+                continue
+            hits = target_inside[targets] | segments_intersect_polygon(starts, ends, nfz.coordinates)
+            blocked |= active & hits
+        return blocked
+
+    def encode(self, individual: Dict[int, List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Sözlük bireyi (dev tur, bölme noktaları) çiftine dönüştürme"""
+        tour = []
+        splits = [0]
+        for drone in self.drones:
+            tour.extend(self.index[d_id] for d_id in individual.get(drone.id, []))
+            splits.append(len(tour))
+        return np.array(tour, dtype=np.int64), np.array(splits, dtype=np.int64)
+
+    def decode(self, tour: np.ndarray, splits: np.ndarray) -> Dict[int, List[int]]:
+        """(dev tur, bölme noktaları) çiftini sözlük bireye dönüştürme"""
+        return {
+            drone.id: [self.delivery_ids[i] for i in tour[splits[k]:splits[k + 1]]]
+            for k, drone in enumerate(self.drones)
+        }
+
+    def encode_population(self, population: List[Dict[int, List[int]]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Popülasyonu (P, L) boyutlu tur ve drone dizilerine dönüştürme, boşluklar -1"""
+        encoded = [self.encode(individual) for individual in population]
+        width = max((len(tour) for tour, _ in encoded), default=0)
+        tours = np.full((len(population), width), -1, dtype=np.int64)
+        drone_of = np.full((len(population), width), -1, dtype=np.int64)
+
+        for p, (tour, splits) in enumerate(encoded):
+            tours[p, :len(tour)] = tour
+            drone_of[p, :len(tour)] = np.repeat(np.arange(len(self.drones)), np.diff(splits))
+
+        return tours, drone_of
+
+    def evaluate(self, population: List[Dict[int, List[int]]]) -> List[float]:
+        """Popülasyondaki her bireyin fitness değeri"""
+        tours, drone_of = self.encode_population(population)
+        return self.evaluate_arrays(tours, drone_of).tolist()
+
+    def evaluate_arrays(self, tours: np.ndarray, drone_of: np.ndarray) -> np.ndarray:
+        """fitness = (teslimat sayisi x 50) - (toplam enerji x 0.1) - (ihlal edilen kısıt x 100)"""
+        size, width = tours.shape
+
+        delivery_count = np.zeros(size)
+        total_energy = np.zeros(size)
+        total_violations = np.zeros(size)
+
+        prev = np.zeros(size, dtype=np.int64)
+        battery = np.zeros(size)
+        current_time = np.zeros(size)
+        previous_drone = np.full(size, -1, dtype=np.int64)
+
+        for j in range(width):
+            cur = tours[:, j]
+            drone = drone_of[:, j]
+            valid = cur >= 0
+            cur_safe = np.where(valid, cur, 0)
+            drone_safe = np.where(valid, drone, 0)
+
+            # Yeni rota başlangıcında drone durumunu sıfırla
+            first = valid & (drone != previous_drone)
+            prev = np.where(first, self.n + drone_safe, prev)
+            battery = np.where(first, self.batteries[drone_safe], battery)
+            current_time = np.where(first, self.start_time, current_time)
+            previous_drone = np.where(valid, drone, previous_drone)
+
+            if self.distance_matrix is None:
+                origin, destination = self.origin_positions[prev], self.positions[cur_safe]
+                distance = np.hypot(destination[:, 0] - origin[:, 0], destination[:, 1] - origin[:, 1])
+            else:
+                distance = self.distance_matrix[prev, cur_safe]
+            energy_needed = distance * self.energy_factors[cur_safe]
+
+            # Ağırlık kontrolü
+            weight_violation = valid & (self.weights[cur_safe] > self.max_weights[drone_safe])
+
+            # Enerji kontrolü ve şarj
+            recharge = valid & ~weight_violation & (energy_needed > battery)
+            battery = np.where(recharge, self.batteries[drone_safe], battery)
+            current_time = current_time + recharge * 5
+            energy_violation = recharge & (energy_needed > battery)
+
+            ok = valid & ~weight_violation & ~energy_violation
+
+            # Varış zamanı ve zaman penceresi
+            arrival_time = current_time + distance / self.speeds[drone_safe]
+            early = arrival_time < self.window_start[cur_safe]
+            late = ok & (arrival_time > self.window_end[cur_safe])
+            current_time = np.where(ok, np.where(early, self.window_start[cur_safe], arrival_time),
+                                    current_time)
+
+            # NFZ: kenarın kapalı aralıklarından biri varış anını içeriyor mu
+            if self.edge_slot is None:
+                blocked = ok & self._blocked_on_the_fly(prev, cur_safe, current_time)
+            else:
+                slot = self.edge_slot[prev, cur_safe]
+                slot_safe = np.where(slot >= 0, slot, 0)
+                t = current_time[:, None]
+                inside = (self.slot_starts[slot_safe] <= t) & (t <= self.slot_ends[slot_safe])
+                blocked = ok & (slot >= 0) & inside.any(axis=1)
+
+            total_violations += (weight_violation.astype(np.int64) + energy_violation + late + blocked)
+            delivery_count += ok & ~blocked & ~late
+
+            battery = np.where(ok, battery - energy_needed, battery)
+            total_energy += np.where(ok, energy_needed, 0)
+            prev = np.where(ok, cur_safe, prev)
+
+        return (delivery_count * 50) - (total_energy * 0.1) - (total_violations * 100)
@@ -0,0 +1,221 @@
+import multiprocessing
+import queue
+import random
+import traceback
+from typing import List, Dict, Optional, Tuple
+from models.drone import Drone
+from models.delivery import Delivery
+from models.graph import DeliveryGraph
+from algorithms.ga import Chromosome, GeneticAlgorithm
+
+POLL_INTERVAL = 0.5  # Sonuç kuyruğu ve süreç durumu kontrol aralığı (saniye)
+
+class Island:
+    """Tek bir adanın popülasyonu ve ilerleme durumu"""
+
+    def __init__(self, ga: GeneticAlgorithm):
+        self.ga = ga
+        self.population = ga.initial_population()
+        self.evaluated_population = []
+        self.generation = 0
+        self.best_individual = None
+        self.best_score = float('-inf')
+        self.generation_scores = []
+
+    def evolve(self, generations: int):
+        """Adayı verilen jenerasyon sayısı kadar ilerletme"""
+        for _ in range(generations):
+            self.evaluated_population = self.ga.evaluate_generation(self.population, self.generation)
+
+            current_best_individual, current_best_score = self.evaluated_population[0]
+            if current_best_score > self.best_score:
+                self.best_score = current_best_score
+                self.best_individual = current_best_individual.copy()
+
+            self.generation_scores.append(current_best_score)
+            self.population = self.ga.next_generation(self.evaluated_population)
+            self.generation += 1
+
+    def emigrants(self, count: int) -> List[Dict[int, List[int]]]:
+        """Son değerlendirmedeki en iyi bireylerin kopyaları"""
+        return [dict(individual) for individual, _ in self.evaluated_population[:count]]
+
+    def immigrate(self, individuals: List[Dict[int, List[int]]]):
+        """Gelen göçmenler yeni popülasyonun son bireylerinin yerine geçer"""
+        for i, individual in enumerate(individuals, start=1):
+            if i > len(self.population):
+                break
+            self.population[-i] = Chromosome(individual)
+
+class IslandGeneticAlgorithm:
+    """Halka topolojisinde periyodik göç ile çoklu popülasyonlu (ada modeli) genetik algoritma"""
+
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                 islands: int = 4, migration_interval: int = 10, migrants: int = 2,
+                 population_size: int = 30, generations: int = 75, start_time: float = 0,
+                 seed: Optional[int] = None, mutation_mixes: Optional[List[Dict[str, float]]] = None,
+                 processes: bool = True, timeout: Optional[float] = 300.0):
+        self.drones = drones
+        self.deliveries = deliveries
+        self.graph = graph
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.population_size = population_size
+        self.generations = generations
+        self.start_time = start_time
+        self.mutation_mixes = mutation_mixes or [None]
+        self.processes = processes
+        self.timeout = timeout  # Süreç modunda bir adanın komşusundan göçmen bekleme süresi (saniye)
+
+        # Ada başına bağımsız tohumlar; seed yoksa global üreteçten türetilir
+        rng = random.Random(seed) if seed is not None else random
+        self.seeds = [rng.randrange(2 ** 32) for _ in range(islands)]
+
+        self.best_score = float('-inf')
+        self.best_island = None
+        self.island_scores = []  # Ada başına jenerasyon en iyi skorları
+
+        # Çözüm istatistikleri için ana süreçteki GA
+        self._evaluator = GeneticAlgorithm(drones, deliveries, graph, start_time=start_time)
+
+    def _island_config(self, index: int) -> Dict:
+        return {
+            'population_size': self.population_size,
+            'generations': self.generations,
+            'start_time': self.start_time,
+            'seed': self.seeds[index],
+            'mutation_weights': self.mutation_mixes[index % len(self.mutation_mixes)],
+        }
+
+    def _epochs(self) -> List[int]:
+        """Göçler arası jenerasyon sayıları"""
+        interval = max(1, self.migration_interval)
+        epochs = [interval] * (self.generations // interval)
+        if self.generations % interval:
+            epochs.append(self.generations % interval)
+        return epochs
+
+    def run(self) -> Dict[int, List[int]]:
+        """Adaları çalıştırıp küresel en iyi bireyi döndürme"""
+        print(f"Ada modeli GA başlatılıyor: {self.islands} ada x {self.population_size} birey, "
+              f"{self.generations} jenerasyon, her {self.migration_interval} jenerasyonda göç")
+
+        if self.processes and self.islands > 1:
+            results = self._run_processes()
+        else:
+            results = self._run_sequential()
+
+        self.island_scores = [scores for _, _, scores in results]
+        self.best_score = float('-inf')
+        best_individual = None
+        for index, (individual, score, _) in enumerate(results):
+            if score > self.best_score:
+                self.best_score = score
+                self.best_island = index
+                best_individual = individual
+
+        return best_individual
+
+    def _run_sequential(self) -> List[Tuple[Dict[int, List[int]], float, List[float]]]:
+        """Tüm adaları tek süreçte sırayla ilerletme"""
+        islands = [Island(GeneticAlgorithm(self.drones, self.deliveries, self.graph, **self._island_config(i)))
+                   for i in range(self.islands)]
+
+        epochs = self._epochs()
+        for e, generations in enumerate(epochs):
+            for island in islands:
+                island.evolve(generations)
+
+            if e < len(epochs) - 1 and self.islands > 1:
+                outgoing = [island.emigrants(self.migrants) for island in islands]
+                for i, island in enumerate(islands):
+                    island.immigrate(outgoing[i - 1])
+
+        return [(dict(island.best_individual), island.best_score, island.generation_scores)
+                for island in islands]
+
+    def _run_processes(self) -> List[Tuple[Dict[int, List[int]], float, List[float]]]:
+        """Her ada ayrı süreçte; göçmenler halka kuyrukları ile aktarılır"""
+        inboxes = [multiprocessing.Queue() for _ in range(self.islands)]
+        results = multiprocessing.Queue()
+        # Adalar grafı ana süreçteki ayarlarla (matris modunda hazır dizilerden) kurar
+        graph_args = self.graph.worker_args()
+        workers = [
+            multiprocessing.Process(
+                target=_island_worker,
+                args=(i, self.drones, self.deliveries, self.graph.no_fly_zones, graph_args,
+                      self._island_config(i), self._epochs(), self.migrants, inboxes[i],
+                      inboxes[(i + 1) % self.islands], results, self.timeout))
+            for i in range(self.islands)
+        ]
+        for worker in workers:
+            worker.start()
+
+        collected = {}
+        failure = None
+        try:
+            while len(collected) < self.islands and failure is None:
+                try:
+                    status, index, payload = results.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    dead = [i for i, worker in enumerate(workers)
+                            if i not in collected and worker.exitcode not in (None, 0)]
+                    if dead:
+                        failure = (f"Ada {dead[0]} süreci beklenmedik şekilde sonlandı "
+                                   f"(çıkış kodu {workers[dead[0]].exitcode})")
+                    continue
+
+                if status == 'error':
+                    failure = f"Ada {index} süreci hata verdi:\n{payload}"
+                else:
+                    collected[index] = payload
+        finally:
+            # Hata durumunda göçmen bekleyen diğer adalar da durdurulur
+            if failure is not None:
+                for worker in workers:
+                    worker.terminate()
+            for worker in workers:
+                worker.join()
+
+        if failure is not None:
+            raise RuntimeError(failure)
+        return [collected[i] for i in range(self.islands)]
+
+    def fitness(self, individual: Dict[int, List[int]]) -> float:
+        return self._evaluator.fitness(individual)
+
+    def get_algorithm_statistics(self, solution: Dict[int, List[int]]) -> Dict:
+        """Algoritma istatistikleri ve ada bazında son en iyi skorlar"""
+        stats = self._evaluator.get_algorithm_statistics(solution)
+        stats['islands'] = self.islands
+        stats['best_island'] = self.best_island
+        stats['island_best_scores'] = [scores[-1] if scores else None for scores in self.island_scores]
+        return stats
+
+def _island_worker(index: int, drones: List[Drone], deliveries: List[Delivery], no_fly_zones: List,
+                   graph_args: Dict, config: Dict, epochs: List[int], migrants: int,
+                   inbox: multiprocessing.Queue, outbox: multiprocessing.Queue,
+                   results: multiprocessing.Queue, timeout: Optional[float] = None):
+    """Ada süreci: her dönem sonunda elitleri sonraki adaya gönderip öncekinden alır
+
+    Sonuç ya da hata her durumda results kuyruğuna yazılır: ('ok', index, sonuç) veya
+    ('error', index, açıklama).
+    """
+    try:
+        graph = DeliveryGraph(deliveries, no_fly_zones, **graph_args)
+        island = Island(GeneticAlgorithm(drones, deliveries, graph, **config))
+
+        for e, generations in enumerate(epochs):
+            island.evolve(generations)
+            if e < len(epochs) - 1:
+                outbox.put(island.emigrants(migrants))
+                island.immigrate(inbox.get(timeout=timeout))
+    except queue.Empty:
+        results.put(('error', index, f"Önceki adadan {timeout} saniye içinde göçmen gelmedi"))
+        return
+    except Exception:
+        results.put(('error', index, traceback.format_exc()))
+        return
+
+    results.put(('ok', index, (dict(island.best_individual), island.best_score, island.generation_scores)))
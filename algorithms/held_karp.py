@@ -0,0 +1,178 @@
+from typing import Dict, Iterable, Tuple
+import numpy as np
+from models.drone import Drone
+from models.graph import DeliveryGraph
+from utils.helpers import calculate_energy_factor
+
+class HeldKarpSequencer:
+    """Küçük teslimat kümeleri için bitmask dinamik programlama (Held–Karp) ile sıralama
+
+    Durum (ziyaret maskesi, son teslimat) başına en düşük A* g-score'lu etiket (maliyet, zaman,
+    batarya) (2^k, k) boyutlu dizilerde tutulur; eşit maliyette erken varan tercih edilir.
+    Katmanlar (ziyaret edilen teslimat sayısı) sırayla işlenir; bir katmandaki tüm (maske, son,
+    sonraki) geçişleri NumPy ile yoğun dizilerde hesaplanıp son teslimat ekseninde indirgenir.
+    Zaman penceresi, şarj ve NFZ kuralları AStarPathfinder ile aynıdır.
+
+    Sonuç yalnızca zaman penceresi, batarya ve NFZ kısıtları bağlayıcı değilken kesindir: durum
+    başına tek etiket tutulduğundan daha pahalı ama daha erken (ya da daha dolu bataryalı) bir
+    ara rota elenebilir. Pareto etiketleri de kesinlik sağlamaz; erken varış NFZ aralığına
+    düşebilir, düşük batarya şarjı tetikleyip sonrasında daha dolu bataryaya yol açabilir. Bu
+    nedenle tam rotalar için kısıtsız DP'nin (yalnızca taşıma kapasitesi) optimumu 'lower_bound'
+    olarak döner; gerçek optimum bu değerden küçük olamaz.
+    """
+
+    def __init__(self, graph: DeliveryGraph, drone: Drone, max_targets: int = 15):
+        self.graph = graph
+        self.drone = drone
+        self.max_targets = max_targets
+
+    def solve(self, start_pos: Tuple[float, float], target_deliveries: Iterable[int],
+              current_time: float, current_battery: float) -> Dict:
+        """En iyi tam rota; tam rota yoksa en çok teslimatlı en düşük maliyetli kısmi rota
+
+        Dönüş: {'path', 'g', 'complete', 'lower_bound'}; 'lower_bound' tam rota yoksa None
+        """
+        targets = list(target_deliveries)
+        k = len(targets)
+        if k > self.max_targets:
+            raise ValueError(f"Held–Karp en fazla {self.max_targets} teslimat için kullanılabilir: {k}")
+        if k == 0:
+            return {'path': [], 'g': 0.0, 'complete': True, 'lower_bound': 0.0}
+
+        drone = self.drone
+        deliveries = [self.graph.deliveries[d_id] for d_id in targets]
+
+        # Kaynaklar: hedefler (0..k-1) ve başlangıç konumu (k)
+        positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+        origins = np.vstack([positions, np.array(start_pos, dtype=np.float64).reshape(1, 2)])
+        if self.graph.matrix_mode:
+            # Hedefler arası mesafeler paylaşılan graf matrisinden, yalnızca başlangıç satırı hesaplanır
+            rows = [self.graph.index[d_id] for d_id in targets]
+            start_row = np.hypot(positions[:, 0] - origins[k, 0], positions[:, 1] - origins[k, 1])
+            distance = np.vstack([self.graph.distance_matrix[np.ix_(rows, rows)].astype(np.float64), start_row])
+        else:
+            diff = origins[:, None, :] - positions[None, :, :]
+            distance = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+        weights = np.array([d.weight for d in deliveries], dtype=np.float64)
+        energy = distance * calculate_energy_factor(weights)[None, :]
+        travel = distance / drone.speed
+        window_start = np.array([d.time_window[0] for d in deliveries], dtype=np.float64)
+        window_end = np.array([d.time_window[1] for d in deliveries], dtype=np.float64)
+        priority_bonus = np.array([(d.priority - 1) * 5 for d in deliveries], dtype=np.float64)
+        edge_cost = distance - priority_bonus[None, :]
+        carriable = weights <= drone.max_weight
+
+        # Kenar başına NFZ kapalı aralıkları: (k + 1, k, W)
+        origin_keys = [tuple(p) for p in origins.tolist()]
+        intervals = [[self.graph.nfz_table.blocked_intervals(origin, d_id) for d_id in targets]
+                     for origin in origin_keys]
+        width = max(1, max(len(edge) for row in intervals for edge in row))
+        blocked_start = np.full((k + 1, k, width), np.inf)
+        blocked_end = np.full((k + 1, k, width), -np.inf)
+        for o, row in enumerate(intervals):
+            for j, edge in enumerate(row):
+                for w, (start, end) in enumerate(edge):
+                    blocked_start[o, j, w] = start
+                    blocked_end[o, j, w] = end
+
+        # DP tabloları
+        size = 1 << k
+        cost = np.full((size, k), np.inf)
+        time = np.zeros((size, k))
+        battery = np.zeros((size, k))
+        parent = np.full((size, k), -1, dtype=np.int8)
+
+        bits = np.int64(1) << np.arange(k, dtype=np.int64)
+        masks = np.arange(size, dtype=np.int64)
+        popcount = np.zeros(size, dtype=np.int64)
+        for bit in range(k):
+            popcount += (masks >> bit) & 1
+
+        # Başlangıç katmanı: başlangıç konumundan her hedefe
+        state_cost = np.zeros((1, 1))
+        state_time = np.full((1, 1), float(current_time))
+        state_battery = np.full((1, 1), float(current_battery))
+        state_masks = np.zeros(1, dtype=np.int64)
+        sources = [k]
+
+        best = (0, 0.0, 0, -1)  # (teslimat sayısı, -maliyet, maske, son)
+
+        for layer in range(1, k + 1):
+            # (maske, son, sonraki) geçişleri; (yeni maske, sonraki) tek bir maskeden gelir
+            e = energy[sources][None, :, :]
+            recharge = e > state_battery[:, :, None]
+            arrival = state_time[:, :, None] + travel[sources][None, :, :] + recharge * 5
+            final = np.maximum(arrival, window_start[None, None, :])
+            inside = ((blocked_start[sources][None] <= final[..., None])
+                      & (final[..., None] <= blocked_end[sources][None])).any(axis=3)
+            feasible = (np.isfinite(state_cost)[:, :, None]
+                        & ((state_masks[:, None] & bits[None, :]) == 0)[:, None, :]
+                        & carriable[None, None, :] & (e <= drone.battery)
+                        & (arrival <= window_end[None, None, :]) & ~inside)
+            new_cost = np.where(feasible, state_cost[:, :, None] + edge_cost[sources][None, :, :], np.inf)
+
+            # Son teslimat üzerinden en düşük maliyet, eşitlikte en erken zaman
+            min_cost = new_cost.min(axis=1)
+            tied_time = np.where(new_cost == min_cost[:, None, :], final, np.inf)
+            previous = tied_time.argmin(axis=1)
+
+            row, j = np.nonzero(np.isfinite(min_cost))
+            if len(row) == 0:
+                break
+            p = previous[row, j]
+            m = state_masks[row] | bits[j]
+            cost[m, j] = min_cost[row, j]
+            time[m, j] = final[row, p, j]
+            battery[m, j] = np.where(recharge[row, p, j], drone.battery,
+                                     state_battery[row, p]) - e[0, p, j]
+            parent[m, j] = np.where(np.asarray(sources)[p] == k, -1, np.asarray(sources)[p])
+
+            i = int(np.argmin(min_cost[row, j]))
+            best = (layer, -float(min_cost[row[i], j[i]]), int(m[i]), int(j[i]))
+
+            # Sonraki katmanın durumları: bu katmanda ulaşılan maskeler
+            state_masks = masks[popcount == layer]
+            state_masks = state_masks[np.isfinite(cost[state_masks]).any(axis=1)]
+            sources = list(range(k))
+            state_cost = cost[state_masks]
+            state_time = time[state_masks]
+            state_battery = battery[state_masks]
+
+        layer, negative_cost, mask, last = best
+        path = []
+        while last >= 0:
+            path.append(targets[last])
+            previous = int(parent[mask, last])
+            mask ^= 1 << last
+            last = previous
+        path.reverse()
+
+        complete = layer == k
+        lower_bound = self._relaxed_bound(edge_cost, carriable) if complete else None
+        return {'path': path, 'g': -negative_cost, 'complete': complete, 'lower_bound': lower_bound}
+
+    @staticmethod
+    def _relaxed_bound(edge_cost: np.ndarray, carriable: np.ndarray) -> float:
+        """Zaman, batarya ve NFZ kısıtları olmadan en düşük tam rota maliyeti
+
+        edge_cost (k + 1, k) boyutludur; son satır başlangıç konumudur. Kısıtlı her tam rota bu
+        DP'de de geçerli olduğundan sonuç kısıtlı optimum için bir alt sınırdır.
+        """
+        k = edge_cost.shape[1]
+        size = 1 << k
+        bits = np.int64(1) << np.arange(k, dtype=np.int64)
+        masks = np.arange(size, dtype=np.int64)
+        popcount = np.zeros(size, dtype=np.int64)
+        for bit in range(k):
+            popcount += (masks >> bit) & 1
+
+        cost = np.full((size, k), np.inf)
+        cost[bits, np.arange(k)] = np.where(carriable, edge_cost[k], np.inf)
+        step = np.where(carriable[None, :], edge_cost[:k], np.inf)
+        for layer in range(1, k):
+            state_masks = masks[popcount == layer]
+            # (maske, son, sonraki) üzerinden son teslimat ekseninde en küçük
+            new_cost = (cost[state_masks][:, :, None] + step[None, :, :]).min(axis=1)
+            row, j = np.nonzero((state_masks[:, None] & bits[None, :]) == 0)
+            cost[state_masks[row] | bits[j], j] = new_cost[row, j]
+        return float(cost[size - 1].min())
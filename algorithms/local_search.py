@@ -0,0 +1,436 @@
+from time import perf_counter
+from typing import List, Dict, Optional, Tuple
+import numpy as np
+from models.drone import Drone
+from models.delivery import Delivery
+from models.graph import DeliveryGraph
+from models.problem_context import ProblemContext
+from algorithms.route_evaluator import RouteEvaluator
+from utils.helpers import calculate_energy_factor
+
+class LocalSearch:
+    """Rota iyileştirme: 2-opt, or-opt, relocate ve cross-exchange hamleleri
+
+    Her rota bir kez RouteEvaluator kurallarıyla (kapasite, şarj, zaman penceresi, NFZ) simüle
+    edilip pozisyon başına durum (konum, zaman, batarya) ve skor önekleri ile sonek özetleri
+    (ileri zaman penceresi boşluğu, aynı şarj noktaları için gereken batarya, geç teslimatlar ve
+    NFZ aralıklarının kayma payları) tutulur. Bir hamlede yalnızca değişen bölüm simüle edilir;
+    değişmeyen rota sonu, kayma bu paylar içinde kaldığı ve şarj düzeni korunduğu sürece O(1)
+    eklenir, aksi halde tam simüle edilir. Sonuç RouteEvaluator ile aynıdır.
+
+    Önce yalnızca enerjiyi (O(1) önek farkıyla) azaltan hamleler denenir; yerel optimumda,
+    ihlalli rotalarda enerjiyi artırıp ihlali gideren hamlelere de geçilir. Aday hamleler her
+    teslimatın en yakın komşularıyla sınırlıdır. context verilirse (aynı drone ve teslimat
+    listeleri üzerinde) mesafe/enerji matrisleri ve graf bağlamdan alınır.
+    """
+
+    MOVES = ('two_opt', 'or_opt', 'relocate', 'cross_exchange')
+
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                 start_time: float = 0, neighbours: int = 10, max_segment: int = 3,
+                 moves: Tuple[str, ...] = MOVES, context: Optional[ProblemContext] = None):
+        self.drones = drones
+        self.deliveries = deliveries
+        self.graph = graph
+        self.start_time = start_time
+        self.neighbours = neighbours
+        self.max_segment = max_segment
+        self.moves = [move for move in self.MOVES if move in moves]
+        self.evaluator = RouteEvaluator(drones, graph, start_time=start_time, context=context)
+
+        n = len(deliveries)
+        self.n = n
+        self.ids = [d.id for d in deliveries]
+        self.index = {d_id: i for i, d_id in enumerate(self.ids)}
+        self.weights = [d.weight for d in deliveries]
+        self.windows = [d.time_window for d in deliveries]
+        # Kaynak indeksi -> konum (NFZ tablosu sorguları için)
+        self.origin_pos = [tuple(d.pos) for d in deliveries] + [tuple(d.start_pos) for d in drones]
+
+        # Kaynaklar: önce teslimatlar (0..n-1), sonra drone başlangıçları (n..n+m-1)
+        if context is not None:
+            distance, energy = context.origin_distance, context.origin_energy
+        else:
+            positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+            starts = np.array([d.start_pos for d in drones], dtype=np.float64).reshape(-1, 2)
+            origins = np.vstack([positions, starts])
+            diff = origins[:, None, :] - positions[None, :, :]
+            distance = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+            energy = distance * calculate_energy_factor(np.array(self.weights, dtype=np.float64))[None, :]
+        self.distance = distance.tolist()
+        self.energy = energy.tolist()
+
+        # Her teslimatın en yakın komşuları
+        k = min(neighbours, n - 1)
+        if k > 0:
+            masked = distance[:n] + np.diag(np.full(n, np.inf))
+            near = np.argpartition(masked, k - 1, axis=1)[:, :k]
+            order = np.argsort(np.take_along_axis(masked, near, axis=1), axis=1)
+            self.near = np.take_along_axis(near, order, axis=1).tolist()
+        else:
+            self.near = [[] for _ in range(n)]
+
+        self.evaluations = 0
+        self.stats = {}
+
+    def optimize(self, solution: Dict[int, List[int]], time_budget: float = 1.0) -> Dict[int, List[int]]:
+        """Çözümü süre bütçesi (saniye) içinde ya da yerel optimuma kadar iyileştirme"""
+        start = perf_counter()
+        deadline = start + time_budget
+
+        self.routes = [[self.index[d_id] for d_id in solution.get(drone.id, []) if d_id in self.index]
+                       for drone in self.drones]
+        self.route_of = [-1] * self.n
+        self.pos_of = [-1] * self.n
+        self.prefix = [None] * len(self.drones)
+        self.evaluations = 0
+        self.scores = [self._route_score(k, route) for k, route in enumerate(self.routes)]
+        for k in range(len(self.routes)):
+            self._reindex(k)
+
+        initial_score = sum(self.scores)
+        applied = {move: 0 for move in self.moves}
+
+        # Önce yalnızca enerjiyi azaltan hamleler; yerel optimumda ihlal gideren hamlelere geçilir
+        self.repair = False
+        improved = True
+        while improved and perf_counter() < deadline:
+            improved = False
+            for u in range(self.n):
+                if perf_counter() >= deadline:
+                    break
+                if self.route_of[u] < 0:
+                    continue
+                for move in self.moves:
+                    if getattr(self, f'_try_{move}')(u):
+                        applied[move] += 1
+                        improved = True
+                        break
+            if not improved and not self.repair:
+                self.repair = improved = True
+
+        self.stats = {
+            'initial_score': initial_score,
+            'final_score': sum(self.scores),
+            'moves': applied,
+            'evaluations': self.evaluations,
+            'elapsed_time': perf_counter() - start
+        }
+
+        return {drone.id: [self.ids[i] for i in self.routes[k]] for k, drone in enumerate(self.drones)}
+
+    # Yardımcılar
+
+    def _route_score(self, k: int, route: List[int]) -> float:
+        """Rotanın GA fitness katkısı"""
+        self.evaluations += 1
+        return self.evaluator.route_score(self.drones[k].id, [self.ids[i] for i in route])
+
+    def _reindex(self, k: int):
+        for p, i in enumerate(self.routes[k]):
+            self.route_of[i] = k
+            self.pos_of[i] = p
+        self.prefix[k] = None
+
+    def _origin(self, k: int, p: int) -> int:
+        """Rotada p pozisyonundan önceki kaynak: önceki teslimat ya da drone başlangıcı"""
+        return self.routes[k][p - 1] if p > 0 else self.n + k
+
+    def _edge(self, origin: int, target: Optional[int]) -> float:
+        return self.energy[origin][target] if target is not None else 0
+
+    def _next(self, k: int, p: int) -> Optional[int]:
+        route = self.routes[k]
+        return route[p + 1] if p + 1 < len(route) else None
+
+    def _step(self, k: int, state: Tuple[int, float, float], i: int) -> Tuple:
+        """(kaynak, zaman, batarya) durumundan i teslimatına geçiş; kurallar route_fitness ile aynı
+
+        Dönüş: (yeni durum, teslimat, enerji, ihlal, varış zamanı, durum, şarj, NFZ aralıkları) —
+        durum 'ok', 'late' ya da 'skip'; kenar hiçbir NFZ'ye değmiyorsa aralıklar None.
+        """
+        origin, time, battery = state
+        drone = self.drones[k]
+        if self.weights[i] > drone.max_weight:
+            return state, 0, 0.0, 1, None, 'skip', False, None
+
+        energy = self.energy[origin][i]
+        recharged = energy > battery
+        if recharged:
+            battery = drone.battery
+            time += 5
+            if energy > battery:
+                return (origin, time, battery), 0, 0.0, 1, None, 'skip', True, None
+
+        arrival = time + self.distance[origin][i] / drone.speed
+        start, end = self.windows[i]
+        late = arrival > end
+        time = start if arrival < start else arrival
+
+        edge = self.evaluator.graph.nfz_table.row(self.origin_pos[origin]).get(self.ids[i])
+        blocked = edge is not None and edge.is_blocked(time)
+        count = 0 if blocked or late else 1
+        violations = int(late) + int(blocked)
+        return ((i, time, battery - energy), count, energy, violations, arrival,
+                'late' if late else 'ok', recharged, edge)
+
+    def _prefixes(self, k: int) -> Dict[str, List]:
+        """Rotanın pozisyon başına simülasyon verisi (ilk erişimde hesaplanır)
+
+        Önek dizileri (indeks s: ilk s teslimattan sonra): 'state', 'count', 'energy', 'violations'.
+        Sonek dizileri (indeks q: q'dan başlayan rota sonu, q'dan önceki duruma göre):
+        'slack' zamanında teslimatları geciktirmeden kabul edilebilecek en büyük gecikme, 'advance'
+        geç bir teslimatı zamanına yetiştirmek için gereken en küçük öne çekme, 'need' ilk şarj
+        noktasına kadar harcanan batarya (aynı şarj düzeni için alt sınır), 'late' sonekte geç
+        teslimat olup olmadığı, 'nfz_early'/'nfz_late' NFZ'ye değen kenarların engel durumunu
+        değiştirmeyen en büyük öne çekme ve gecikme. 'forward'/'backward'
+        rota içi kenar enerjilerinin ileri ve ters yöndeki önek toplamlarıdır.
+        """
+        if self.prefix[k] is None:
+            route = self.routes[k]
+            states = [(self.n + k, self.start_time, self.drones[k].battery)]
+            count, energy, violations = [0], [0.0], [0]
+            steps = []
+            for i in route:
+                state, c, e, v, arrival, status, recharged, edge = self._step(k, states[-1], i)
+                states.append(state)
+                count.append(count[-1] + c)
+                energy.append(energy[-1] + e)
+                violations.append(violations[-1] + v)
+                margin = edge.stable_margin(state[1]) if edge is not None else None
+                steps.append((i, e, arrival, status, recharged, margin))
+
+            size = len(route)
+            slack, advance = [float('inf')] * (size + 1), [float('inf')] * (size + 1)
+            need = [0.0] * (size + 1)
+            late = [False] * (size + 1)
+            nfz_early, nfz_late = [float('inf')] * (size + 1), [float('inf')] * (size + 1)
+            for q in range(size - 1, -1, -1):
+                i, e, arrival, status, recharged, margin = steps[q]
+                if status == 'ok':
+                    # Bekleme gecikmeyi emer; geç kalan ya da atlanan teslimat gecikmeyi aynen aktarır.
+                    # Öne çekme ise pencere başlangıcına kadar aktarılır.
+                    wait = max(0.0, self.windows[i][0] - arrival)
+                    slack[q] = min(self.windows[i][1] - arrival, wait + slack[q + 1])
+                    advance[q] = advance[q + 1] if arrival - self.windows[i][0] >= advance[q + 1] else float('inf')
+                elif status == 'late':
+                    slack[q] = slack[q + 1]
+                    advance[q] = min(arrival - self.windows[i][1], advance[q + 1])
+                else:
+                    slack[q], advance[q] = slack[q + 1], advance[q + 1]
+                need[q] = 0.0 if recharged else e + need[q + 1]
+                late[q] = late[q + 1] or status == 'late'
+                nfz_early[q], nfz_late[q] = nfz_early[q + 1], nfz_late[q + 1]
+                if margin is not None:
+                    nfz_early[q], nfz_late[q] = min(margin[0], nfz_early[q]), min(margin[1], nfz_late[q])
+
+            forward, backward = [0.0], [0.0]
+            for p in range(1, size):
+                forward.append(forward[-1] + self.energy[route[p - 1]][route[p]])
+                backward.append(backward[-1] + self.energy[route[p]][route[p - 1]])
+
+            self.prefix[k] = {'state': states, 'count': count, 'energy': energy, 'violations': violations,
+                              'slack': slack, 'advance': advance, 'need': need, 'late': late,
+                              'nfz_early': nfz_early, 'nfz_late': nfz_late,
+                              'forward': forward, 'backward': backward}
+        return self.prefix[k]
+
+    def _evaluate(self, k: int, route: List[int], start: int, keep: int) -> float:
+        """k drone'unun yeni rotasının skoru
+
+        route[:start] eski rotayla, route[keep:] eski rotanın sonuyla aynıdır. Aradaki bölüm ve
+        birleşme teslimatı simüle edilir; rota sonu mümkünse önek farklarından O(1) eklenir.
+        """
+        self.evaluations += 1
+        data = self._prefixes(k)
+        size = len(self.routes[k])
+        shift = size - len(route)
+
+        state = data['state'][start]
+        count, energy, violations = data['count'][start], data['energy'][start], data['violations'][start]
+        end = min(keep + 1, len(route))
+        for p in range(start, end):
+            state, c, e, v = self._step(k, state, route[p])[:4]
+            count, energy, violations = count + c, energy + e, violations + v
+
+        q = end + shift  # Eski rotada sıradaki teslimatın pozisyonu
+        if end < len(route) and self._tail_unchanged(data, q, state):
+            count += data['count'][size] - data['count'][q]
+            energy += data['energy'][size] - data['energy'][q]
+            violations += data['violations'][size] - data['violations'][q]
+        else:
+            for p in range(end, len(route)):
+                state, c, e, v = self._step(k, state, route[p])[:4]
+                count, energy, violations = count + c, energy + e, violations + v
+        return self.evaluator.score(count, energy, violations)
+
+    @staticmethod
+    def _tail_unchanged(data: Dict[str, List], q: int, state: Tuple[int, float, float]) -> bool:
+        """q'dan başlayan rota sonunun teslimat ve ihlal sayıları yeni durumda da aynı mı (O(1))"""
+        origin, time, battery = state
+        old_origin, old_time, old_battery = data['state'][q]
+        if origin != old_origin:
+            return False
+        delay = time - old_time
+        if delay > data['slack'][q]:
+            return False
+        # Aynı şarj noktaları: her teslimatın zamanı 0 ile delay arasında kayar (bekleme emer);
+        # öne çekme geç teslimatlara ulaşmıyorsa ve kayma NFZ paylarını aşmıyorsa sayılar aynıdır
+        if data['need'][q] <= battery <= old_battery:
+            if delay >= 0:
+                return delay == 0 or delay < data['nfz_late'][q]
+            return -delay < data['advance'][q] and -delay < data['nfz_early'][q]
+        # Daha az şarj molası zamanları ayrıca (sınırsız) öne çeker; geç teslimat yoksa ve NFZ
+        # payları buna izin veriyorsa sayılar değişmez
+        return (battery >= old_battery and not data['late'][q] and data['nfz_early'][q] == float('inf')
+                and (delay <= 0 or delay < data['nfz_late'][q]))
+
+    def _carries(self, k: int, segment: List[int]) -> bool:
+        max_weight = self.drones[k].max_weight
+        return all(self.weights[i] <= max_weight for i in segment)
+
+    def _clean(self, *routes: int) -> bool:
+        """Enerjiyi artıran hamleler atlanabilir mi
+
+        Rotalarda ihlal yoksa skor yalnızca enerji azalınca artar; ihlal varsa bu hamleler onarım
+        aşamasında (self.repair) denenir.
+        """
+        return not self.repair or all(self._prefixes(k)['violations'][-1] == 0 for k in routes)
+
+    def _commit(self, changes: Dict[int, Tuple[List[int], float]]) -> bool:
+        """Yeni rotalar toplam skoru artırıyorsa uygulama"""
+        if sum(score for _, score in changes.values()) <= sum(self.scores[k] for k in changes) + 1e-9:
+            return False
+        for k, (route, score) in changes.items():
+            self.routes[k] = route
+            self.scores[k] = score
+            self._reindex(k)
+        return True
+
+    # Hamleler
+
+    def _try_two_opt(self, u: int) -> bool:
+        """u ile aynı rotadaki yakın v arasındaki bölümü ters çevirip u -> v kenarı oluşturma"""
+        k, a = self.route_of[u], self.pos_of[u]
+        route = self.routes[k]
+        data = self._prefixes(k)
+        forward, backward = data['forward'], data['backward']
+        clean = self._clean(k)
+        for v in self.near[u]:
+            if self.route_of[v] != k or self.pos_of[v] <= a + 1:
+                continue
+            b = self.pos_of[v]
+            after = self._next(k, b)
+            delta = (self.energy[u][v] + (backward[b] - backward[a + 1]) + self._edge(route[a + 1], after)
+                     - self.energy[u][route[a + 1]] - (forward[b] - forward[a + 1]) - self._edge(v, after))
+            if clean and delta >= -1e-9:
+                continue
+            candidate = route[:a + 1] + route[a + 1:b + 1][::-1] + route[b + 1:]
+            if self._commit({k: (candidate, self._evaluate(k, candidate, a + 1, b + 1))}):
+                return True
+        return False
+
+    def _try_or_opt(self, u: int) -> bool:
+        """u ile başlayan kısa bölümü aynı rotada yakın bir teslimatın arkasına taşıma"""
+        k, a = self.route_of[u], self.pos_of[u]
+        route = self.routes[k]
+        clean = self._clean(k)
+        for length in range(1, self.max_segment + 1):
+            if a + length > len(route):
+                break
+            last = route[a + length - 1]
+            before = self._origin(k, a)
+            after = self._next(k, a + length - 1)
+            removal = self._edge(before, after) - self.energy[before][u] - self._edge(last, after)
+
+            for v in self.near[u]:
+                if self.route_of[v] != k:
+                    continue
+                b = self.pos_of[v]
+                if a - 1 <= b < a + length:
+                    continue
+                w = self._next(k, b)
+                delta = removal + self.energy[v][u] + self._edge(last, w) - self._edge(v, w)
+                if clean and delta >= -1e-9:
+                    continue
+                segment = route[a:a + length]
+                if b > a:
+                    candidate = route[:a] + route[a + length:b + 1] + segment + route[b + 1:]
+                    first, keep = a, b + 1
+                else:
+                    candidate = route[:b + 1] + segment + route[b + 1:a] + route[a + length:]
+                    first, keep = b + 1, a + length
+                if self._commit({k: (candidate, self._evaluate(k, candidate, first, keep))}):
+                    return True
+        return False
+
+    def _try_relocate(self, u: int) -> bool:
+        """u'yu başka bir drone rotasında yakın bir teslimatın önüne ya da arkasına taşıma"""
+        k, a = self.route_of[u], self.pos_of[u]
+        before = self._origin(k, a)
+        after = self._next(k, a)
+        removal = self._edge(before, after) - self.energy[before][u] - self._edge(u, after)
+        source_route = source_score = None
+
+        for v in self.near[u]:
+            target = self.route_of[v]
+            if target < 0 or target == k or self.weights[u] > self.drones[target].max_weight:
+                continue
+            b = self.pos_of[v]
+            clean = self._clean(k, target)
+            # v'nin arkasına ve önüne ekleme
+            for origin, nxt, insert_at in ((v, self._next(target, b), b + 1),
+                                           (self._origin(target, b), v, b)):
+                delta = removal + self.energy[origin][u] + self._edge(u, nxt) - self._edge(origin, nxt)
+                if clean and delta >= -1e-9:
+                    continue
+                if source_route is None:
+                    source_route = self.routes[k][:a] + self.routes[k][a + 1:]
+                    source_score = self._evaluate(k, source_route, a, a)
+                target_route = self.routes[target][:insert_at] + [u] + self.routes[target][insert_at:]
+                target_score = self._evaluate(target, target_route, insert_at, insert_at + 1)
+                if self._commit({k: (source_route, source_score), target: (target_route, target_score)}):
+                    return True
+        return False
+
+    def _try_cross_exchange(self, u: int) -> bool:
+        """u ve yakın v ile başlayan kısa bölümleri iki drone arasında değiş tokuş etme"""
+        k, a = self.route_of[u], self.pos_of[u]
+        limit = min(self.max_segment, 2)
+        for v in self.near[u]:
+            target = self.route_of[v]
+            if target < 0 or target == k:
+                continue
+            b = self.pos_of[v]
+            route1, route2 = self.routes[k], self.routes[target]
+            before1, before2 = self._origin(k, a), self._origin(target, b)
+            clean = self._clean(k, target)
+
+            for length1 in range(1, limit + 1):
+                if a + length1 > len(route1):
+                    break
+                segment1 = route1[a:a + length1]
+                if not self._carries(target, segment1):
+                    continue
+                after1 = self._next(k, a + length1 - 1)
+
+                for length2 in range(1, limit + 1):
+                    if b + length2 > len(route2):
+                        break
+                    segment2 = route2[b:b + length2]
+                    if not self._carries(k, segment2):
+                        continue
+                    after2 = self._next(target, b + length2 - 1)
+
+                    delta = (self.energy[before1][v] + self._edge(segment2[-1], after1)
+                             + self.energy[before2][u] + self._edge(segment1[-1], after2)
+                             - self.energy[before1][u] - self._edge(segment1[-1], after1)
+                             - self.energy[before2][v] - self._edge(segment2[-1], after2))
+                    if clean and delta >= -1e-9:
+                        continue
+                    new_route1 = route1[:a] + segment2 + route1[a + length1:]
+                    new_route2 = route2[:b] + segment1 + route2[b + length2:]
+                    if self._commit({k: (new_route1, self._evaluate(k, new_route1, a, a + length2)),
+                                     target: (new_route2, self._evaluate(target, new_route2, b, b + length1))}):
+                        return True
+        return False
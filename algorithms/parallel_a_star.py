@@ -0,0 +1,322 @@
+import math
+import multiprocessing
+import queue
+import threading
+import time
+import traceback
+from typing import List, Dict, Optional, Tuple
+from models.drone import Drone
+from models.delivery import Delivery
+from models.graph import DeliveryGraph
+from algorithms.a_star import AStarPathfinder, HeuristicCache
+from utils.helpers import calculate_distance, calculate_energy_consumption
+
+POLL_INTERVAL = 0.5  # Sonuç kuyruğu ve süreç durumu kontrol aralığı (saniye)
+ABORT_GRACE = 5.0    # Bariyer bozulduktan sonra asıl hatanın beklendiği süre (saniye)
+
+class ClaimTable:
+    """Teslimat sahiplik ve teklif tablosu
+
+    owner[i]: teslimatı alan drone indeksi (-1: boş). Her turda dronelar sıradaki teslimatları
+    için marjinal maliyetle teklif verir; teklifler tur numarasıyla damgalandığından tur
+    sonunda sıfırlama gerekmez. En düşük maliyet (eşitlikte küçük drone indeksi) kazanır.
+    shared=True ise diziler süreçler arası paylaşılır ve kilitle korunur.
+    """
+
+    def __init__(self, size: int, shared: bool = False):
+        if shared:
+            self.lock = multiprocessing.Lock()
+            self.owner = multiprocessing.Array('i', [-1] * size, lock=False)
+            self.bid_round = multiprocessing.Array('i', [-1] * size, lock=False)
+            self.bid_cost = multiprocessing.Array('d', [math.inf] * size, lock=False)
+            self.bid_drone = multiprocessing.Array('i', [-1] * size, lock=False)
+        else:
+            self.lock = None
+            self.owner = [-1] * size
+            self.bid_round = [-1] * size
+            self.bid_cost = [math.inf] * size
+            self.bid_drone = [-1] * size
+
+    def _locked(self):
+        return self.lock if self.lock is not None else _NoLock()
+
+    def unclaimed(self) -> List[int]:
+        with self._locked():
+            return [i for i, owner in enumerate(self.owner) if owner < 0]
+
+    def bid(self, index: int, round_number: int, cost: float, drone_index: int):
+        with self._locked():
+            if (self.bid_round[index] != round_number or cost < self.bid_cost[index]
+                    or (cost == self.bid_cost[index] and drone_index < self.bid_drone[index])):
+                self.bid_round[index] = round_number
+                self.bid_cost[index] = cost
+                self.bid_drone[index] = drone_index
+
+    def resolve(self, index: int, round_number: int, drone_index: int) -> bool:
+        """Tur teklifini kazandıysa teslimatı sahiplenme"""
+        with self._locked():
+            if self.bid_round[index] == round_number and self.bid_drone[index] == drone_index \
+                    and self.owner[index] < 0:
+                self.owner[index] = drone_index
+                return True
+            return False
+
+class _NoLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+class DronePlanner:
+    """Tek bir drone'un tur tabanlı planlama durumu (run_a_star_simulation kurallarıyla)"""
+
+    def __init__(self, index: int, drone: Drone, graph: DeliveryGraph, delivery_ids: List[int],
+                 heuristic_cache: Optional[HeuristicCache] = None, path_time_budget: Optional[float] = None,
+                 max_deliveries: int = 10, max_consecutive_failures: int = 3):
+        self.index = index
+        self.drone = drone
+        self.graph = graph
+        self.delivery_ids = delivery_ids
+        self.position = {d_id: i for i, d_id in enumerate(delivery_ids)}
+        self.path_time_budget = path_time_budget
+        self.max_deliveries = max_deliveries
+        self.max_consecutive_failures = max_consecutive_failures
+        self.pathfinder = AStarPathfinder(graph, drone, heuristic_cache=heuristic_cache)
+
+        drone.current_pos = drone.start_pos
+        drone.current_battery = drone.battery
+        drone.current_weight = 0
+        self.current_pos = drone.start_pos
+        self.current_time = 0
+        self.route = []
+        self.energy = 0
+        self.distance = 0
+        self.consecutive_failures = 0
+        self.active = True
+        self.pending = None  # Bu turdaki teklif: teslimat indeksi
+        self.plan = []  # Son A* rotasının kalan kısmı
+
+    def propose(self, claims: ClaimTable, round_number: int):
+        """Sahipsiz teslimatlar üzerinde A* ile sıradaki teslimatı seçip teklif verme"""
+        self.pending = None
+        if not self.active:
+            return
+        if len(self.route) >= self.max_deliveries or self.drone.current_battery <= 0:
+            self.active = False
+            return
+
+        unvisited = {self.delivery_ids[i] for i in claims.unclaimed()}
+        if not unvisited:
+            self.active = False
+            return
+
+        # Önceki rotanın başka dronelarca alınmamış kısmı geçerliyse yeniden planlanmaz
+        self.plan = [d for d in self.plan if d in unvisited]
+        step = self._first_valid_step(self.plan) if self.plan else None
+        if step is None:
+            self.plan = self.pathfinder.find_path(self.current_pos, unvisited, self.current_time,
+                                                  time_budget=self.path_time_budget)
+            step = self._first_valid_step(self.plan)
+        if step is None:
+            self.plan = []
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.max_consecutive_failures:
+                self.active = False
+            return
+
+        delivery_id, marginal_cost = step
+        self.plan = self.plan[self.plan.index(delivery_id):]
+        self.pending = self.position[delivery_id]
+        claims.bid(self.pending, round_number, marginal_cost, self.index)
+
+    def _first_valid_step(self, path: List[int]) -> Optional[Tuple[int, float]]:
+        """Rotadaki ilk uygulanabilir teslimat ve marjinal maliyeti"""
+        for delivery_id in path:
+            delivery = self.graph.deliveries[delivery_id]
+            if delivery.weight > self.drone.max_weight:
+                continue
+
+            distance = calculate_distance(self.current_pos, delivery.pos)
+            energy = calculate_energy_consumption(distance, delivery.weight)
+            if energy > self.drone.current_battery:
+                return None
+
+            if self.current_time + distance / self.drone.speed > delivery.time_window[1]:
+                continue
+
+            cost, _, _ = self.pathfinder.calculate_actual_cost(self.current_pos, delivery_id, self.current_time,
+                                                               self.drone.current_battery)
+            return delivery_id, cost
+        return None
+
+    def commit(self, claims: ClaimTable, round_number: int):
+        """Teklif kazanıldıysa teslimatı rotaya ekleme; kaybedilirse sonraki turda yeniden planlanır"""
+        if self.pending is None or not claims.resolve(self.pending, round_number, self.index):
+            return
+
+        delivery_id = self.delivery_ids[self.pending]
+        self.plan = self.plan[1:]
+        delivery = self.graph.deliveries[delivery_id]
+        distance = calculate_distance(self.current_pos, delivery.pos)
+        energy = calculate_energy_consumption(distance, delivery.weight)
+        arrival_time = self.current_time + distance / self.drone.speed
+
+        self.route.append({
+            'delivery_id': delivery_id,
+            'position': delivery.pos,
+            'time': arrival_time,
+            'weight': delivery.weight,
+            'priority': delivery.priority
+        })
+
+        self.drone.current_battery -= energy
+        self.energy += energy
+        self.distance += distance
+        self.current_pos = delivery.pos
+        self.current_time = arrival_time
+        self.consecutive_failures = 0
+
+    def result(self) -> Dict:
+        return {'route': self.route, 'energy': self.energy, 'distance': self.distance,
+                'consecutive_failures': self.consecutive_failures}
+
+def plan_drones_parallel(drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                         workers: Optional[int] = None, path_time_budget: Optional[float] = None,
+                         heuristic_cache: Optional[HeuristicCache] = None,
+                         timeout: Optional[float] = 300.0) -> Dict[int, Dict]:
+    """Tüm dronelar için eşzamanlı, tur tabanlı planlama
+
+    Her turda tüm dronelar sahipsiz teslimatlar üzerinde A* çalıştırıp ilk teslimatları için
+    teklif verir; çakışmalarda marjinal maliyeti düşük olan kazanır, kaybedenler sonraki turda
+    yeniden planlar. workers > 0 ise dronelar bu sayıda sürece dağıtılır ve tablo süreçler arası
+    paylaşılır; workers=0 aynı protokolü tek süreçte çalıştırır.
+
+    timeout: süreç modunda bir turun bariyerde en uzun bekleme süresi (saniye). Bir süreç hata
+    verir, sonlanır ya da zaman aşımı olursa kalan süreçler durdurulup RuntimeError fırlatılır.
+    Süreçlerin heuristic önbellek isabet/ıskalama sayıları heuristic_cache'e eklenir.
+
+    Dönüş: drone_id -> {'route', 'energy', 'distance', 'consecutive_failures'}
+    """
+    if workers is None:
+        workers = min(len(drones), multiprocessing.cpu_count())
+    delivery_ids = [d.id for d in deliveries]
+
+    if workers <= 0 or len(drones) <= 1:
+        claims = ClaimTable(len(deliveries))
+        planners = [DronePlanner(i, drone, graph, delivery_ids, heuristic_cache, path_time_budget)
+                    for i, drone in enumerate(drones)]
+        round_number = 0
+        while any(planner.active for planner in planners):
+            for planner in planners:
+                planner.propose(claims, round_number)
+            for planner in planners:
+                planner.commit(claims, round_number)
+            round_number += 1
+        return {planner.drone.id: planner.result() for planner in planners}
+
+    workers = min(workers, len(drones))
+    claims = ClaimTable(len(deliveries), shared=True)
+    barrier = multiprocessing.Barrier(workers, timeout=timeout)
+    active_counts = multiprocessing.Array('i', [1] * workers)
+    results = multiprocessing.Queue()
+
+    # Dronelar süreçlere sırayla dağıtılır; süreçler grafı ana süreçteki ayarlarla (matris
+    # modunda hazır dizilerden) kurar
+    assignments = [list(range(w, len(drones), workers)) for w in range(workers)]
+    graph_args = graph.worker_args()
+    processes = [
+        multiprocessing.Process(
+            target=_planner_worker,
+            args=(w, [drones[i] for i in assignments[w]], assignments[w], deliveries, graph.no_fly_zones,
+                  graph_args, claims, barrier, active_counts, path_time_budget, results))
+        for w in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    collected = {}
+    reported = set()
+    aborted_at = None
+    failure = None
+    try:
+        while len(reported) < workers and failure is None:
+            try:
+                status, worker, payload = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                dead = [w for w, process in enumerate(processes)
+                        if w not in reported and process.exitcode not in (None, 0)]
+                if dead:
+                    failure = (f"Planlama süreci {dead[0]} beklenmedik şekilde sonlandı "
+                               f"(çıkış kodu {processes[dead[0]].exitcode})")
+                elif aborted_at is not None and time.monotonic() - aborted_at > ABORT_GRACE:
+                    failure = "Planlama süreçleri bariyerde zaman aşımına uğradı"
+                continue
+
+            reported.add(worker)
+            if status == 'error':
+                failure = f"Planlama süreci {worker} hata verdi:\n{payload}"
+            elif status == 'aborted':
+                # Bariyer başka bir süreç yüzünden bozuldu; asıl hatayı kısa süre bekle
+                aborted_at = aborted_at if aborted_at is not None else time.monotonic()
+            else:
+                routes, hits, misses = payload
+                collected.update(routes)
+                if heuristic_cache is not None:
+                    heuristic_cache.hits += hits
+                    heuristic_cache.misses += misses
+
+        if failure is None and aborted_at is not None:
+            failure = "Planlama süreçleri bariyerde zaman aşımına uğradı"
+    finally:
+        if failure is not None:
+            barrier.abort()
+            for process in processes:
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    if failure is not None:
+        raise RuntimeError(failure)
+    return {drone.id: collected[drone.id] for drone in drones}
+
+def _planner_worker(worker: int, drones: List[Drone], indices: List[int], deliveries: List[Delivery],
+                    no_fly_zones: List, graph_args: Dict, claims: ClaimTable,
+                    barrier, active_counts, path_time_budget: Optional[float], results):
+    """Planlama süreci: teklif, bariyer, sahiplenme, bariyer ve bitiş kontrolü
+
+    Sonuç ya da hata her durumda results kuyruğuna yazılır: ('ok', worker, (rotalar, isabet,
+    ıskalama)), ('error', worker, traceback) veya bariyer bozulduysa ('aborted', worker, None).
+    """
+    try:
+        graph = DeliveryGraph(deliveries, no_fly_zones, **graph_args)
+        delivery_ids = [d.id for d in deliveries]
+        cache = HeuristicCache()
+        planners = [DronePlanner(i, drone, graph, delivery_ids, cache, path_time_budget)
+                    for i, drone in zip(indices, drones)]
+
+        round_number = 0
+        while True:
+            for planner in planners:
+                planner.propose(claims, round_number)
+            barrier.wait()
+
+            for planner in planners:
+                planner.commit(claims, round_number)
+            active_counts[worker] = sum(planner.active for planner in planners)
+            barrier.wait()
+
+            if not any(active_counts[:]):
+                break
+            round_number += 1
+    except threading.BrokenBarrierError:
+        results.put(('aborted', worker, None))
+        return
+    except Exception:
+        # Önce hata bildirilir, ardından bariyer bozularak diğer süreçler serbest bırakılır
+        results.put(('error', worker, traceback.format_exc()))
+        barrier.abort()
+        return
+
+    results.put(('ok', worker, ({planner.drone.id: planner.result() for planner in planners},
+                                cache.hits, cache.misses)))
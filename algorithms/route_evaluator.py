@@ -0,0 +1,125 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from models.drone import Drone
+from models.graph import DeliveryGraph
+from models.problem_context import ProblemContext
+from utils.helpers import calculate_distance, calculate_energy_consumption
+
+class RouteEvaluator:
+    """Drone rotalarını GA fitness kurallarıyla (kapasite, şarj, zaman penceresi, NFZ) puanlama
+
+    GA, ALNS ve yerel arama aynı puanlamayı kullanır. Rota sonuçları (drone_id, rota) anahtarlı
+    sınırlı bir LRU önbellekte tutulur; context verilirse graf her kullanımda bağlamdan okunur ve
+    graf değişince önbellek temizlenir.
+    """
+
+    def __init__(self, drones: List[Drone], graph: Optional[DeliveryGraph], start_time: float = 0,
+                 cache_size: int = 50000, context: Optional[ProblemContext] = None):
+        self.drones = {d.id: d for d in drones}
+        self.context = context
+        self._graph = graph
+        self.start_time = start_time
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_graph = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def graph(self) -> DeliveryGraph:
+        return self.context.graph if self.context is not None else self._graph
+
+    @staticmethod
+    def score(count: int, energy: float, violations: int) -> float:
+        """fitness = (teslimat sayisi x 50) - (toplam enerji x 0.1) - (ihlal edilen kısıt x 100)"""
+        return (count * 50) - (energy * 0.1) - (violations * 100)
+
+    def cached_route_fitness(self, drone_id: int, route: List[int]) -> Tuple[int, float, int]:
+        """route_fitness sonucu, LRU önbellek üzerinden"""
+        graph = self.graph
+        if graph is not self._cache_graph:
+            self._cache.clear()
+            self._cache_graph = graph
+
+        key = (drone_id, tuple(route))
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return result
+
+        result = self.route_fitness(self.drones[drone_id], route)
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self.misses += 1
+        return result
+
+    def route_score(self, drone_id: int, route: List[int]) -> float:
+        """Rotanın fitness katkısı"""
+        return self.score(*self.cached_route_fitness(drone_id, route))
+
+    def fitness(self, solution: Dict[int, List[int]]) -> float:
+        """Tüm çözümün fitness değeri"""
+        return sum(self.route_score(drone_id, route) for drone_id, route in solution.items())
+
+    def route_fitness(self, drone: Drone, route: List[int]) -> Tuple[int, float, int]:
+        """Tek bir drone rotası için (teslimat sayısı, enerji, ihlal sayısı)"""
+        delivery_count = 0
+        total_energy = 0
+        total_violations = 0
+
+        current_pos = drone.start_pos
+        current_battery = drone.battery
+        current_time = self.start_time
+        graph = self.graph
+
+        for delivery_id in route:
+            delivery = graph.deliveries[delivery_id]
+            distance = calculate_distance(current_pos, delivery.pos)
+            energy_needed = calculate_energy_consumption(distance, delivery.weight)
+
+            # Ağırlık kontrolü
+            if delivery.weight > drone.max_weight:
+                total_violations += 1
+                continue
+
+            # Enerji kontrolü
+            if energy_needed > current_battery:
+                # Şarj
+                current_battery = drone.battery
+                current_time += 5  # 5 dakika
+
+                if energy_needed > current_battery:
+                    total_violations += 1
+                    continue
+
+            # Seyahat ve varış zamanı hesaplama
+            travel_time = distance / drone.speed
+            arrival_time = current_time + travel_time
+
+            # Zaman kontrolü
+            if arrival_time < delivery.time_window[0]:
+                # Çok erken varış - bekleme süresi
+                current_time = delivery.time_window[0]
+            elif arrival_time > delivery.time_window[1]:
+                # Geç varış - ihlal
+                total_violations += 1
+                current_time = arrival_time
+            else:
+                # Zamanında varış
+                current_time = arrival_time
+
+            # No-fly zone kontrolü (rota ve varış noktası)
+            nfz_violation = graph.nfz_table.is_blocked(current_pos, delivery_id, current_time)
+            if nfz_violation:
+                total_violations += 1
+
+            if not nfz_violation and arrival_time <= delivery.time_window[1]:
+                delivery_count += 1
+
+            current_battery -= energy_needed
+            total_energy += energy_needed
+            current_pos = delivery.pos
+
+        return delivery_count, total_energy, total_violations
@@ -0,0 +1,150 @@
+import random
+from typing import List, Dict
+import numpy as np
+from models.drone import Drone
+from models.delivery import Delivery
+from models.graph import DeliveryGraph
+from utils.helpers import calculate_energy_factor
+
+def nearest_feasible_routes(drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                            start_time: float = 0, rng=random, candidates: int = 3) -> Dict[int, List[int]]:
+    """En yakın uygun teslimat sezgisi: dronelar sırayla en erken bitirebilecekleri teslimatı alır
+
+    Çeşitlilik için en iyi `candidates` aday arasından rastgele seçim yapılır. Hiçbir drone'a
+    uygun olmayan teslimatlar atanmadan bırakılır.
+    """
+    routes = {drone.id: [] for drone in drones}
+    if not deliveries:
+        return routes
+
+    ids = [d.id for d in deliveries]
+    positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+    weights = np.array([d.weight for d in deliveries], dtype=np.float64)
+    window_start = np.array([d.time_window[0] for d in deliveries], dtype=np.float64)
+    window_end = np.array([d.time_window[1] for d in deliveries], dtype=np.float64)
+    energy_factors = calculate_energy_factor(weights)
+    unassigned = np.ones(len(deliveries), dtype=bool)
+
+    tails = {drone.id: [drone.start_pos, start_time, drone.battery] for drone in drones}
+    active = list(drones)
+
+    while active and unassigned.any():
+        for drone in list(active):
+            pos, current_time, battery = tails[drone.id]
+            distance = np.hypot(positions[:, 0] - pos[0], positions[:, 1] - pos[1])
+            energy = distance * energy_factors
+            recharge = energy > battery
+            arrival = current_time + recharge * 5 + distance / drone.speed
+            feasible = (unassigned & (weights <= drone.max_weight) & (energy <= drone.battery)
+                        & (arrival <= window_end))
+
+            # Erken varışta pencere başına kadar beklenir
+            finish = np.where(feasible, np.maximum(arrival, window_start), np.inf)
+            order = np.argsort(finish)[:int(feasible.sum())]
+
+            # Varış anında aktif NFZ'den geçen kenarlar elenir
+            choices = []
+            for i in order:
+                if not graph.nfz_table.is_blocked(pos, ids[i], finish[i]):
+                    choices.append(int(i))
+                    if len(choices) == candidates:
+                        break
+
+            if not choices:
+                active.remove(drone)
+                continue
+
+            i = rng.choice(choices)
+            routes[drone.id].append(ids[i])
+            unassigned[i] = False
+            tails[drone.id] = [deliveries[i].pos, float(finish[i]),
+                               (drone.battery if recharge[i] else battery) - float(energy[i])]
+
+            if not unassigned.any():
+                break
+
+    return routes
+
+def savings_routes(drones: List[Drone], deliveries: List[Delivery], graph: DeliveryGraph,
+                   neighbours: int = 20) -> Dict[int, List[int]]:
+    """Clarke–Wright tasarruf (savings) algoritması ile rotalar
+
+    Depo olarak drone başlangıçlarının ortalaması kullanılır. Tasarruflar her teslimatın en yakın
+    `neighbours` komşusu için hesaplanır; birleştirme, rota sayısı drone sayısına inene kadar ve
+    zaman pencereleri sırasını bozmadıkça yapılır. Rotalar kapasitesi yeten en az yüklü drone'a
+    atanır.
+    """
+    routes = {drone.id: [] for drone in drones}
+    n = len(deliveries)
+    if not n or not drones:
+        return routes
+
+    positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+    weights = np.array([d.weight for d in deliveries], dtype=np.float64)
+    window_start = np.array([d.time_window[0] for d in deliveries], dtype=np.float64)
+    window_end = np.array([d.time_window[1] for d in deliveries], dtype=np.float64)
+    depot = np.array([d.start_pos for d in drones], dtype=np.float64).reshape(-1, 2).mean(axis=0)
+
+    depot_distance = np.hypot(positions[:, 0] - depot[0], positions[:, 1] - depot[1])
+    aligned = graph.matrix_mode or graph.sparse
+    aligned = aligned and len(graph.ids) == n and graph.ids.tolist() == [d.id for d in deliveries]
+
+    # i rotasının sonu ile j rotasının başını birleştirme tasarrufu, en yakın komşularla sınırlı
+    if graph.sparse and aligned:
+        # Seyrek graf: CSR satırları mesafeye göre sıralı, her satırın ilk `neighbours` kenarı
+        row_start = np.repeat(graph.csr_indptr[:-1], np.diff(graph.csr_indptr))
+        keep = np.arange(len(graph.csr_indices)) - row_start < neighbours
+        first = graph.csr_sources()[keep]
+        second = graph.csr_indices[keep]
+        pair_distance = graph.csr_distance[keep].astype(np.float64)
+    else:
+        if graph.matrix_mode and aligned:
+            distance = graph.distance_matrix.astype(np.float64)
+        else:
+            diff = positions[:, None, :] - positions[None, :, :]
+            distance = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+        k = min(neighbours, n - 1)
+        if k > 0:
+            masked = distance + np.diag(np.full(n, np.inf))
+            near = np.argpartition(masked, k - 1, axis=1)[:, :k]
+            first = np.repeat(np.arange(n), k)
+            second = near.ravel()
+            pair_distance = distance[first, second]
+        else:
+            first = second = pair_distance = np.zeros(0, dtype=np.int64)
+
+    savings = depot_distance[first] + depot_distance[second] - pair_distance
+    pairs = np.argsort(-savings, kind='stable')
+    first, second = first[pairs].tolist(), second[pairs].tolist()
+
+    route_of = list(range(n))
+    chains = {i: [i] for i in range(n)}
+    for i, j in zip(first, second):
+        if len(chains) <= len(drones):
+            break
+        ri, rj = route_of[i], route_of[j]
+        if ri == rj or chains[ri][-1] != i or chains[rj][0] != j:
+            continue
+        if window_start[i] > window_end[j]:
+            continue
+
+        for member in chains[rj]:
+            route_of[member] = ri
+        chains[ri].extend(chains.pop(rj))
+
+    # Büyük rotalar önce, kapasitesi yeten en az yüklü drone'a
+    loads = {drone.id: 0 for drone in drones}
+    assigned = {drone.id: [] for drone in drones}
+    for chain in sorted(chains.values(), key=len, reverse=True):
+        heaviest = weights[chain].max()
+        capable = [drone for drone in drones if drone.max_weight >= heaviest] or drones
+        drone = min(capable, key=lambda d: loads[d.id])
+        assigned[drone.id].append(chain)
+        loads[drone.id] += len(chain)
+
+    # Drone'a düşen rotalar pencere başlangıcına göre art arda eklenir
+    for drone in drones:
+        for chain in sorted(assigned[drone.id], key=lambda c: window_start[c[0]]):
+            routes[drone.id].extend(deliveries[i].id for i in chain if weights[i] <= drone.max_weight)
+
+    return routes
@@ -1,15 +1,77 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
+import numpy as np
 from models.delivery import Delivery
 from models.no_fly_zone import NoFlyZone
-from utils.helpers import calculate_distance, line_intersects_polygon
+from utils.helpers import (calculate_distance, calculate_energy_factor, line_intersects_polygon,
+                           segments_intersect_polygon)
+from utils.graph_cache import GraphCache
+from utils.nfz_intervals import NFZIntervalTable
+from utils.spatial_index import NoFlyZoneIndex, k_nearest
+
+NFZ_EDGE_PENALTY = 10000
+
+# Disk önbelleğindeki matris dizilerinin adları
+CACHE_MATRIX_KEYS = ('ids', 'distance', 'cost', 'energy', 'nfz')
 
 class DeliveryGraph:
-    def __init__(self, deliveries: List[Delivery], no_fly_zones: List[NoFlyZone]):
+    def __init__(self, deliveries: List[Delivery], no_fly_zones: List[NoFlyZone],
+                 matrix_mode: bool = True, dtype=np.float64,
+                 origins: Optional[List[Tuple[float, float]]] = None, cache: Optional[GraphCache] = None,
+                 sparse: bool = False, neighbour_count: int = 16, time_successors: int = 4,
+                 arrays: Optional[Dict[str, np.ndarray]] = None):
         self.deliveries = {d.id: d for d in deliveries}
         self.no_fly_zones = no_fly_zones
-        self.adjacency_list = defaultdict(list)
-        self._build_graph()
+        self.nfz_index = NoFlyZoneIndex(no_fly_zones)
+        self.sparse = sparse
+        self.matrix_mode = matrix_mode and not sparse
+        self.dtype = np.dtype(dtype)
+        self.origins = list(origins) if origins else []  # Drone başlangıç konumları
+        self.neighbour_count = neighbour_count
+        self.time_successors = time_successors
+        self.cache = cache
+        self._adjacency_list = None
+        self._nfz_table = None
+        self._neighbours = None
+
+        if sparse:
+            self._build_sparse()
+        elif matrix_mode:
+            # Hazır diziler (ör. to_arrays() ile başka süreçten aktarılan) önceliklidir
+            if arrays is None or not self._load_arrays(arrays):
+                if cache is not None:
+                    self._build_matrices_cached(cache)
+                else:
+                    self._build_matrices()
+        else:
+            self._adjacency_list = defaultdict(list)
+            self._build_graph()
+
+    @property
+    def adjacency_list(self):
+        """Matris ve seyrek modda komşuluk listesi ilk erişimde oluşturulur"""
+        if self._adjacency_list is None:
+            if self.sparse:
+                self._adjacency_list = self._build_sparse_adjacency_view()
+            else:
+                self._adjacency_list = self._build_adjacency_view()
+        return self._adjacency_list
+
+    @property
+    def nfz_table(self) -> NFZIntervalTable:
+        """Kenar bazlı NFZ zaman aralıkları tablosu, ilk erişimde oluşturulur
+
+        Seyrek modda tablo satırları da ilk sorguda hesaplanır.
+        """
+        if self._nfz_table is None:
+            self._nfz_table = NFZIntervalTable(self.deliveries, self.nfz_index, self.origins, lazy=self.sparse)
+        return self._nfz_table
+
+    def register_origins(self, positions: List[Tuple[float, float]]):
+        """Drone başlangıç konumlarını NFZ tablosuna ekleme"""
+        self.origins.extend(positions)
+        if self._nfz_table is not None:
+            self._nfz_table.add_origins(positions)
 
     def _build_graph(self):
 
@@ -23,10 +85,10 @@ class DeliveryGraph:
 
                     # No Fly Zone Kontrolü
                     violates_nfz = False
-                    for nfz in self.no_fly_zones:
+                    for nfz in self.nfz_index.query_segment(d1.pos, d2.pos):
                         if line_intersects_polygon(d1.pos, d2.pos, nfz.coordinates):
                             violates_nfz = True
-                            cost += 10000
+                            cost += NFZ_EDGE_PENALTY
                             break
 
                     self.adjacency_list[d1_id].append({
@@ -34,4 +96,244 @@ class DeliveryGraph:
                         'cost': cost,
                         'distance': distance,
                         'violates_nfz': violates_nfz
-                    })
\ No newline at end of file
+                    })
+
+    def _load_delivery_arrays(self):
+        self.ids = np.array(list(self.deliveries.keys()), dtype=np.int64)
+        self.index = {d_id: i for i, d_id in enumerate(self.deliveries.keys())}
+
+        deliveries = list(self.deliveries.values())
+        self.positions = np.array([d.pos for d in deliveries], dtype=np.float64).reshape(-1, 2)
+        self.weights = np.array([d.weight for d in deliveries], dtype=np.float64)
+        self.priorities = np.array([d.priority for d in deliveries], dtype=np.float64)
+        self.energy_factors = calculate_energy_factor(self.weights)
+
+    def _build_matrices_cached(self, cache: GraphCache):
+        """Matrisleri ve NFZ tablosunu disk önbelleğinden yükleme; yoksa oluşturup kaydetme"""
+        key = cache.key(self.deliveries.values(), self.no_fly_zones, self.origins, self.dtype)
+        arrays = cache.load(key, required=CACHE_MATRIX_KEYS + NFZIntervalTable.ARRAY_KEYS)
+        if arrays is not None and self._load_arrays(arrays):
+            return
+
+        self._build_matrices()
+        cache.store(key, self.to_arrays())
+
+    def _load_arrays(self, arrays: Dict[str, np.ndarray]) -> bool:
+        """to_arrays() çıktısından matrisleri ve NFZ tablosunu yükleme; teslimatlar uyuşmazsa False"""
+        if not np.array_equal(arrays['ids'], list(self.deliveries.keys())):
+            return False
+        self._load_delivery_arrays()
+        self.distance_matrix = arrays['distance']
+        self.cost_matrix = arrays['cost']
+        self.energy_matrix = arrays['energy']
+        self.nfz_matrix = arrays['nfz']
+        self._nfz_table = NFZIntervalTable.from_arrays(self.deliveries, self.nfz_index, arrays)
+        return True
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Matrisler ve NFZ tablosu düz diziler olarak (yalnızca matris modunda)"""
+        if not self.matrix_mode:
+            raise ValueError("Graf dizileri yalnızca matris modunda dışa aktarılabilir")
+        return {
+            'ids': self.ids,
+            'distance': self.distance_matrix,
+            'cost': self.cost_matrix,
+            'energy': self.energy_matrix,
+            'nfz': self.nfz_matrix,
+            **self.nfz_table.to_arrays()
+        }
+
+    def worker_args(self) -> Dict:
+        """Başka bir süreçte aynı grafı kurmak için yapıcı argümanları
+
+        Matris modunda hazır diziler de eklenir, böylece süreç matrisleri yeniden hesaplamaz;
+        seyrek ve liste modlarında aynı ayarlarla (ve varsa aynı disk önbelleğiyle) yeniden kurulur.
+        Kullanım: DeliveryGraph(deliveries, no_fly_zones, **graph.worker_args())
+        """
+        args = {'matrix_mode': self.matrix_mode, 'dtype': self.dtype, 'origins': list(self.origins),
+                'sparse': self.sparse, 'neighbour_count': self.neighbour_count,
+                'time_successors': self.time_successors}
+        if self.matrix_mode:
+            args['arrays'] = self.to_arrays()
+        else:
+            args['cache'] = self.cache
+        return args
+
+    def _build_matrices(self):
+        """Mesafe, maliyet ve enerji matrislerini tek NumPy geçişinde hesaplama"""
+        self._load_delivery_arrays()
+
+        # Satır: kaynak, sütun: hedef teslimat
+        diff = self.positions[:, None, :] - self.positions[None, :, :]
+        distance = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+
+        self.nfz_matrix = self._build_nfz_matrix()
+
+        cost = distance * self.weights[None, :] + self.priorities[None, :] * 100
+        cost += self.nfz_matrix * NFZ_EDGE_PENALTY
+
+        self.distance_matrix = distance.astype(self.dtype, copy=False)
+        self.cost_matrix = cost.astype(self.dtype, copy=False)
+        self.energy_matrix = (distance * self.energy_factors[None, :]).astype(self.dtype, copy=False)
+
+    def _build_nfz_matrix(self) -> np.ndarray:
+        """Her yönlü kenar için NFZ ihlali (True/False) matrisi"""
+        n = len(self.positions)
+        starts = np.repeat(self.positions, n, axis=0)
+        ends = np.tile(self.positions, (n, 1))
+
+        violates = np.zeros(n * n, dtype=bool)
+        for nfz in self.no_fly_zones:
+            violates |= segments_intersect_polygon(starts, ends, nfz.coordinates)
+
+        violates = violates.reshape(n, n)
+        np.fill_diagonal(violates, False)
+        return violates
+
+    def _build_adjacency_view(self):
+        """Matrislerden eski sözlük tabanlı komşuluk listesini üretme"""
+        adjacency_list = defaultdict(list)
+        ids = self.ids.tolist()
+        distances = self.distance_matrix.tolist()
+        costs = self.cost_matrix.tolist()
+        violations = self.nfz_matrix.tolist()
+
+        for i, d1_id in enumerate(ids):
+            for j, d2_id in enumerate(ids):
+                if i != j:
+                    adjacency_list[d1_id].append({
+                        'to': d2_id,
+                        'cost': costs[i][j],
+                        'distance': distances[i][j],
+                        'violates_nfz': violations[i][j]
+                    })
+
+        return adjacency_list
+
+    def _neighbour_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Komşu listeleri CSR (indptr, indices) olarak: en yakın komşular ve zaman ardılları
+
+        Uzamsal komşulardan, kaynağın zaman penceresi başlamadan önce penceresi kapanan teslimatlar
+        elenir. Ardıllar, pencere başlangıcına göre sıralamada kaynaktan hemen sonra gelen
+        teslimatlardır. Her satır mesafeye göre sıralıdır.
+        """
+        n = len(self.positions)
+        deliveries = list(self.deliveries.values())
+        window_start = np.array([d.time_window[0] for d in deliveries], dtype=np.float64)
+        window_end = np.array([d.time_window[1] for d in deliveries], dtype=np.float64)
+        rows = np.arange(n)[:, None]
+
+        near = k_nearest(self.positions, self.neighbour_count)
+        near_valid = window_end[near] >= window_start[:, None]
+
+        order = np.argsort(window_start, kind='stable')
+        rank = np.empty(n, dtype=np.int64)
+        rank[order] = np.arange(n)
+        successor_rank = rank[:, None] + 1 + np.arange(min(self.time_successors, max(n - 1, 0)))[None, :]
+        successor_valid = successor_rank < n
+        successors = order[np.minimum(successor_rank, n - 1)]
+
+        candidates = np.hstack([near, successors])
+        valid = np.hstack([near_valid, successor_valid]) & (candidates != rows)
+
+        # Satır içi tekrarlar elenir, kalanlar mesafeye göre sıralanır
+        candidates = np.where(valid, candidates, -1)
+        by_index = np.argsort(candidates, axis=1, kind='stable')
+        sorted_candidates = np.take_along_axis(candidates, by_index, axis=1)
+        duplicate = np.zeros_like(valid)
+        duplicate[:, 1:] = sorted_candidates[:, 1:] == sorted_candidates[:, :-1]
+        np.put_along_axis(valid, by_index, np.take_along_axis(valid, by_index, axis=1) & ~duplicate, axis=1)
+
+        safe = np.maximum(candidates, 0)
+        distance = np.hypot(self.positions[safe, 0] - self.positions[:, None, 0],
+                            self.positions[safe, 1] - self.positions[:, None, 1])
+        by_distance = np.argsort(np.where(valid, distance, np.inf), axis=1, kind='stable')
+        candidates = np.take_along_axis(candidates, by_distance, axis=1)
+        valid = np.take_along_axis(valid, by_distance, axis=1)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(valid.sum(axis=1), out=indptr[1:])
+        return indptr, candidates[valid].astype(np.int64)
+
+    def _build_sparse(self):
+        """Yalnızca komşu kenarlarını CSR dizilerinde (indptr, indices, mesafe) tutan O(n·k) graf
+
+        Maliyet ve statik NFZ bilgisi saklanmaz; komşuluk listesi ve edge() bunları istendiğinde
+        hesaplar. Çözücüler zamana bağlı NFZ kontrolü için nfz_table'ı kullanır.
+        """
+        self._load_delivery_arrays()
+        self.csr_indptr, self.csr_indices = self._neighbour_csr()
+
+        sources = self.csr_sources()
+        starts, ends = self.positions[sources], self.positions[self.csr_indices]
+        distance = np.hypot(ends[:, 0] - starts[:, 0], ends[:, 1] - starts[:, 1])
+        self.csr_distance = distance.astype(self.dtype, copy=False)
+
+    def csr_sources(self) -> np.ndarray:
+        """CSR kenarlarının kaynak indeksleri (csr_indices ile aynı uzunlukta)"""
+        return np.repeat(np.arange(len(self.positions)), np.diff(self.csr_indptr))
+
+    def _build_sparse_adjacency_view(self):
+        """CSR dizilerinden yalnızca saklanan kenarları içeren komşuluk listesi"""
+        sources = self.csr_sources()
+        starts, ends = self.positions[sources], self.positions[self.csr_indices]
+        violates = np.zeros(len(sources), dtype=bool)
+        for nfz in self.no_fly_zones:
+            violates |= segments_intersect_polygon(starts, ends, nfz.coordinates)
+
+        distance = self.csr_distance.astype(np.float64)
+        cost = distance * self.weights[self.csr_indices] + self.priorities[self.csr_indices] * 100
+        cost += violates * NFZ_EDGE_PENALTY
+
+        adjacency_list = defaultdict(list)
+        ids = self.ids.tolist()
+        indptr = self.csr_indptr.tolist()
+        targets = self.csr_indices.tolist()
+        distances = distance.tolist()
+        costs = cost.tolist()
+        violations = violates.tolist()
+
+        for i, d1_id in enumerate(ids):
+            for e in range(indptr[i], indptr[i + 1]):
+                adjacency_list[d1_id].append({
+                    'to': ids[targets[e]],
+                    'cost': costs[e],
+                    'distance': distances[e],
+                    'violates_nfz': violations[e]
+                })
+
+        return adjacency_list
+
+    def neighbours(self, delivery_id: int) -> List[int]:
+        """Teslimatın komşu listesi (yakından uzağa); seyrek olmayan modlarda ilk çağrıda hesaplanır"""
+        if self._neighbours is None:
+            if not self.sparse and not self.matrix_mode:
+                self._load_delivery_arrays()
+            indptr, indices = (self.csr_indptr, self.csr_indices) if self.sparse else self._neighbour_csr()
+            ids = self.ids.tolist()
+            indptr, indices = indptr.tolist(), indices.tolist()
+            self._neighbours = {d_id: [ids[j] for j in indices[indptr[i]:indptr[i + 1]]]
+                                for i, d_id in enumerate(ids)}
+        return self._neighbours[delivery_id]
+
+    def edge(self, from_id: int, to_id: int) -> Dict:
+        """Kenar bilgisi; matris modu dışında (seyrek mod dahil) o anda tam olarak hesaplanır"""
+        if self.matrix_mode:
+            i, j = self.index[from_id], self.index[to_id]
+            return {'to': to_id, 'cost': float(self.cost_matrix[i, j]),
+                    'distance': float(self.distance_matrix[i, j]), 'violates_nfz': bool(self.nfz_matrix[i, j])}
+
+        d1, d2 = self.deliveries[from_id], self.deliveries[to_id]
+        distance = calculate_distance(d1.pos, d2.pos)
+        cost = distance * d2.weight + (d2.priority * 100)
+        violates_nfz = any(line_intersects_polygon(d1.pos, d2.pos, nfz.coordinates)
+                           for nfz in self.nfz_index.query_segment(d1.pos, d2.pos))
+        if violates_nfz:
+            cost += NFZ_EDGE_PENALTY
+        return {'to': to_id, 'cost': cost, 'distance': distance, 'violates_nfz': violates_nfz}
+
+    def distance(self, from_id: int, to_id: int) -> float:
+        """İki teslimat noktası arasındaki mesafe"""
+        if self.matrix_mode:
+            return float(self.distance_matrix[self.index[from_id], self.index[to_id]])
+        return calculate_distance(self.deliveries[from_id].pos, self.deliveries[to_id].pos)
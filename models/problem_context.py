@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional
+import numpy as np
+from models.drone import Drone
+from models.delivery import Delivery
+from models.no_fly_zone import NoFlyZone
+from models.graph import DeliveryGraph
+from utils.graph_cache import GraphCache
+from utils.helpers import calculate_energy_factor
+from utils.nfz_intervals import NFZIntervalTable
+
+class ProblemContext:
+    """Problem girdileri ve bunlardan türetilen ortak ön hesaplamalar
+
+    Simülasyon ve tüm çözücüler (A*, GA, CSP, ALNS, yerel arama) aynı bağlamı paylaşır; her ürün
+    (indeks haritaları, graf ve mesafe/NFZ matrisleri, kaynak–teslimat mesafe/enerji matrisleri,
+    drone–teslimat uyumluluğu) ilk erişimde bir kez hesaplanır. Tüketiciler ürünleri kullanım
+    anında bağlamdan okumalıdır; aksi halde update()/invalidate() sonrası eski kopya kullanılır.
+    Girdiler update() ile değiştirildiğinde yalnızca bağımlı ürünler silinir; invalidate() ile
+    ürünler elle de silinebilir.
+    """
+
+    # Ürün -> bağlı olduğu girdiler
+    DEPENDENCIES = {
+        'delivery_index': ('deliveries',),
+        'drone_index': ('drones',),
+        'graph': ('drones', 'deliveries', 'no_fly_zones'),
+        'origin_positions': ('drones', 'deliveries'),
+        'origin_distance': ('drones', 'deliveries'),
+        'origin_energy': ('drones', 'deliveries'),
+        'compatibility': ('drones', 'deliveries'),
+        'capable_drones': ('drones', 'deliveries'),
+    }
+
+    def __init__(self, drones: List[Drone], deliveries: List[Delivery], no_fly_zones: List[NoFlyZone],
+                 matrix_mode: bool = True, dtype=np.float64, graph_cache: Optional[GraphCache] = None,
+                 sparse: bool = False):
+        self.drones = drones
+        self.deliveries = deliveries
+        self.no_fly_zones = no_fly_zones
+        self.matrix_mode = matrix_mode
+        self.dtype = dtype
+        self.sparse = sparse  # Büyük örnekler için k-en yakın komşu grafı
+        self.graph_cache = graph_cache  # Verilirse graf diskten yüklenir/diske yazılır
+        self._artefacts = {}
+
+    def _get(self, name: str, build):
+        if name not in self._artefacts:
+            self._artefacts[name] = build()
+        return self._artefacts[name]
+
+    @property
+    def delivery_index(self) -> Dict[int, int]:
+        """Teslimat id -> liste indeksi"""
+        return self._get('delivery_index', lambda: {d.id: i for i, d in enumerate(self.deliveries)})
+
+    @property
+    def drone_index(self) -> Dict[int, int]:
+        """Drone id -> liste indeksi"""
+        return self._get('drone_index', lambda: {d.id: i for i, d in enumerate(self.drones)})
+
+    @property
+    def graph(self) -> DeliveryGraph:
+        """Teslimat grafı (mesafe, maliyet, enerji ve NFZ matrisleri)"""
+        return self._get('graph', lambda: DeliveryGraph(self.deliveries, self.no_fly_zones,
+                                                        matrix_mode=self.matrix_mode, dtype=self.dtype,
+                                                        sparse=self.sparse,
+                                                        origins=[d.start_pos for d in self.drones],
+                                                        cache=self.graph_cache))
+
+    @property
+    def distance_matrix(self) -> np.ndarray:
+        """Teslimatlar arası mesafe matrisi (satır: kaynak, sütun: hedef)"""
+        graph = self.graph
+        if not graph.matrix_mode:
+            raise ValueError("Mesafe matrisi yalnızca matris modunda kullanılabilir")
+        return graph.distance_matrix
+
+    @property
+    def nfz_matrix(self) -> np.ndarray:
+        """Zamandan bağımsız NFZ kesişim matrisi"""
+        graph = self.graph
+        if not graph.matrix_mode:
+            raise ValueError("NFZ matrisi yalnızca matris modunda kullanılabilir")
+        return graph.nfz_matrix
+
+    @property
+    def nfz_table(self) -> NFZIntervalTable:
+        """Kenar bazlı NFZ kapalı zaman aralıkları"""
+        return self.graph.nfz_table
+
+    @property
+    def origin_positions(self) -> np.ndarray:
+        """Kaynak konumları: önce teslimatlar (0..n-1), sonra drone başlangıçları (n..n+m-1)"""
+        def build():
+            positions = np.array([d.pos for d in self.deliveries], dtype=np.float64).reshape(-1, 2)
+            starts = np.array([d.start_pos for d in self.drones], dtype=np.float64).reshape(-1, 2)
+            return np.vstack([positions, starts])
+        return self._get('origin_positions', build)
+
+    @property
+    def origin_distance(self) -> np.ndarray:
+        """(n + m, n) boyutlu kaynak -> teslimat mesafe matrisi"""
+        def build():
+            origins = self.origin_positions
+            positions = origins[:len(self.deliveries)]
+            diff = origins[:, None, :] - positions[None, :, :]
+            return np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+        return self._get('origin_distance', build)
+
+    @property
+    def origin_energy(self) -> np.ndarray:
+        """(n + m, n) boyutlu kaynak -> teslimat enerji matrisi (mesafe x hedefin enerji katsayısı)"""
+        def build():
+            weights = np.array([d.weight for d in self.deliveries], dtype=np.float64)
+            return self.origin_distance * calculate_energy_factor(weights)[None, :]
+        return self._get('origin_energy', build)
+
+    @property
+    def compatibility(self) -> np.ndarray:
+        """(drone, teslimat) boyutlu ağırlık kapasitesi uyumluluk matrisi"""
+        def build():
+            max_weights = np.array([d.max_weight for d in self.drones], dtype=np.float64)
+            weights = np.array([d.weight for d in self.deliveries], dtype=np.float64)
+            return weights[None, :] <= max_weights[:, None]
+        return self._get('compatibility', build)
+
+    @property
+    def capable_drones(self) -> Dict[int, List[Drone]]:
+        """Teslimat id -> ağırlık kapasitesi yeten dronelar"""
+        def build():
+            compatibility = self.compatibility
+            return {d.id: [drone for k, drone in enumerate(self.drones) if compatibility[k, i]]
+                    for i, d in enumerate(self.deliveries)}
+        return self._get('capable_drones', build)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._artefacts
+
+    def invalidate(self, *names: str):
+        """Verilen ürünleri (ad verilmezse tümünü) silme; sonraki erişimde yeniden hesaplanır"""
+        if not names:
+            self._artefacts.clear()
+            return
+        for name in names:
+            if name not in self.DEPENDENCIES:
+                raise ValueError(f"Bilinmeyen ürün: {name}")
+            self._artefacts.pop(name, None)
+
+    def update(self, drones: Optional[List[Drone]] = None, deliveries: Optional[List[Delivery]] = None,
+               no_fly_zones: Optional[List[NoFlyZone]] = None):
+        """Girdileri değiştirip bunlara bağlı ürünleri silme"""
+        changed = set()
+        if drones is not None:
+            self.drones = drones
+            changed.add('drones')
+        if deliveries is not None:
+            self.deliveries = deliveries
+            changed.add('deliveries')
+        if no_fly_zones is not None:
+            self.no_fly_zones = no_fly_zones
+            changed.add('no_fly_zones')
+
+        stale = [name for name, inputs in self.DEPENDENCIES.items() if changed.intersection(inputs)]
+        if stale:
+            self.invalidate(*stale)
@@ -2,9 +2,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import threading
 from datetime import datetime
-import matplotlib.pyplot as plt
 from main import DroneDeliverySimulation
-from utils.data_loader import drones, deliveries, no_fly_zones
+from utils.data_loader import load_validated_data
 from utils.random_data_generator import RandomDataGenerator
 from performance_tester import PerformanceTester
 
@@ -14,6 +13,9 @@ class DroneSimulationGUI:
         self.root.title("Drone Teslimat Simülasyonu")
         self.root.geometry("800x600")
 
+        # Veri seti modül içe aktarılırken değil, arayüz açılırken yüklenir
+        self.drones, self.deliveries, self.no_fly_zones = load_validated_data()
+
         self.setup_ui()
 
         self.current_simulation = None
@@ -42,9 +44,9 @@ class DroneSimulationGUI:
         info_frame = ttk.LabelFrame(self.main_frame, text="Veri Seti Bilgileri")
         info_frame.pack(fill="x", padx=10, pady=5)
 
-        tk.Label(info_frame, text=f"Drone Sayısı: {len(drones)}").pack(anchor="w", padx=5)
-        tk.Label(info_frame, text=f"Teslimat Sayısı: {len(deliveries)}").pack(anchor="w", padx=5)
-        tk.Label(info_frame, text=f"No-Fly Zone Sayısı: {len(no_fly_zones)}").pack(anchor="w", padx=5)
+        tk.Label(info_frame, text=f"Drone Sayısı: {len(self.drones)}").pack(anchor="w", padx=5)
+        tk.Label(info_frame, text=f"Teslimat Sayısı: {len(self.deliveries)}").pack(anchor="w", padx=5)
+        tk.Label(info_frame, text=f"No-Fly Zone Sayısı: {len(self.no_fly_zones)}").pack(anchor="w", padx=5)
 
         button_frame = ttk.Frame(self.main_frame)
         button_frame.pack(fill="x", padx=10, pady=10)
@@ -123,7 +125,7 @@ class DroneSimulationGUI:
                 self.run_main_btn.config(state="disabled")
                 self.log_message("Ana simülasyon başlatılıyor...")
 
-                simulation = DroneDeliverySimulation(drones, deliveries, no_fly_zones)
+                simulation = DroneDeliverySimulation(self.drones, self.deliveries, self.no_fly_zones)
                 self.current_simulation = simulation
 
                 self.log_message("A* algoritması çalıştırılıyor...")
@@ -270,6 +272,8 @@ class DroneSimulationGUI:
             return
 
         try:
+            import matplotlib.pyplot as plt
+
             fig_a_star = self.current_simulation.visualize_routes('a_star')
             fig_a_star.suptitle("A* Algoritması Rotaları", fontsize=16)
             plt.show()
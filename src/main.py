@@ -1,40 +1,107 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
-from algorithms.a_star import AStarPathfinder
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from algorithms.a_star import AStarPathfinder, HeuristicCache
+from algorithms.parallel_a_star import plan_drones_parallel
 from algorithms.ga import GeneticAlgorithm
 from algorithms.csp import CSPSolverWithAStar
+from algorithms.local_search import LocalSearch
+from algorithms.alns import ALNS
 from models.drone import Drone
 from models.delivery import Delivery
 from models.no_fly_zone import NoFlyZone
 from models.graph import DeliveryGraph
-from matplotlib.lines import Line2D
-from utils.helpers import *
-from utils.random_data_generator import *
+from models.problem_context import ProblemContext
+from utils.graph_cache import GraphCache
+from utils.helpers import calculate_distance, calculate_energy_consumption
+from utils.random_data_generator import RandomDataGenerator
 
 class DroneDeliverySimulation:
     """Drone teslimat simülasyonunu yöneten ana sınıf"""
 
     def __init__(self, drones_data: List[Dict], deliveries_data: List[Dict],
-                 no_fly_zones_data: List[Dict]):
+                 no_fly_zones_data: List[Dict], graph_cache: Optional[GraphCache] = None):
         self.drones = [Drone(**d) for d in drones_data]
         self.deliveries = [Delivery(**d) for d in deliveries_data]
         self.no_fly_zones = [NoFlyZone(**nfz) for nfz in no_fly_zones_data]
 
-        self.graph = DeliveryGraph(self.deliveries, self.no_fly_zones)
+        # Graf ve diğer ön hesaplamalar tüm çözücülerce paylaşılır; graph_cache verilirse
+        # aynı senaryonun grafı diskten yüklenir
+        self.context = ProblemContext(self.drones, self.deliveries, self.no_fly_zones, graph_cache=graph_cache)
 
-        self.csp_solver = CSPSolverWithAStar(self.drones, self.deliveries, self.no_fly_zones)
-        self.genetic_algorithm = GeneticAlgorithm(self.drones, self.deliveries, self.graph)
+        # Tüm drone'ların pathfinder'ları aynı heuristic önbelleğini kullanır
+        self.heuristic_cache = HeuristicCache()
+
+        self.csp_solver = CSPSolverWithAStar(self.drones, self.deliveries, self.no_fly_zones,
+                                             heuristic_cache=self.heuristic_cache, context=self.context)
+        self.genetic_algorithm = GeneticAlgorithm(self.drones, self.deliveries, None, seed_fraction=0.2,
+                                                  context=self.context)
 
         self.results = {
             'a_star': {'routes': {}, 'metrics': {}},
             'genetic': {'routes': {}, 'metrics': {}},
+            'alns': {'routes': {}, 'metrics': {}},
             'csp_violations': []
         }
 
-    def run_a_star_simulation(self) -> Dict:
-        """A* algoritması ile simülasyonu çalıştırır"""
+    @property
+    def graph(self) -> DeliveryGraph:
+        """Bağlamın güncel grafı; ilk erişimde oluşturulur"""
+        return self.context.graph
+
+    def run_a_star_simulation(self, path_time_budget: Optional[float] = None, parallel: bool = False,
+                              workers: Optional[int] = None, local_search_budget: Optional[float] = 1.0) -> Dict:
+        """A* algoritması ile simülasyonu çalıştırır
+
+        path_time_budget verilirse her find_path çağrısı bu süre (saniye) ile anytime modda çalışır.
+        parallel=True ise dronelar sırayla değil, paylaşılan sahiplik tablosu üzerinden eşzamanlı
+        planlanır (workers: süreç sayısı, 0 ise tek süreç).
+        local_search_budget verilirse A* rotaları bu süre (saniye) boyunca yerel arama ile iyileştirilir;
+        skor artarsa metrikler iyileştirilmiş rotalar üzerinden hesaplanır.
+        """
         start_time = time.time()
 
+        if parallel:
+            routes, total_energy, total_distance, delivered = self._run_a_star_parallel(path_time_budget, workers)
+        else:
+            routes, total_energy, total_distance, delivered = self._run_a_star_sequential(path_time_budget)
+
+        local_search_stats = None
+        if local_search_budget:
+            solution = {drone_id: [step['delivery_id'] for step in route] for drone_id, route in routes.items()}
+            local_search = LocalSearch(self.drones, self.deliveries, self.graph, context=self.context)
+            improved_solution = local_search.optimize(solution, time_budget=local_search_budget)
+            local_search_stats = local_search.stats
+            if local_search_stats['final_score'] > local_search_stats['initial_score']:
+                routes, total_energy, total_distance, delivered = self._simulate_solution(improved_solution)
+
+        end_time = time.time()
+
+        metrics = {
+            'completed_deliveries': len(delivered),
+            'completion_rate': len(delivered) / len(self.deliveries) * 100 if self.deliveries else 0,
+            'total_energy': total_energy,
+            'total_distance': total_distance,
+            'avg_energy_per_delivery': total_energy / len(delivered) if delivered else 0,
+            'execution_time': end_time - start_time,
+            'heuristic_cache': self.heuristic_cache.stats(),
+            'local_search': local_search_stats
+        }
+
+        self.results['a_star']['routes'] = routes
+        self.results['a_star']['metrics'] = metrics
+
+        print(f"A* Algoritması Tamamlandı:")
+        print(f"Toplam teslimat: {len(delivered)}/{len(self.deliveries)} (%{metrics['completion_rate']:.1f})")
+        print(f"Çalışma süresi: {metrics['execution_time']:.2f} saniye")
+        cache_stats = metrics['heuristic_cache']
+        print(f"Heuristic önbelleği: {cache_stats['hits']} isabet, {cache_stats['misses']} ıskalama "
+              f"(%{cache_stats['hit_rate'] * 100:.1f})")
+
+        return routes
+
+    def _run_a_star_sequential(self, path_time_budget: Optional[float] = None):
+        """Dronelar sırayla planlanır; her drone kalan teslimatlar üzerinde A* çalıştırır"""
         routes = {d.id: [] for d in self.drones}
         delivered = set()
         total_energy = 0
@@ -42,7 +109,7 @@ class DroneDeliverySimulation:
         current_time = 0
 
         for drone in self.drones:
-            pathfinder = AStarPathfinder(self.graph, drone)
+            pathfinder = AStarPathfinder(self.graph, drone, heuristic_cache=self.heuristic_cache)
             drone_route = []
             drone_energy = 0
             drone_distance = 0
@@ -68,7 +135,8 @@ class DroneDeliverySimulation:
                     print(f"Drone {drone.id}: Batarya bitti")
                     break
 
-                path = pathfinder.find_path(current_pos, unvisited, current_time)
+                path = pathfinder.find_path(current_pos, unvisited, current_time,
+                                            time_budget=path_time_budget)
 
                 if not path:
                     print(f"Drone {drone.id}: Rota bulunamadı")
@@ -144,39 +212,86 @@ class DroneDeliverySimulation:
 
             print(f"Drone {drone.id} özet: {len(drone_route)} teslimat, {drone_energy:.2f} mAh, {consecutive_failures} ardışık başarısızlık")
 
+        return routes, total_energy, total_distance, delivered
+
+    def _run_a_star_parallel(self, path_time_budget: Optional[float] = None, workers: Optional[int] = None):
+        """Tüm dronelar eşzamanlı planlanır; çakışan teslimatı marjinal maliyeti düşük drone alır"""
+        routes = {d.id: [] for d in self.drones}
+        delivered = set()
+        total_energy = 0
+        total_distance = 0
+
+        plans = plan_drones_parallel(self.drones, self.deliveries, self.graph, workers=workers,
+                                     path_time_budget=path_time_budget,
+                                     heuristic_cache=self.heuristic_cache)
+        for drone in self.drones:
+            plan = plans[drone.id]
+            routes[drone.id] = plan['route']
+            total_energy += plan['energy']
+            total_distance += plan['distance']
+            for step in plan['route']:
+                delivered.add(step['delivery_id'])
+                self.graph.deliveries[step['delivery_id']].delivered = True
+
+        return routes, total_energy, total_distance, delivered
+
+    def run_genetic_algorithm_simulation(self, local_search_budget: Optional[float] = 1.0) -> Dict:
+        """Genetik algoritma ile simülasyonu çalıştırır
+
+        local_search_budget verilirse en iyi çözüm bu süre (saniye) boyunca yerel arama ile iyileştirilir.
+        """
+        start_time = time.time()
+
+        # A* çalıştırıldıysa rotaları GA'nın ilk popülasyonuna tohum olarak eklenir
+        a_star_routes = self.results['a_star']['routes']
+        if a_star_routes:
+            self.genetic_algorithm.seed_solutions = [{
+                drone_id: [step['delivery_id'] for step in route] for drone_id, route in a_star_routes.items()
+            }]
+
+        run_info = self.genetic_algorithm.run_detailed()
+        best_solution = run_info['best_individual']
+
+        local_search_stats = None
+        if local_search_budget:
+            local_search = LocalSearch(self.drones, self.deliveries, self.graph,
+                                       start_time=self.genetic_algorithm.start_time, context=self.context)
+            best_solution = local_search.optimize(best_solution, time_budget=local_search_budget)
+            local_search_stats = local_search.stats
+
+        routes, total_energy, total_distance, delivered = self._simulate_solution(best_solution)
+
         end_time = time.time()
 
         metrics = {
             'completed_deliveries': len(delivered),
-            'completion_rate': len(delivered) / len(self.deliveries) * 100 if self.deliveries else 0,
+            'completion_rate': len(delivered) / len(self.deliveries) * 100,
             'total_energy': total_energy,
             'total_distance': total_distance,
             'avg_energy_per_delivery': total_energy / len(delivered) if delivered else 0,
-            'execution_time': end_time - start_time
+            'execution_time': end_time - start_time,
+            'final_fitness': self.genetic_algorithm.fitness(best_solution),
+            'fitness_cache_hit_rate': self._mean_cache_hit_rate(self.genetic_algorithm.cache_history),
+            'generation_scores': run_info['generation_scores'],
+            'generations_run': run_info['generations_run'],
+            'stop_reason': run_info['stop_reason'],
+            'local_search': local_search_stats
         }
 
-        self.results['a_star']['routes'] = routes
-        self.results['a_star']['metrics'] = metrics
-
-        print(f"A* Algoritması Tamamlandı:")
-        print(f"Toplam teslimat: {len(delivered)}/{len(self.deliveries)} (%{metrics['completion_rate']:.1f})")
-        print(f"Çalışma süresi: {metrics['execution_time']:.2f} saniye")
+        self.results['genetic']['routes'] = routes
+        self.results['genetic']['metrics'] = metrics
 
         return routes
 
-    def run_genetic_algorithm_simulation(self) -> Dict:
-        """Genetik algoritma ile simülasyonu çalıştırır"""
-        start_time = time.time()
-
-        best_solution = self.genetic_algorithm.run()
-
+    def _simulate_solution(self, solution: Dict[int, List[int]]):
+        """Drone -> teslimat id çözümünü rota adımlarına ve enerji/mesafe toplamlarına çevirir"""
         routes = {d.id: [] for d in self.drones}
         total_energy = 0
         total_distance = 0
         delivered = set()
         simulation_time = 0
 
-        for drone_id, delivery_ids in best_solution.items():
+        for drone_id, delivery_ids in solution.items():
             if not delivery_ids:
                 continue
 
@@ -186,7 +301,7 @@ class DroneDeliverySimulation:
             current_battery = drone.battery
 
             for delivery_id in delivery_ids:
-                delivery = next(d for d in self.deliveries if d.id == delivery_id)
+                delivery = self.graph.deliveries[delivery_id]
 
                 distance = calculate_distance(current_pos, delivery.pos)
                 energy = calculate_energy_consumption(distance, delivery.weight)
@@ -214,25 +329,53 @@ class DroneDeliverySimulation:
                 current_time = arrival_time
                 current_battery -= energy
 
+        return routes, total_energy, total_distance, delivered
+
+    def run_alns_simulation(self, time_budget: float = 5.0) -> Dict:
+        """ALNS ile simülasyonu çalıştırır; time_budget saniye içinde en iyi çözüm döndürülür"""
+        start_time = time.time()
+
+        alns = ALNS(self.drones, self.deliveries, self.graph, time_budget=time_budget, context=self.context)
+        best_solution = alns.run()
+
+        routes, total_energy, total_distance, delivered = self._simulate_solution(best_solution)
+
         end_time = time.time()
 
         metrics = {
             'completed_deliveries': len(delivered),
-            'completion_rate': len(delivered) / len(self.deliveries) * 100,
+            'completion_rate': len(delivered) / len(self.deliveries) * 100 if self.deliveries else 0,
             'total_energy': total_energy,
             'total_distance': total_distance,
             'avg_energy_per_delivery': total_energy / len(delivered) if delivered else 0,
             'execution_time': end_time - start_time,
-            'final_fitness': self.genetic_algorithm.fitness(best_solution)
+            'final_fitness': alns.stats['best_score'],
+            'iterations': alns.stats['iterations'],
+            'destroy_weights': alns.stats['destroy_weights'],
+            'repair_weights': alns.stats['repair_weights']
         }
 
-        self.results['genetic']['routes'] = routes
-        self.results['genetic']['metrics'] = metrics
+        self.results['alns']['routes'] = routes
+        self.results['alns']['metrics'] = metrics
+
+        print(f"ALNS Tamamlandı: {len(delivered)}/{len(self.deliveries)} teslimat, "
+              f"{metrics['iterations']} iterasyon, fitness {metrics['final_fitness']:.2f}")
 
         return routes
 
+    @staticmethod
+    def _mean_cache_hit_rate(cache_history: List[Dict]) -> float:
+        hits = sum(entry['hits'] for entry in cache_history)
+        total = hits + sum(entry['misses'] for entry in cache_history)
+        return hits / total if total else 0
+
     def visualize_routes(self, algorithm: str = 'a_star', current_simulation_time: float = None):
         """Rotaları görselleştirir"""
+        # matplotlib yalnızca görselleştirme istendiğinde yüklenir
+        import matplotlib.pyplot as plt
+        import matplotlib.patches as patches
+        from matplotlib.lines import Line2D
+
         fig, ax = plt.subplots(figsize=(14, 10))
 
         if current_simulation_time is None:
@@ -408,6 +551,20 @@ class DroneDeliverySimulation:
         report.append(f"Algoritma Çalışma Süresi: {ga_metrics['execution_time']:.4f} saniye")
         report.append("")
 
+        alns_metrics = self.results['alns']['metrics']
+        if alns_metrics:
+            report.append("ALNS")
+            report.append("-" * 40)
+            report.append(f"Tamamlanan Teslimat Sayısı: {alns_metrics['completed_deliveries']}/{len(self.deliveries)}")
+            report.append(f"Tamamlanma Oranı: {alns_metrics['completion_rate']:.2f}%")
+            report.append(f"Toplam Enerji Tüketimi: {alns_metrics['total_energy']:.2f} mAh")
+            report.append(f"Toplam Mesafe: {alns_metrics['total_distance']:.2f} metre")
+            report.append(f"Teslimat Başına Ortalama Enerji: {alns_metrics['avg_energy_per_delivery']:.2f} mAh")
+            report.append(f"Final Fitness Skoru: {alns_metrics['final_fitness']:.2f}")
+            report.append(f"İterasyon Sayısı: {alns_metrics['iterations']}")
+            report.append(f"Algoritma Çalışma Süresi: {alns_metrics['execution_time']:.4f} saniye")
+            report.append("")
+
         report.append("Zaman Karmaşıklığı")
         report.append("-" * 40)
         report.append("A* Algoritması:")
@@ -426,6 +583,8 @@ class DroneDeliverySimulation:
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
     generator = RandomDataGenerator()
 
     scenarios = [
@@ -454,6 +613,9 @@ if __name__ == "__main__":
         print("Genetik Algoritma çalıştırılıyor...")
         genetic_routes = simulation.run_genetic_algorithm_simulation()
 
+        print("ALNS çalıştırılıyor...")
+        alns_routes = simulation.run_alns_simulation()
+
         report = simulation.generate_report()
         print("\n" + report)
 
@@ -464,4 +626,7 @@ if __name__ == "__main__":
         fig_genetic = simulation.visualize_routes('genetic')
         plt.savefig(f"{s['name']}_routes_genetic.png", dpi=300, bbox_inches='tight')
 
+        fig_alns = simulation.visualize_routes('alns')
+        plt.savefig(f"{s['name']}_routes_alns.png", dpi=300, bbox_inches='tight')
+
         print(f"{s['name']} görselleştirmeleri ve raporu tamamlandı.")
\ No newline at end of file
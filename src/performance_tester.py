@@ -1,5 +1,4 @@
 import time
-import matplotlib.pyplot as plt
 import numpy as np
 from typing import Dict
 import json
@@ -70,6 +69,8 @@ class PerformanceTester:
         return self.results
 
     def generate_performance_charts(self):
+        import matplotlib.pyplot as plt
+
         scenario_names = list(self.results['a_star'].keys())
 
         # Tamamlanma Oranı Karşılaştırması
@@ -1,16 +1,17 @@
 import os
 import sys
-import matplotlib.pyplot as plt
 from datetime import datetime
 from main import DroneDeliverySimulation
-from utils.data_loader import drones, deliveries, no_fly_zones
+from utils.data_loader import load_validated_data
 from utils.random_data_generator import RandomDataGenerator, create_test_scenarios
 from performance_tester import PerformanceTester
-from utils.helpers import *
+from utils.helpers import analyze_time_complexity
 
 def run_main_simulation():
     """Ana simülasyon"""
+    import matplotlib.pyplot as plt
 
+    drones, deliveries, no_fly_zones = load_validated_data()
     simulation = DroneDeliverySimulation(drones, deliveries, no_fly_zones)
 
     print("\n1. A* Algoritması çalıştırılıyor...")
@@ -40,6 +41,7 @@ def run_main_simulation():
 
 def run_time_complexity_analysis():
     """Zaman karmaşıklığı analizi"""
+    import matplotlib.pyplot as plt
 
     deliveries_count = [10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
     print(f"Test edilecek teslimat sayıları: {deliveries_count}")
@@ -1,5 +1,21 @@
+import ast
+import csv
+import json
 import os
-from typing import List, Dict, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+SCENARIO_KEYS = ('drones', 'deliveries', 'no_fly_zones')
+
+# JSON Lines kayıtlarındaki 'type' alanı -> senaryo anahtarı
+RECORD_TYPES = {'drone': 'drones', 'delivery': 'deliveries', 'no_fly_zone': 'no_fly_zones'}
+
+# CSV sütunları; NFZ köşeleri "x1 y1;x2 y2;..." biçiminde tek sütundadır
+CSV_COLUMNS = {
+    'drones': ('id', 'max_weight', 'battery', 'speed', 'start_x', 'start_y'),
+    'deliveries': ('id', 'x', 'y', 'weight', 'priority', 'window_start', 'window_end'),
+    'no_fly_zones': ('id', 'coordinates', 'active_start', 'active_end'),
+}
 
 def load_data_from_file(filename: str = "data/veri_seti.txt") -> Tuple[List[Dict], List[Dict], List[Dict]]:
     try:
@@ -8,14 +24,7 @@ def load_data_from_file(filename: str = "data/veri_seti.txt") -> Tuple[List[Dict
             return get_default_data()
 
         with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        namespace = {}
-        exec(content, namespace)
-
-        drones = namespace.get('drones', [])
-        deliveries = namespace.get('deliveries', [])
-        no_fly_zones = namespace.get('no_fly_zones', [])
+            drones, deliveries, no_fly_zones = parse_literal_scenario(f.read())
 
         print(f"{len(drones)} drone")
         print(f"{len(deliveries)} teslimat noktası")
@@ -28,6 +37,304 @@ def load_data_from_file(filename: str = "data/veri_seti.txt") -> Tuple[List[Dict
         print("Varsayılan veriler kullanılıyor.")
         return get_default_data()
 
+def parse_literal_scenario(content: str) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """`drones = [...]` biçimindeki metni kod çalıştırmadan ayrıştırma
+
+    Yalnızca senaryo adlarına yapılan atamalar okunur ve değerleri ast.literal_eval ile
+    (sadece sabitler, liste, demet ve sözlükler) çözülür; diğer ifadeler yok sayılır.
+    """
+    values = {}
+    for node in ast.parse(content).body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id in SCENARIO_KEYS):
+            values[node.targets[0].id] = ast.literal_eval(node.value)
+    return tuple(values.get(key, []) for key in SCENARIO_KEYS)
+
+def load_scenario(path: str, chunk_size: int = 50000) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Uzantıya göre senaryo yükleme: .json, .jsonl/.ndjson, .txt/.py ya da CSV dizini
+
+    CSV dizini drones.csv, deliveries.csv ve (isteğe bağlı) no_fly_zones.csv içermelidir.
+    Hatalı kayıtlarda ValueError fırlatılır.
+    """
+    if os.path.isdir(path):
+        nfz_path = os.path.join(path, 'no_fly_zones.csv')
+        return load_scenario_csv(os.path.join(path, 'drones.csv'), os.path.join(path, 'deliveries.csv'),
+                                 nfz_path if os.path.exists(nfz_path) else None, chunk_size)
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        return load_json(path, chunk_size)
+    if extension in ('.jsonl', '.ndjson'):
+        return load_jsonl(path, chunk_size)
+    if extension in ('.txt', '.py'):
+        with open(path, 'r', encoding='utf-8') as f:
+            scenario = parse_literal_scenario(f.read())
+        return tuple(_validated_records(key, records, chunk_size) for key, records in zip(SCENARIO_KEYS, scenario))
+    raise ValueError(f"Desteklenmeyen senaryo biçimi: {path}")
+
+def load_json(path: str, chunk_size: int = 50000) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """{"drones": [...], "deliveries": [...], "no_fly_zones": [...]} biçimindeki JSON dosyası
+
+    Tek bir JSON belgesi olduğundan dosya bütün olarak ayrıştırılır; doğrulama parça parça yapılır.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: üst düzey JSON nesne olmalı ({type(data).__name__} bulundu)")
+    return tuple(_validated_records(key, data.get(key, []), chunk_size) for key in SCENARIO_KEYS)
+
+def load_jsonl(path: str, chunk_size: int = 50000) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Satır başına bir kayıt: {"type": "drone" | "delivery" | "no_fly_zone", ...alanlar}
+
+    Dosya satır satır okunur; kayıtlar tür başına chunk_size'lık parçalar hâlinde doğrulanır.
+    """
+    def records():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                key = RECORD_TYPES.get(record.pop('type', None))
+                if key is None:
+                    raise ValueError(f"{path}:{line_number}: bilinmeyen kayıt türü")
+                yield key, record
+
+    return _collect(records(), chunk_size)
+
+def load_csv(path: str, kind: str, chunk_size: int = 50000) -> List[Dict]:
+    """Tek türden kayıtlar içeren başlıklı CSV dosyası (sütunlar: CSV_COLUMNS[kind])"""
+    columns = CSV_COLUMNS[kind]
+    result = []
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        missing = [name for name in columns if name not in header]
+        if missing:
+            raise ValueError(f"{path}: eksik sütunlar {missing}")
+        positions = [header.index(name) for name in columns]
+
+        offset = 0
+        while True:
+            rows = [row for _, row in zip(range(chunk_size), reader) if row]
+            if not rows:
+                break
+            short = next((i for i, row in enumerate(rows) if len(row) < len(header)), None)
+            if short is not None:
+                raise ValueError(f"{path}: {len(header)} sütun bekleniyordu, {len(rows[short])} bulundu "
+                                 f"(kayıt {offset + short})")
+            table = {name: [row[i] for row in rows] for name, i in zip(columns, positions)}
+            parsed = _parse_csv_columns(kind, table, offset)
+            validate_columns(kind, parsed, offset)
+            result.extend(_records_from_columns(kind, parsed))
+            offset += len(rows)
+    return result
+
+def load_scenario_csv(drones_path: str, deliveries_path: str, no_fly_zones_path: Optional[str] = None,
+                      chunk_size: int = 50000) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    drones = load_csv(drones_path, 'drones', chunk_size)
+    deliveries = load_csv(deliveries_path, 'deliveries', chunk_size)
+    no_fly_zones = load_csv(no_fly_zones_path, 'no_fly_zones', chunk_size) if no_fly_zones_path else []
+    return drones, deliveries, no_fly_zones
+
+# Sütun tabanlı doğrulama
+
+def _as_float(values, name: str, offset: int) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Hatalı kaydı bulmak için yalnızca hata durumunda tek tek dönülür
+        for i, value in enumerate(values):
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"'{name}' sayısal değil (kayıt {offset + i}: {value!r})")
+        raise
+
+def _pairs(values, name: str, offset: int) -> np.ndarray:
+    """[(a, b), ...] -> (n, 2) dizi; uzunluğu 2 olmayan kayıtta ValueError"""
+    try:
+        pairs = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        pairs = None
+    if pairs is None or pairs.ndim != 2 or pairs.shape[1] != 2:
+        for i, value in enumerate(values):
+            if not isinstance(value, (list, tuple)) or len(value) != 2:
+                raise ValueError(f"'{name}' iki elemanlı olmalı (kayıt {offset + i}: {value!r})")
+        pairs = _as_float([list(value) for value in values], name, offset)
+    return pairs.reshape(-1, 2)
+
+def _columns_from_records(kind: str, records: List[Dict], offset: int) -> Dict[str, np.ndarray]:
+    """Sözlük kayıtlarını sütun dizilerine dönüştürme"""
+    fields = {
+        'drones': ('id', 'max_weight', 'battery', 'speed', 'start_pos'),
+        'deliveries': ('id', 'pos', 'weight', 'priority', 'time_window'),
+        'no_fly_zones': ('id', 'coordinates', 'active_time'),
+    }[kind]
+    raw = {}
+    for name in fields:
+        try:
+            raw[name] = [record[name] for record in records]
+        except KeyError:
+            i = next(i for i, record in enumerate(records) if name not in record)
+            raise ValueError(f"{kind}: '{name}' alanı eksik (kayıt {offset + i})")
+        except TypeError:
+            i = next(i for i, record in enumerate(records) if not isinstance(record, dict))
+            raise ValueError(f"{kind}: kayıt sözlük değil (kayıt {offset + i})")
+
+    ids = np.asarray(raw['id'])
+    if not np.issubdtype(ids.dtype, np.integer) or ids.dtype == np.bool_:
+        i = next(i for i, value in enumerate(raw['id']) if not isinstance(value, int) or isinstance(value, bool))
+        raise ValueError(f"{kind}: 'id' tam sayı olmalı (kayıt {offset + i})")
+    columns = {'id': ids.astype(np.int64)}
+
+    if kind == 'drones':
+        for name in ('max_weight', 'battery', 'speed'):
+            columns[name] = _as_float(raw[name], name, offset)
+        columns['start_pos'] = _pairs(raw['start_pos'], 'start_pos', offset)
+    elif kind == 'deliveries':
+        for name in ('weight', 'priority'):
+            columns[name] = _as_float(raw[name], name, offset)
+        columns['pos'] = _pairs(raw['pos'], 'pos', offset)
+        columns['time_window'] = _pairs(raw['time_window'], 'time_window', offset)
+    else:
+        vertex_count = []
+        for i, coordinates in enumerate(raw['coordinates']):
+            if not isinstance(coordinates, (list, tuple)):
+                raise ValueError(f"{kind}: 'coordinates' köşe listesi olmalı (kayıt {offset + i})")
+            try:
+                vertex_count.append(len(_pairs(coordinates, 'coordinates', 0)))
+            except ValueError:
+                raise ValueError(f"{kind}: 'coordinates' köşeleri sayısal (x, y) çiftleri olmalı "
+                                 f"(kayıt {offset + i})") from None
+        columns['vertex_count'] = np.array(vertex_count, dtype=np.int64)
+        columns['coordinates'] = raw['coordinates']
+        columns['active_time'] = _pairs(raw['active_time'], 'active_time', offset)
+    return columns
+
+def _parse_csv_columns(kind: str, table: Dict[str, List[str]], offset: int) -> Dict[str, np.ndarray]:
+    """CSV metin sütunlarını sayısal dizilere dönüştürme"""
+    ids = _as_float(table['id'], 'id', offset)
+    bad = np.flatnonzero(ids != np.floor(ids))
+    if len(bad):
+        raise ValueError(f"{kind}: 'id' tam sayı olmalı (kayıt {offset + int(bad[0])})")
+    columns = {'id': ids.astype(np.int64)}
+
+    if kind == 'drones':
+        for name in ('max_weight', 'battery', 'speed'):
+            columns[name] = _as_float(table[name], name, offset)
+        columns['start_pos'] = np.column_stack([_as_float(table['start_x'], 'start_x', offset),
+                                                _as_float(table['start_y'], 'start_y', offset)])
+    elif kind == 'deliveries':
+        for name in ('weight', 'priority'):
+            columns[name] = _as_float(table[name], name, offset)
+        columns['pos'] = np.column_stack([_as_float(table['x'], 'x', offset), _as_float(table['y'], 'y', offset)])
+        columns['time_window'] = np.column_stack([_as_float(table['window_start'], 'window_start', offset),
+                                                  _as_float(table['window_end'], 'window_end', offset)])
+    else:
+        coordinates = []
+        for i, text in enumerate(table['coordinates']):
+            points = [point.split() for point in text.split(';') if point.strip()]
+            if any(len(point) != 2 for point in points):
+                raise ValueError(f"{kind}: 'coordinates' \"x y;x y;...\" biçiminde olmalı (kayıt {offset + i})")
+            coordinates.append([(float(x), float(y)) for x, y in points])
+        columns['coordinates'] = coordinates
+        columns['vertex_count'] = np.array([len(c) for c in coordinates], dtype=np.int64)
+        columns['active_time'] = np.column_stack([_as_float(table['active_start'], 'active_start', offset),
+                                                  _as_float(table['active_end'], 'active_end', offset)])
+    return columns
+
+# Tür -> (hata mesajı, sütunlardan geçerli kayıt maskesi)
+VALIDATION_RULES: Dict[str, List[Tuple[str, Callable[[Dict], np.ndarray]]]] = {
+    'drones': [
+        ("'max_weight' pozitif olmalı", lambda c: c['max_weight'] > 0),
+        ("'battery' pozitif olmalı", lambda c: c['battery'] > 0),
+        ("'speed' pozitif olmalı", lambda c: c['speed'] > 0),
+        ("'start_pos' sonlu olmalı", lambda c: np.isfinite(c['start_pos']).all(axis=1)),
+    ],
+    'deliveries': [
+        ("'weight' pozitif olmalı", lambda c: c['weight'] > 0),
+        ("'priority' 1 ile 5 arasında olmalı", lambda c: (c['priority'] >= 1) & (c['priority'] <= 5)),
+        ("'pos' sonlu olmalı", lambda c: np.isfinite(c['pos']).all(axis=1)),
+        ("'time_window' başlangıcı bitişinden büyük olamaz",
+         lambda c: c['time_window'][:, 0] <= c['time_window'][:, 1]),
+    ],
+    'no_fly_zones': [
+        ("'coordinates' en az 3 köşe içermeli", lambda c: c['vertex_count'] >= 3),
+        ("'active_time' başlangıcı bitişinden büyük olamaz",
+         lambda c: c['active_time'][:, 0] <= c['active_time'][:, 1]),
+    ],
+}
+
+def validate_columns(kind: str, columns: Dict[str, np.ndarray], offset: int = 0):
+    """Kuralları tüm sütunlar üzerinde vektörel uygulama; ihlalde ilk kayıtlarla ValueError"""
+    for message, rule in VALIDATION_RULES[kind]:
+        valid = rule(columns)
+        if not valid.all():
+            rows = (np.flatnonzero(~valid)[:5] + offset).tolist()
+            raise ValueError(f"{kind}: {message} (kayıt {rows})")
+
+def _numbers(values: np.ndarray) -> List:
+    """Tam sayı değerli sütunlar int, diğerleri float listesi olarak"""
+    if np.all(values == np.floor(values)):
+        return values.astype(np.int64).tolist()
+    return values.tolist()
+
+def _records_from_columns(kind: str, columns: Dict[str, np.ndarray]) -> List[Dict]:
+    """Doğrulanmış CSV sütunlarından model sınıflarının beklediği sözlükler"""
+    ids = columns['id'].tolist()
+    if kind == 'drones':
+        return [{'id': i, 'max_weight': w, 'battery': b, 'speed': s, 'start_pos': (x, y)}
+                for i, w, b, s, (x, y) in zip(ids, columns['max_weight'].tolist(), _numbers(columns['battery']),
+                                              columns['speed'].tolist(), columns['start_pos'].tolist())]
+    if kind == 'deliveries':
+        windows = zip(_numbers(columns['time_window'][:, 0]), _numbers(columns['time_window'][:, 1]))
+        return [{'id': i, 'pos': (x, y), 'weight': w, 'priority': p, 'time_window': tw}
+                for i, (x, y), w, p, tw in zip(ids, columns['pos'].tolist(), columns['weight'].tolist(),
+                                               _numbers(columns['priority']), windows)]
+    times = zip(_numbers(columns['active_time'][:, 0]), _numbers(columns['active_time'][:, 1]))
+    return [{'id': i, 'coordinates': c, 'active_time': t}
+            for i, c, t in zip(ids, columns['coordinates'], times)]
+
+def _normalise_records(kind: str, records: List[Dict]) -> List[Dict]:
+    """Doğrulanmış sözlük kayıtlarında JSON listelerini demetlere çevirme"""
+    if kind == 'drones':
+        return [{**r, 'start_pos': tuple(r['start_pos'])} for r in records]
+    if kind == 'deliveries':
+        return [{**r, 'pos': tuple(r['pos']), 'time_window': tuple(r['time_window'])} for r in records]
+    return [{**r, 'coordinates': [tuple(p) for p in r['coordinates']], 'active_time': tuple(r['active_time'])}
+            for r in records]
+
+def _validated_records(kind: str, records: List[Dict], chunk_size: int) -> List[Dict]:
+    result = []
+    for offset in range(0, len(records), chunk_size):
+        chunk = records[offset:offset + chunk_size]
+        validate_columns(kind, _columns_from_records(kind, chunk, offset), offset)
+        result.extend(_normalise_records(kind, chunk))
+    return result
+
+def _collect(records: Iterator[Tuple[str, Dict]], chunk_size: int) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """(tür, kayıt) akışını tür başına parçalar hâlinde doğrulayıp toplama"""
+    result = {key: [] for key in SCENARIO_KEYS}
+    pending = {key: [] for key in SCENARIO_KEYS}
+    counts = {key: 0 for key in SCENARIO_KEYS}
+
+    def flush(key):
+        validate_columns(key, _columns_from_records(key, pending[key], counts[key]), counts[key])
+        result[key].extend(_normalise_records(key, pending[key]))
+        counts[key] += len(pending[key])
+        pending[key] = []
+
+    for key, record in records:
+        pending[key].append(record)
+        if len(pending[key]) >= chunk_size:
+            flush(key)
+    for key in SCENARIO_KEYS:
+        if pending[key]:
+            flush(key)
+
+    return tuple(result[key] for key in SCENARIO_KEYS)
+
 def get_default_data() -> Tuple[List[Dict], List[Dict], List[Dict]]:
     default_drones = [
         {"id": 1, "max_weight": 4.0, "battery": 12000, "speed": 8.0, "start_pos": (10, 10)},
@@ -80,35 +387,32 @@ def get_default_data() -> Tuple[List[Dict], List[Dict], List[Dict]]:
 
     return default_drones, default_deliveries, default_no_fly_zones
 
-drones, deliveries, no_fly_zones = load_data_from_file()
-
 def validate_data(drones: List[Dict], deliveries: List[Dict],
                   no_fly_zones: List[Dict]) -> bool:
     try:
-        for drone in drones:
-            assert 'id' in drone and isinstance(drone['id'], int)
-            assert 'max_weight' in drone and drone['max_weight'] > 0
-            assert 'battery' in drone and drone['battery'] > 0
-            assert 'speed' in drone and drone['speed'] > 0
-            assert 'start_pos' in drone and len(drone['start_pos']) == 2
-
-        for delivery in deliveries:
-            assert 'id' in delivery and isinstance(delivery['id'], int)
-            assert 'pos' in delivery and len(delivery['pos']) == 2
-            assert 'weight' in delivery and delivery['weight'] > 0
-            assert 'priority' in delivery and 1 <= delivery['priority'] <= 5
-            assert 'time_window' in delivery and len(delivery['time_window']) == 2
-
-        for nfz in no_fly_zones:
-            assert 'id' in nfz and isinstance(nfz['id'], int)
-            assert 'coordinates' in nfz and len(nfz['coordinates']) >= 3
-            assert 'active_time' in nfz and len(nfz['active_time']) == 2
-
+        for kind, records in zip(SCENARIO_KEYS, (drones, deliveries, no_fly_zones)):
+            if records:
+                validate_columns(kind, _columns_from_records(kind, records, 0))
         return True
 
-    except AssertionError as e:
+    except ValueError as e:
         print(f"Hata: {e}")
         return False
 
-if not validate_data(drones, deliveries, no_fly_zones):
-    drones, deliveries, no_fly_zones = get_default_data()
\ No newline at end of file
+def load_validated_data(filename: str = "data/veri_seti.txt") -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Dosyadan yükleyip doğrulama; geçersizse varsayılan veriler"""
+    drones, deliveries, no_fly_zones = load_data_from_file(filename)
+    if not validate_data(drones, deliveries, no_fly_zones):
+        return get_default_data()
+    return drones, deliveries, no_fly_zones
+
+_loaded = None
+
+def __getattr__(name: str):
+    """Eski `from utils.data_loader import drones` kullanımı için ilk erişimde yükleme"""
+    global _loaded
+    if name in SCENARIO_KEYS:
+        if _loaded is None:
+            _loaded = dict(zip(SCENARIO_KEYS, load_validated_data()))
+        return _loaded[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
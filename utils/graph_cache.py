@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from models.delivery import Delivery
+from models.no_fly_zone import NoFlyZone
+from utils.helpers import GEOMETRY_KERNEL_VERSION
+
+class GraphCache:
+    """Oluşturulmuş graf matrisleri ve NFZ tablosu için disk önbelleği
+
+    Her senaryo, teslimatların (id, konum, ağırlık, öncelik), NFZ'lerin, drone başlangıç
+    konumlarının, veri tipinin ve GEOMETRY_KERNEL_VERSION'ın SHA-256 özetiyle anahtarlanan tek bir
+    sıkıştırılmamış .npz dosyasında tutulur. Dizin boyutu max_bytes'ı aşınca en uzun süredir
+    kullanılmayan (mtime) dosyalar silinir.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(deliveries: Iterable[Delivery], no_fly_zones: Iterable[NoFlyZone],
+            origins: Iterable[Tuple[float, float]] = (), dtype=np.float64) -> str:
+        """Graf girdilerinin kararlı özeti"""
+        payload = {
+            'kernel': GEOMETRY_KERNEL_VERSION,
+            'dtype': np.dtype(dtype).str,
+            'deliveries': [[d.id, [float(c) for c in d.pos], float(d.weight), d.priority] for d in deliveries],
+            'no_fly_zones': [[nfz.id, [[float(x), float(y)] for x, y in nfz.coordinates],
+                              [float(t) for t in nfz.active_time]] for nfz in no_fly_zones],
+            'origins': [[float(c) for c in pos] for pos in origins],
+        }
+        encoded = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.npz')
+
+    def load(self, key: str, required: Iterable[str] = ()) -> Optional[Dict[str, np.ndarray]]:
+        """Kayıtlı dizileri okuma; yoksa None
+
+        Bozuk (ör. yarıda kalmış) ya da required dizilerinden biri eksik (eski sürüm) dosyalar
+        silinir ve ıskalama sayılır.
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            self.misses += 1
+            return None
+
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            arrays = None
+        if arrays is None or any(name not in arrays for name in required):
+            self.discard(key)
+            self.misses += 1
+            return None
+
+        # Erişim zamanı tahliye sırası için güncellenir
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return arrays
+
+    def store(self, key: str, arrays: Dict[str, np.ndarray]):
+        """Dizileri geçici dosyaya yazıp atomik olarak yerine taşıma, ardından tahliye"""
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def discard(self, key: str):
+        """Kaydı silme"""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """(mtime, boyut, yol) listesi, en eskiden en yeniye"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self):
+        """Toplam boyut sınırın altına inene kadar en eski dosyaları silme"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
@@ -3,6 +3,9 @@ import numpy as np
 import random
 import time
 
+# Geometri/NFZ hesaplarının sürümü; sonuçları değiştiren her düzeltmede artırılır (disk önbelleği anahtarı)
+GEOMETRY_KERNEL_VERSION = 1
+
 def calculate_distance(pos1: Tuple[float, float], pos2: Tuple[float, float]) -> float:
     return np.sqrt((pos1[0] - pos2[0])**2 + (pos1[1] - pos2[1])**2)
 
@@ -25,22 +28,126 @@ def point_in_polygon(point: Tuple[float, float], polygon: List[Tuple[float, floa
 
     return inside
 
+def polygon_bounds(polygon: List[Tuple[float, float]]) -> Tuple[float, float, float, float]:
+    """Poligonun sınırlayıcı kutusu: (min_x, min_y, max_x, max_y)"""
+    xs = [p[0] for p in polygon]
+    ys = [p[1] for p in polygon]
+    return min(xs), min(ys), max(xs), max(ys)
+
+def _cross(ox: float, oy: float, ax: float, ay: float, bx: float, by: float) -> float:
+    return (ax - ox) * (by - oy) - (ay - oy) * (bx - ox)
+
 def line_intersects_polygon(p1: Tuple[float, float], p2: Tuple[float, float],
                           polygon: List[Tuple[float, float]]) -> bool:
-    """İki nokta arasındaki doğrunun poligonla kesişiyor mu kontrolü"""
-    steps = 20
-    for i in range(steps + 1):
-        t = i / steps
-        point = (p1[0] + t * (p2[0] - p1[0]), p1[1] + t * (p2[1] - p1[1]))
-        if point_in_polygon(point, polygon):
+    """İki nokta arasındaki doğrunun poligonla kesişiyor mu kontrolü (kesin test)"""
+    x1, y1 = p1
+    x2, y2 = p2
+
+    # Sınırlayıcı kutu ile hızlı eleme
+    min_x, min_y, max_x, max_y = polygon_bounds(polygon)
+    if (max(x1, x2) < min_x or min(x1, x2) > max_x or
+            max(y1, y2) < min_y or min(y1, y2) > max_y):
+        return False
+
+    # Segment - kenar kesişimi (dokunma dahil)
+    n = len(polygon)
+    for i in range(n):
+        ax, ay = polygon[i]
+        bx, by = polygon[(i + 1) % n]
+
+        if (max(x1, x2) < min(ax, bx) or min(x1, x2) > max(ax, bx) or
+                max(y1, y2) < min(ay, by) or min(y1, y2) > max(ay, by)):
+            continue
+
+        d1 = _cross(ax, ay, bx, by, x1, y1)
+        d2 = _cross(ax, ay, bx, by, x2, y2)
+        d3 = _cross(x1, y1, x2, y2, ax, ay)
+        d4 = _cross(x1, y1, x2, y2, bx, by)
+        if d1 * d2 <= 0 and d3 * d4 <= 0:
             return True
-    return False
 
-def calculate_energy_consumption(distance: float, weight: float) -> float:
-    """Mesafe ve ağırlığa göre enerji tüketimini hesaplama"""
+    # Kenar kesişimi yoksa segment tamamen içeride ya da dışarıdadır
+    return point_in_polygon(p1, polygon)
+
+def segments_intersect_polygon(starts: np.ndarray, ends: np.ndarray,
+                               polygon: List[Tuple[float, float]],
+                               chunk_size: int = 65536) -> np.ndarray:
+    """Çok sayıda segment için vektörel poligon kesişim testi, (k,) bool dizi döner"""
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    result = np.zeros(len(starts), dtype=bool)
+
+    poly = np.asarray(polygon, dtype=np.float64)
+    min_x, min_y = poly.min(axis=0)
+    max_x, max_y = poly.max(axis=0)
+
+    # Sınırlayıcı kutu ile eleme
+    seg_min = np.minimum(starts, ends)
+    seg_max = np.maximum(starts, ends)
+    candidates = np.flatnonzero((seg_max[:, 0] >= min_x) & (seg_min[:, 0] <= max_x) &
+                                (seg_max[:, 1] >= min_y) & (seg_min[:, 1] <= max_y))
+    if len(candidates) == 0:
+        return result
+
+    # Kenarlar: a -> b, (1, m) şeklinde yayınlanır
+    ax, ay = poly[:, 0][None, :], poly[:, 1][None, :]
+    next_poly = np.roll(poly, -1, axis=0)
+    bx, by = next_poly[:, 0][None, :], next_poly[:, 1][None, :]
+    edge_min_x, edge_max_x = np.minimum(ax, bx), np.maximum(ax, bx)
+    edge_min_y, edge_max_y = np.minimum(ay, by), np.maximum(ay, by)
+
+    for offset in range(0, len(candidates), chunk_size):
+        idx = candidates[offset:offset + chunk_size]
+        x1, y1 = starts[idx, 0][:, None], starts[idx, 1][:, None]
+        x2, y2 = ends[idx, 0][:, None], ends[idx, 1][:, None]
+
+        overlap = ((np.maximum(x1, x2) >= edge_min_x) & (np.minimum(x1, x2) <= edge_max_x) &
+                   (np.maximum(y1, y2) >= edge_min_y) & (np.minimum(y1, y2) <= edge_max_y))
+
+        d1 = (bx - ax) * (y1 - ay) - (by - ay) * (x1 - ax)
+        d2 = (bx - ax) * (y2 - ay) - (by - ay) * (x2 - ax)
+        d3 = (x2 - x1) * (ay - y1) - (y2 - y1) * (ax - x1)
+        d4 = (x2 - x1) * (by - y1) - (y2 - y1) * (bx - x1)
+        crosses = (overlap & (d1 * d2 <= 0) & (d3 * d4 <= 0)).any(axis=1)
+
+        result[idx] = crosses | points_in_polygon(starts[idx], poly)
+
+    return result
+
+def points_in_polygon(points: np.ndarray, polygon) -> np.ndarray:
+    """Vektörel ışın atma (ray casting) ile nokta - poligon içerme testi"""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    poly = np.asarray(polygon, dtype=np.float64)
+    x, y = points[:, 0][:, None], points[:, 1][:, None]
+    ax, ay = poly[:, 0][None, :], poly[:, 1][None, :]
+    next_poly = np.roll(poly, -1, axis=0)
+    bx, by = next_poly[:, 0][None, :], next_poly[:, 1][None, :]
+
+    straddles = (ay > y) != (by > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_inters = (bx - ax) * (y - ay) / (by - ay) + ax
+    crossings = straddles & (x < x_inters)
+    return (crossings.sum(axis=1) % 2) == 1
+
+def segments_intersect_polygons(starts: np.ndarray, ends: np.ndarray,
+                                polygons: List[List[Tuple[float, float]]]) -> np.ndarray:
+    """Segment x poligon kesişim matrisi, (k, z) bool dizi döner"""
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    result = np.zeros((len(starts), len(polygons)), dtype=bool)
+    for z, polygon in enumerate(polygons):
+        result[:, z] = segments_intersect_polygon(starts, ends, polygon)
+    return result
+
+def calculate_energy_factor(weight):
+    """Metre başına enerji tüketimi (skaler veya NumPy dizisi)"""
     base_consumption = 10  # mAh/metre
     weight_factor = 1 + (weight * 0.2)  # Her kg için %20 ek tüketim
-    return distance * base_consumption * weight_factor
+    return base_consumption * weight_factor
+
+def calculate_energy_consumption(distance: float, weight: float) -> float:
+    """Mesafe ve ağırlığa göre enerji tüketimini hesaplama"""
+    return distance * calculate_energy_factor(weight)
 
 def analyze_time_complexity(n_deliveries: List[int], n_drones: int = 5):
     from src.main import DroneDeliverySimulation
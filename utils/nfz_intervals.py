@@ -0,0 +1,239 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from models.delivery import Delivery
+from utils.helpers import points_in_polygon, segments_intersect_polygon
+from utils.spatial_index import NoFlyZoneIndex
+
+SEGMENT_PENALTY = 50   # Rota NFZ ile kesişiyorsa
+TARGET_PENALTY = 100   # Hedef nokta NFZ içindeyse
+
+class EdgeIntervals:
+    """Tek bir kenarın NFZ nedeniyle kapalı olduğu zaman aralıkları"""
+    __slots__ = ('starts', 'ends', 'points', 'values')
+
+    def __init__(self, hits: List[Tuple[float, float, float]]):
+        # Kapalı aralıkların birleştirilmesi
+        merged = []
+        for start, end, _ in sorted(hits):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [m[0] for m in merged]
+        self.ends = [m[1] for m in merged]
+
+        # Ceza için basamak fonksiyonu: her kırılma noktası ve aradaki açık aralıklar
+        self.points = sorted({t for start, end, _ in hits for t in (start, end)})
+        self.values = []
+        for i in range(len(self.points) + 1):
+            if 0 < i < len(self.points):
+                gap = (self.points[i - 1] + self.points[i]) / 2
+                self.values.append(sum(w for s, e, w in hits if s <= gap <= e))
+            else:
+                self.values.append(0)
+            if i < len(self.points):
+                point = self.points[i]
+                self.values.append(sum(w for s, e, w in hits if s <= point <= e))
+
+    @classmethod
+    def from_parts(cls, starts: List[float], ends: List[float], points: List[float],
+                   values: List[float]) -> 'EdgeIntervals':
+        """Önceden hesaplanmış aralıklardan (ör. disk önbelleği) oluşturma"""
+        edge = cls.__new__(cls)
+        edge.starts, edge.ends, edge.points, edge.values = starts, ends, points, values
+        return edge
+
+    def is_blocked(self, t: float) -> bool:
+        i = bisect_right(self.starts, t) - 1
+        return i >= 0 and t <= self.ends[i]
+
+    def stable_margin(self, t: float) -> Tuple[float, float]:
+        """t'den geriye ve ileriye, bu paylardan küçük kaymalarda is_blocked sonucu değişmez"""
+        i = bisect_right(self.starts, t) - 1
+        if i >= 0 and t <= self.ends[i]:
+            return t - self.starts[i], self.ends[i] - t
+        earlier = t - self.ends[i] if i >= 0 else float('inf')
+        later = self.starts[i + 1] - t if i + 1 < len(self.starts) else float('inf')
+        return earlier, later
+
+    def penalty(self, t: float) -> float:
+        i = bisect_left(self.points, t)
+        if i < len(self.points) and self.points[i] == t:
+            return self.values[2 * i + 1]
+        return self.values[2 * i]
+
+class NFZIntervalTable:
+    """(başlangıç konumu, hedef teslimat) kenarları için önceden hesaplanmış NFZ aralıkları"""
+
+    # to_arrays() çıktısındaki dizi adları
+    ARRAY_KEYS = ('nfz_origins', 'nfz_edge_origin', 'nfz_edge_target', 'nfz_starts', 'nfz_ends',
+                  'nfz_points', 'nfz_values', 'nfz_interval_offsets', 'nfz_point_offsets',
+                  'nfz_value_offsets')
+
+    def __init__(self, deliveries: Dict[int, Delivery], nfz_index: NoFlyZoneIndex,
+                 origins: Iterable[Tuple[float, float]] = (), lazy: bool = False):
+        self.nfz_index = nfz_index
+        self.target_ids = list(deliveries.keys())
+        self.targets = np.array([d.pos for d in deliveries.values()], dtype=np.float64).reshape(-1, 2)
+        self.rows: Dict[Tuple[float, float], Dict[int, EdgeIntervals]] = {}
+        self._packed = None  # from_arrays() ile yüklenen, henüz açılmamış satırlar
+        self._packed_rows: Dict[Tuple[float, float], Tuple[int, int]] = {}
+        self._inside = None  # NFZ indeksi -> içinde kalan hedeflerin maskesi
+
+        # lazy=True ise satırlar (O(n) kenar) ilk sorguda hesaplanır; büyük seyrek graflar için
+        if not lazy:
+            self.add_origins([d.pos for d in deliveries.values()] + list(origins))
+
+    def add_origins(self, positions: Iterable[Tuple[float, float]]):
+        """Yeni başlangıç konumları için satırları toplu hesaplama"""
+        keys = list(dict.fromkeys((float(pos[0]), float(pos[1])) for pos in positions))
+        keys = [key for key in keys if key not in self.rows and key not in self._packed_rows]
+        if not keys:
+            return
+
+        n = len(self.target_ids)
+        origins = np.array(keys, dtype=np.float64)
+        starts = np.repeat(origins, n, axis=0)
+        ends = np.tile(self.targets, (len(keys), 1))
+        inside_by_zone = self._targets_inside()
+        no_inside = np.zeros(n, dtype=bool)
+
+        # Her NFZ için yalnızca sınırlayıcı kutusuna değen kenarlar sınanır; hedefi NFZ içinde
+        # olan kenarlar da bu adaylar arasındadır
+        candidates = self.nfz_index.query_boxes(np.minimum(starts, ends), np.maximum(starts, ends))
+        hits: Dict[Tuple[int, int], List[Tuple[float, float, float]]] = {}
+        for zone_idx, idx in sorted(candidates.items()):
+            nfz = self.nfz_index.no_fly_zones[zone_idx]
+            crosses = segments_intersect_polygon(starts[idx], ends[idx], nfz.coordinates)
+            inside = inside_by_zone.get(zone_idx, no_inside)[idx % n]
+            active_start, active_end = nfz.active_time
+
+            for j in np.flatnonzero(crosses | inside):
+                weight = (SEGMENT_PENALTY if crosses[j] else 0) + (TARGET_PENALTY if inside[j] else 0)
+                hits.setdefault(divmod(int(idx[j]), n), []).append((active_start, active_end, weight))
+
+        for key in keys:
+            self.rows[key] = {}
+        for (origin_idx, target_idx), edge_hits in hits.items():
+            self.rows[keys[origin_idx]][self.target_ids[target_idx]] = EdgeIntervals(edge_hits)
+
+    def _targets_inside(self) -> Dict[int, np.ndarray]:
+        """NFZ indeksi -> içinde kalan hedeflerin (n,) maskesi; yalnızca en az bir hedef içerenler"""
+        if self._inside is None:
+            self._inside = {}
+            for zone_idx, idx in self.nfz_index.query_boxes(self.targets, self.targets).items():
+                inside = points_in_polygon(self.targets[idx], self.nfz_index.no_fly_zones[zone_idx].coordinates)
+                if inside.any():
+                    mask = np.zeros(len(self.target_ids), dtype=bool)
+                    mask[idx[inside]] = True
+                    self._inside[zone_idx] = mask
+        return self._inside
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Tabloyu düz dizilere dönüştürme; kenar başına veriler ofset dizileriyle ayrılır"""
+        keys = list(self.rows.keys()) + list(self._packed_rows.keys())
+        edge_origin, edge_target = [], []
+        starts, ends, points, values = [], [], [], []
+        interval_offsets, point_offsets, value_offsets = [0], [0], [0]
+        for o, key in enumerate(keys):
+            for target_id, edge in self.row(key).items():
+                edge_origin.append(o)
+                edge_target.append(target_id)
+                starts.extend(edge.starts)
+                ends.extend(edge.ends)
+                points.extend(edge.points)
+                values.extend(edge.values)
+                interval_offsets.append(len(starts))
+                point_offsets.append(len(points))
+                value_offsets.append(len(values))
+
+        return {
+            'nfz_origins': np.array(keys, dtype=np.float64).reshape(-1, 2),
+            'nfz_edge_origin': np.array(edge_origin, dtype=np.int64),
+            'nfz_edge_target': np.array(edge_target, dtype=np.int64),
+            'nfz_starts': np.array(starts, dtype=np.float64),
+            'nfz_ends': np.array(ends, dtype=np.float64),
+            'nfz_points': np.array(points, dtype=np.float64),
+            'nfz_values': np.array(values, dtype=np.float64),
+            'nfz_interval_offsets': np.array(interval_offsets, dtype=np.int64),
+            'nfz_point_offsets': np.array(point_offsets, dtype=np.int64),
+            'nfz_value_offsets': np.array(value_offsets, dtype=np.int64),
+        }
+
+    @classmethod
+    def from_arrays(cls, deliveries: Dict[int, Delivery], nfz_index: NoFlyZoneIndex,
+                    arrays) -> 'NFZIntervalTable':
+        """to_arrays() çıktısından tabloyu geometri hesaplamadan yeniden kurma
+
+        Satırlar dizilerde paketli tutulur ve ilk erişimde nesnelere açılır.
+        """
+        table = cls.__new__(cls)
+        table.nfz_index = nfz_index
+        table.target_ids = list(deliveries.keys())
+        table.targets = np.array([d.pos for d in deliveries.values()], dtype=np.float64).reshape(-1, 2)
+        table.rows = {}
+        table._inside = None
+
+        # Kenarlar başlangıç konumuna göre sıralı olduğundan her satır bitişik bir aralıktır
+        keys = [tuple(p) for p in arrays['nfz_origins'].tolist()]
+        bounds = np.searchsorted(arrays['nfz_edge_origin'], np.arange(len(keys) + 1)).tolist()
+        table._packed = arrays
+        table._packed_rows = {key: (bounds[o], bounds[o + 1]) for o, key in enumerate(keys)}
+        return table
+
+    def _unpack_row(self, key: Tuple[float, float]) -> Dict[int, EdgeIntervals]:
+        first, last = self._packed_rows.pop(key)
+        arrays = self._packed
+        targets = arrays['nfz_edge_target'][first:last].tolist()
+        interval_offsets = arrays['nfz_interval_offsets'][first:last + 1].tolist()
+        point_offsets = arrays['nfz_point_offsets'][first:last + 1].tolist()
+        value_offsets = arrays['nfz_value_offsets'][first:last + 1].tolist()
+
+        def section(name, offsets):
+            return arrays[name][offsets[0]:offsets[-1]].tolist(), offsets[0]
+
+        starts, base_i = section('nfz_starts', interval_offsets)
+        ends, _ = section('nfz_ends', interval_offsets)
+        points, base_p = section('nfz_points', point_offsets)
+        values, base_v = section('nfz_values', value_offsets)
+
+        row = {}
+        for e, target_id in enumerate(targets):
+            a, b = interval_offsets[e] - base_i, interval_offsets[e + 1] - base_i
+            p, q = point_offsets[e] - base_p, point_offsets[e + 1] - base_p
+            v, w = value_offsets[e] - base_v, value_offsets[e + 1] - base_v
+            row[target_id] = EdgeIntervals.from_parts(starts[a:b], ends[a:b], points[p:q], values[v:w])
+        return row
+
+    def row(self, from_pos: Tuple[float, float]) -> Dict[int, EdgeIntervals]:
+        """Başlangıç konumunun NFZ'ye değen kenarları: hedef id -> aralıklar"""
+        key = (float(from_pos[0]), float(from_pos[1]))
+        row = self.rows.get(key)
+        if row is None:
+            if key in self._packed_rows:
+                self.rows[key] = self._unpack_row(key)
+            else:
+                self.add_origins([key])
+            row = self.rows[key]
+        return row
+
+    def _edge(self, from_pos: Tuple[float, float], to_id: int):
+        return self.row(from_pos).get(to_id)
+
+    def blocked_intervals(self, from_pos: Tuple[float, float], to_id: int) -> List[Tuple[float, float]]:
+        """Kenarın kapalı olduğu birleştirilmiş ve sıralı aralıklar"""
+        edge = self._edge(from_pos, to_id)
+        if edge is None:
+            return []
+        return list(zip(edge.starts, edge.ends))
+
+    def is_blocked(self, from_pos: Tuple[float, float], to_id: int, t: float) -> bool:
+        """t anında kenar aktif bir NFZ'den geçiyor mu"""
+        edge = self._edge(from_pos, to_id)
+        return edge is not None and edge.is_blocked(t)
+
+    def penalty(self, from_pos: Tuple[float, float], to_id: int, t: float) -> float:
+        """t anında kenar için heuristic NFZ cezası"""
+        edge = self._edge(from_pos, to_id)
+        return edge.penalty(t) if edge is not None else 0
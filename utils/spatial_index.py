@@ -0,0 +1,206 @@
+import math
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from models.no_fly_zone import NoFlyZone
+from utils.helpers import polygon_bounds
+
+class NoFlyZoneIndex:
+    """No-fly zone'lar için düzenli ızgara (uniform grid) tabanlı uzamsal indeks"""
+
+    def __init__(self, no_fly_zones: List[NoFlyZone], cell_size: Optional[float] = None):
+        self.no_fly_zones = list(no_fly_zones)
+        self.bounds = [polygon_bounds(nfz.coordinates) for nfz in self.no_fly_zones]
+        self.bounds_array = np.array(self.bounds, dtype=np.float64).reshape(-1, 4)
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+        if not self.no_fly_zones:
+            self.cell_size = 1.0
+            self.extent = None
+            return
+
+        self.extent = (
+            min(b[0] for b in self.bounds),
+            min(b[1] for b in self.bounds),
+            max(b[2] for b in self.bounds),
+            max(b[3] for b in self.bounds)
+        )
+
+        if cell_size is None:
+            # Ortalama NFZ boyutu kadar hücre
+            sizes = [max(b[2] - b[0], b[3] - b[1]) for b in self.bounds]
+            cell_size = sum(sizes) / len(sizes)
+        self.cell_size = cell_size if cell_size > 0 else 1.0
+
+        for zone_idx, (min_x, min_y, max_x, max_y) in enumerate(self.bounds):
+            cx0, cy0 = self._cell(min_x, min_y)
+            cx1, cy1 = self._cell(max_x, max_y)
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.cells[(cx, cy)].append(zone_idx)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+
+    def query_point(self, point: Tuple[float, float]) -> List[NoFlyZone]:
+        """Noktayı içerebilecek aday NFZ'ler"""
+        if self.extent is None:
+            return []
+
+        x, y = point
+        candidates = []
+        for zone_idx in self.cells.get(self._cell(x, y), ()):
+            min_x, min_y, max_x, max_y = self.bounds[zone_idx]
+            if min_x <= x <= max_x and min_y <= y <= max_y:
+                candidates.append(zone_idx)
+
+        return [self.no_fly_zones[i] for i in sorted(candidates)]
+
+    def query_segment(self, p1: Tuple[float, float], p2: Tuple[float, float]) -> List[NoFlyZone]:
+        """Segmentle kesişebilecek aday NFZ'ler"""
+        if self.extent is None:
+            return []
+
+        clipped = self._clip_to_extent(p1, p2)
+        if clipped is None:
+            return []
+
+        seg_min_x, seg_max_x = min(p1[0], p2[0]), max(p1[0], p2[0])
+        seg_min_y, seg_max_y = min(p1[1], p2[1]), max(p1[1], p2[1])
+
+        candidates = set()
+        for cell in self._traverse(*clipped):
+            for zone_idx in self.cells.get(cell, ()):
+                if zone_idx in candidates:
+                    continue
+                min_x, min_y, max_x, max_y = self.bounds[zone_idx]
+                if (seg_max_x >= min_x and seg_min_x <= max_x and
+                        seg_max_y >= min_y and seg_min_y <= max_y):
+                    candidates.add(zone_idx)
+
+        return [self.no_fly_zones[i] for i in sorted(candidates)]
+
+    def query_boxes(self, mins: np.ndarray, maxs: np.ndarray) -> Dict[int, np.ndarray]:
+        """(k, 2) alt/üst köşeleriyle verilen kutular için NFZ indeksi -> kutusu kesişen kutu indeksleri
+
+        Önce tüm kutuları kapsayan kutuyla aday NFZ'ler seçilir; yalnızca bunlar vektörel sınanır.
+        """
+        mins = np.asarray(mins, dtype=np.float64).reshape(-1, 2)
+        maxs = np.asarray(maxs, dtype=np.float64).reshape(-1, 2)
+        if self.extent is None or len(mins) == 0:
+            return {}
+
+        low, high = mins.min(axis=0), maxs.max(axis=0)
+        b = self.bounds_array
+        zones = np.flatnonzero((b[:, 2] >= low[0]) & (b[:, 0] <= high[0]) &
+                               (b[:, 3] >= low[1]) & (b[:, 1] <= high[1]))
+        candidates = {}
+        for zone_idx in zones.tolist():
+            min_x, min_y, max_x, max_y = self.bounds[zone_idx]
+            idx = np.flatnonzero((maxs[:, 0] >= min_x) & (mins[:, 0] <= max_x) &
+                                 (maxs[:, 1] >= min_y) & (mins[:, 1] <= max_y))
+            if len(idx):
+                candidates[zone_idx] = idx
+        return candidates
+
+    def _clip_to_extent(self, p1: Tuple[float, float], p2: Tuple[float, float]):
+        """Liang-Barsky ile segmenti indeks sınırlarına kırpma"""
+        min_x, min_y, max_x, max_y = self.extent
+        x1, y1 = p1
+        dx, dy = p2[0] - x1, p2[1] - y1
+        t0, t1 = 0.0, 1.0
+
+        for p, q in ((-dx, x1 - min_x), (dx, max_x - x1), (-dy, y1 - min_y), (dy, max_y - y1)):
+            if p == 0:
+                if q < 0:
+                    return None
+                continue
+            t = q / p
+            if p < 0:
+                t0 = max(t0, t)
+            else:
+                t1 = min(t1, t)
+            if t0 > t1:
+                return None
+
+        return (x1 + t0 * dx, y1 + t0 * dy), (x1 + t1 * dx, y1 + t1 * dy)
+
+    def _traverse(self, p1: Tuple[float, float], p2: Tuple[float, float]):
+        """Segmentin geçtiği hücreler (Amanatides-Woo)"""
+        cx, cy = self._cell(*p1)
+        end_x, end_y = self._cell(*p2)
+        dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+        step_x = 1 if dx > 0 else -1
+        step_y = 1 if dy > 0 else -1
+
+        if dx != 0:
+            next_x = (cx + (1 if step_x > 0 else 0)) * self.cell_size
+            t_max_x = (next_x - p1[0]) / dx
+            t_delta_x = self.cell_size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+
+        if dy != 0:
+            next_y = (cy + (1 if step_y > 0 else 0)) * self.cell_size
+            t_max_y = (next_y - p1[1]) / dy
+            t_delta_y = self.cell_size / abs(dy)
+        else:
+            t_max_y = t_delta_y = math.inf
+
+        max_steps = abs(end_x - cx) + abs(end_y - cy)
+        yield cx, cy
+        for _ in range(max_steps):
+            if abs(t_max_x - t_max_y) < 1e-12:
+                # Köşeden geçiş: iki komşu hücre de ziyaret edilir
+                yield cx + step_x, cy
+                yield cx, cy + step_y
+                cx += step_x
+                cy += step_y
+                t_max_x += t_delta_x
+                t_max_y += t_delta_y
+            elif t_max_x < t_max_y:
+                cx += step_x
+                t_max_x += t_delta_x
+            else:
+                cy += step_y
+                t_max_y += t_delta_y
+            yield cx, cy
+            if (cx, cy) == (end_x, end_y):
+                return
+
+        # Kayan nokta hatasına karşı bitiş hücresi
+        yield end_x, end_y
+
+def k_nearest(points: np.ndarray, k: int, chunk_size: int = 512) -> np.ndarray:
+    """Her noktanın kendisi hariç en yakın k komşusu, yakından uzağa (n, k) indeks dizisi
+
+    SciPy kuruluysa KD-ağacı (cKDTree) kullanılır; değilse mesafeler satır blokları hâlinde
+    hesaplanır ve bellek O(chunk_size * n) ile sınırlı kalır.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    n = len(points)
+    k = min(k, n - 1)
+    if k <= 0:
+        return np.zeros((n, 0), dtype=np.int64)
+
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        cKDTree = None
+
+    if cKDTree is not None:
+        _, near = cKDTree(points).query(points, k + 1)
+        near = np.asarray(near, dtype=np.int64).reshape(n, k + 1)
+    else:
+        near = np.empty((n, k + 1), dtype=np.int64)
+        for start in range(0, n, chunk_size):
+            block = points[start:start + chunk_size]
+            distance = np.hypot(block[:, None, 0] - points[None, :, 0], block[:, None, 1] - points[None, :, 1])
+            part = np.argpartition(distance, k, axis=1)[:, :k + 1]
+            order = np.argsort(np.take_along_axis(distance, part, axis=1), axis=1, kind='stable')
+            near[start:start + chunk_size] = np.take_along_axis(part, order, axis=1)
+
+    # Noktanın kendisi çıkarılır; aynı konumdaki noktalar yüzünden listede yoksa sonuncu atılır
+    keep = near != np.arange(n)[:, None]
+    keep[keep.all(axis=1), -1] = False
+    return near[keep].reshape(n, k)